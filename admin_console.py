@@ -0,0 +1,131 @@
+import re
+from datetime import date, datetime, timedelta
+from typing import NamedTuple, Optional
+
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup
+
+from dates import split_date_args
+
+CALLBACK_PREFIX = 'ord'
+DATE_FORMAT = '%y%m%d'
+# Statuses travel in callback_data, so they are kept short and free of '|'
+STATUS_PATTERN = re.compile(r'^[A-Za-z0-9_-]{1,20}$')
+
+
+class OrderFilters(NamedTuple):
+    status: str = 'pending'
+    tier: Optional[str] = None
+    since: Optional[date] = None  # inclusive
+    until: Optional[date] = None  # inclusive
+
+
+def parse_filters(args, tier_keys):
+    """Parse ``/orders [status] [tier=<tier>] [from=YYYY-MM-DD] [to=YYYY-MM-DD]``.
+
+    Raises ``ValueError`` with a user-facing message on bad input.
+    """
+    since, until, rest = split_date_args(args)
+    values = {'since': since, 'until': until}
+    for arg in rest:
+        key, sep, value = arg.partition('=')
+        if not sep:
+            if not STATUS_PATTERN.match(arg):
+                raise ValueError(f"Status must be 1-20 letters, digits, _ or -, got '{arg[:40]}'")
+            values['status'] = arg
+        elif key == 'tier':
+            if value not in tier_keys:
+                raise ValueError(f"Unknown tier '{value}'. Use one of: {', '.join(tier_keys)}")
+            values['tier'] = value
+        else:
+            raise ValueError(f"Unknown filter '{key}'")
+    return OrderFilters(**values)
+
+
+class OrdersConsole:
+    """Admin order browser paged with keyset cursors.
+
+    The filters and cursor travel in ``callback_data`` as
+    ``ord:<status>|<tier index>|<from>|<to>|<a|b><order id>`` (well within
+    Telegram's 64 bytes), so Next/Prev need no server-side state and every
+    page is a single index seek in ``Database.get_orders_page``.
+    """
+
+    def __init__(self, db, catalogs, page_size=10):
+        self.db = db
+        self.catalogs = catalogs
+        self.page_size = page_size
+
+    @property
+    def tier_keys(self):
+        return self.catalogs.current.tier_keys
+
+    def encode(self, filters, direction, cursor):
+        tier = str(self.tier_keys.index(filters.tier)) if filters.tier else ''
+        since = filters.since.strftime(DATE_FORMAT) if filters.since else ''
+        until = filters.until.strftime(DATE_FORMAT) if filters.until else ''
+        return f"{CALLBACK_PREFIX}:{filters.status}|{tier}|{since}|{until}|{direction}{cursor}"
+
+    def decode(self, data):
+        """Return ``(filters, after, before)`` from a console button.
+
+        Raises ``ValueError`` with a user-facing message if the button is
+        malformed or out of date.
+        """
+        try:
+            status, tier, since, until, position = data.partition(':')[2].split('|')
+            filters = OrderFilters(
+                status=status,
+                tier=self.tier_keys[int(tier)] if tier else None,
+                since=datetime.strptime(since, DATE_FORMAT).date() if since else None,
+                until=datetime.strptime(until, DATE_FORMAT).date() if until else None
+            )
+            direction, cursor = position[0], int(position[1:])
+        except (ValueError, IndexError):
+            raise ValueError("This orders page is out of date. Run /orders again")
+        if direction == 'b':
+            return filters, None, cursor
+        return filters, cursor, None
+
+    async def render(self, filters, after=None, before=None):
+        """Return ``(text, reply_markup)`` for one page of orders.
+
+        The text is plain (no parse_mode): business names and usernames are
+        user input and may contain Markdown characters.
+        """
+        page = await self.db.get_orders_page(
+            status=filters.status,
+            limit=self.page_size,
+            after=after,
+            before=before,
+            tier=filters.tier,
+            since=filters.since.isoformat() if filters.since else None,
+            until=(filters.until + timedelta(days=1)).isoformat() if filters.until else None
+        )
+
+        description = [f"status {filters.status}"]
+        if filters.tier:
+            description.append(f"tier {filters.tier}")
+        if filters.since:
+            description.append(f"from {filters.since.isoformat()}")
+        if filters.until:
+            description.append(f"to {filters.until.isoformat()}")
+
+        catalog = self.catalogs.current
+        lines = [
+            f"#{order.id} · {order.created_at[:16]} · "
+            f"{catalog.tier_name(order.selected_tier)} · "
+            f"{order.total_price:,} ETB\n    {order.business_name} · {order.phone} · "
+            f"@{order.username or 'N/A'}"
+            for order in page.rows
+        ]
+        text = f"📋 Orders ({', '.join(description)})\n\n" + (
+            "\n".join(lines) if lines else "No orders found.")
+
+        nav_row = []
+        if page.prev_cursor is not None:
+            nav_row.append(InlineKeyboardButton(
+                "◀️ Newer", callback_data=self.encode(filters, 'b', page.prev_cursor)))
+        if page.next_cursor is not None:
+            nav_row.append(InlineKeyboardButton(
+                "Older ▶️", callback_data=self.encode(filters, 'a', page.next_cursor)))
+        return text, InlineKeyboardMarkup([nav_row] if nav_row else [])
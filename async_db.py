@@ -0,0 +1,51 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+
+class AsyncDatabase:
+    """Awaitable facade over ``Database``.
+
+    Every call is run on one dedicated worker thread, so a slow commit never
+    blocks the event loop and writes are applied in the order they were
+    awaited. Any public ``Database`` method can be awaited through it, e.g.
+    ``await db.create_order(order_data)``.
+
+    ``pending`` counts calls queued or running on the thread; with ``calls``
+    (a ``metrics.CallMetrics``) every call is timed, queueing included.
+    """
+
+    def __init__(self, database, calls=None):
+        self.sync = database
+        self.calls = calls
+        self.pending = 0
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='db')
+
+    async def run(self, func, *args, **kwargs):
+        """Run ``func(*args, **kwargs)`` on the database thread."""
+        if self.calls is not None:
+            return await self.calls.track(getattr(func, '__name__', 'call'), self._run(func, *args, **kwargs))
+        return await self._run(func, *args, **kwargs)
+
+    async def _run(self, func, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        self.pending += 1
+        try:
+            return await loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+        finally:
+            self.pending -= 1
+
+    def __getattr__(self, name):
+        attr = getattr(self.sync, name)
+        if not callable(attr) or name.startswith('_'):
+            return attr
+
+        async def call(*args, **kwargs):
+            return await self.run(attr, *args, **kwargs)
+
+        call.__name__ = name
+        return call
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        self.sync.close()
@@ -0,0 +1,117 @@
+"""Compare connect-per-call SQLite access with the pooled ``Database``.
+
+Usage: python benchmarks/bench_db_pool.py [--ops 2000]
+"""
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import Database, MARK_ADMIN_NOTIFIED_SQL, FAQ_BY_CATEGORY_SQL
+
+ORDER = {
+    'user_id': 1,
+    'username': 'bench',
+    'first_name': 'Bench',
+    'last_name': 'User',
+    'phone': '+251900000000',
+    'business_name': 'Bench Co',
+    'selected_tier': 'basic',
+    'selected_addons': ['video', 'seo'],
+    'total_price': 4250,
+    'special_requests': 'No special requirements'
+}
+
+# The insert as it was before pooling (no RETURNING, no order_stats upkeep)
+LEGACY_INSERT_ORDER_SQL = '''
+    INSERT INTO orders (
+        user_id, username, first_name, last_name, phone,
+        business_name, selected_tier, selected_addons,
+        total_price, special_requests
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+
+class ConnectPerCallDatabase:
+    """The access pattern ``Database`` used before pooling: open, run, close."""
+
+    def __init__(self, db_name):
+        self.db_name = db_name
+
+    def create_order(self, order_data):
+        conn = sqlite3.connect(self.db_name)
+        cursor = conn.cursor()
+        cursor.execute(LEGACY_INSERT_ORDER_SQL, (
+            order_data['user_id'], order_data['username'], order_data['first_name'],
+            order_data['last_name'], order_data['phone'], order_data['business_name'],
+            order_data['selected_tier'], json.dumps(order_data['selected_addons']),
+            order_data['total_price'], order_data['special_requests']
+        ))
+        order_id = cursor.lastrowid
+        conn.commit()
+        conn.close()
+        return order_id
+
+    def mark_admin_notified(self, order_id):
+        conn = sqlite3.connect(self.db_name)
+        conn.execute(MARK_ADMIN_NOTIFIED_SQL, (order_id,))
+        conn.commit()
+        conn.close()
+
+    def get_faq_by_category(self, category):
+        conn = sqlite3.connect(self.db_name)
+        rows = conn.execute(FAQ_BY_CATEGORY_SQL, (category,)).fetchall()
+        conn.close()
+        return rows
+
+
+def measure(db, ops):
+    results = {}
+
+    start = time.perf_counter()
+    ids = [db.create_order(ORDER) for _ in range(ops)]
+    results['create_order'] = ops / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for order_id in ids:
+        db.mark_admin_notified(order_id)
+    results['mark_admin_notified'] = ops / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for _ in range(ops):
+        db.get_faq_by_category('billing')
+    results['get_faq_by_category'] = ops / (time.perf_counter() - start)
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--ops', type=int, default=2000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Both variants share a schema created by Database, so only access differs
+        baseline_path = os.path.join(tmp, 'baseline.db')
+        Database(baseline_path).close()
+        conn = sqlite3.connect(baseline_path)
+        conn.execute('PRAGMA journal_mode = DELETE')
+        conn.close()
+        before = measure(ConnectPerCallDatabase(baseline_path), args.ops)
+
+        pooled = Database(os.path.join(tmp, 'pooled.db'))
+        after = measure(pooled, args.ops)
+        pooled.close()
+
+    print(f"{'operation':<22}{'before ops/s':>14}{'after ops/s':>14}{'speedup':>10}")
+    for name in before:
+        print(f"{name:<22}{before[name]:>14,.0f}{after[name]:>14,.0f}{after[name] / before[name]:>9.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+"""Free-text FAQ search latency: FTS5/BM25 vs a LIKE scan over the faq table.
+
+Usage: python benchmarks/bench_faq_search.py [--faqs 5000] [--queries 500]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import INSERT_FAQ_SQL, Database, faq_search_query
+
+TOPICS = (
+    'payment', 'invoice', 'refund', 'package', 'upgrade', 'downgrade', 'cancel', 'contract',
+    'instagram', 'facebook', 'tiktok', 'linkedin', 'telegram', 'twitter', 'analytics', 'report',
+    'video', 'graphics', 'caption', 'schedule', 'seo', 'ads', 'budget', 'audience', 'strategy',
+    'support', 'emergency', 'setup', 'access', 'password', 'account', 'manager', 'competitor',
+    'content', 'calendar', 'hashtag', 'engagement', 'followers', 'growth', 'branding'
+)
+# Answer words follow a Zipf distribution like real text: a few are in most
+# answers, most are rare
+COMMON = (
+    'our', 'team', 'handles', 'every', 'month', 'business', 'days', 'after', 'request', 'plan',
+    'included', 'extra', 'customers', 'weekly', 'results', 'within', 'hours', 'available'
+)
+VOCABULARY = COMMON + TOPICS + tuple(f'term{i}' for i in range(2000))
+WEIGHTS = [1 / rank for rank in range(1, len(VOCABULARY) + 1)]
+CATEGORIES = ('general', 'billing', 'services', 'packages')
+
+
+def fill_faqs(db, count, seed=1):
+    rng = random.Random(seed)
+
+    def generate():
+        for i in range(count):
+            topics = rng.sample(TOPICS, 3)
+            question = f"How does {topics[0]} work with {topics[1]} #{i}?"
+            answer = ' '.join(rng.choices(VOCABULARY, WEIGHTS, k=40)) + f" {topics[2]}."
+            yield question, answer, rng.choice(CATEGORIES)
+
+    with db.pool.transaction() as conn:
+        conn.executemany(INSERT_FAQ_SQL, generate())
+
+
+def like_search(db, text, limit=3):
+    """The search you'd write without an index: LIKE every word, rank by words matched."""
+    words = faq_search_query(text).replace('"', '').split(' OR ')
+    conditions = ' OR '.join(['question LIKE ? OR answer LIKE ?'] * len(words))
+    params = [f'%{word}%' for word in words for _ in range(2)]
+    with db.pool.connection() as conn:
+        rows = conn.execute(
+            f'SELECT question, answer, category FROM faq WHERE is_active = 1 AND ({conditions})',
+            params
+        ).fetchall()
+    rows.sort(key=lambda row: -sum(word in (row[0] + row[1]).lower() for word in words))
+    return rows[:limit]
+
+
+def latencies(func, queries):
+    samples = []
+    for query in queries:
+        start = time.perf_counter()
+        func(query)
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return samples[len(samples) // 2], samples[int(len(samples) * 0.99)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--faqs', type=int, default=5000)
+    parser.add_argument('--queries', type=int, default=500)
+    args = parser.parse_args()
+
+    rng = random.Random(2)
+    queries = [
+        f"how can I get {' and '.join(rng.sample(TOPICS, rng.randint(1, 3)))} for my business?"
+        for _ in range(args.queries)
+    ]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, 'orders.db'))
+        start = time.perf_counter()
+        fill_faqs(db, args.faqs)
+        print(f"Indexed {args.faqs:,} FAQs in {time.perf_counter() - start:.2f}s (via triggers)")
+
+        print(f"{'search':<14}{'p50 ms':>10}{'p99 ms':>10}")
+        for name, func in (('fts5 bm25', db.search_faq), ('like scan', lambda q: like_search(db, q))):
+            func(queries[0])
+            p50, p99 = latencies(func, queries)
+            print(f"{name:<14}{p50:>10.3f}{p99:>10.3f}")
+        db.close()
+
+
+if __name__ == '__main__':
+    main()
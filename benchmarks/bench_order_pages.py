@@ -0,0 +1,106 @@
+"""Order page latency on a large synthetic table: keyset cursors vs OFFSET.
+
+Usage: python benchmarks/bench_order_pages.py [--rows 1000000] [--page-size 20]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import Database, ORDER_COLUMNS
+
+TIERS = ('basic', 'professional', 'enterprise')
+ADDONS = ('video', 'analytics', 'seo', 'emergency')
+STATUSES = ('pending', 'pending', 'pending', 'contacted', 'completed')
+
+SYNTHETIC_ORDER_SQL = '''
+    INSERT INTO orders (
+        user_id, username, first_name, last_name, phone, business_name,
+        selected_tier, selected_addons, total_price, special_requests,
+        status, created_at, admin_notified
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 1)
+'''
+
+
+def fill_orders(db, rows, days=365, seed=1):
+    """Insert ``rows`` synthetic orders spread evenly over the last ``days``."""
+    rng = random.Random(seed)
+    start = datetime.now(timezone.utc) - timedelta(days=days)
+    step = timedelta(days=days) / max(rows, 1)
+
+    def generate():
+        for i in range(rows):
+            addons = [addon for addon in ADDONS if rng.random() < 0.3]
+            yield (
+                rng.randrange(1, rows // 5 + 2), f'user{i}', 'Synthetic', None,
+                '+251900000000', f'Business {i}', rng.choice(TIERS), json.dumps(addons),
+                2500 + 500 * len(addons), 'No special requirements', rng.choice(STATUSES),
+                (start + step * i).strftime('%Y-%m-%d %H:%M:%S')
+            )
+
+    with db.pool.transaction() as conn:
+        conn.executemany(SYNTHETIC_ORDER_SQL, generate())
+
+
+def timed(func, repeat=20):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def offset_page(db, offset, limit):
+    with db.pool.connection() as conn:
+        return conn.execute(
+            f'SELECT {ORDER_COLUMNS} FROM orders WHERE status = ? ORDER BY id DESC LIMIT ? OFFSET ?',
+            ('pending', limit, offset)
+        ).fetchall()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--page-size', type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, 'orders.db'))
+        start = time.perf_counter()
+        fill_orders(db, args.rows)
+        print(f"Filled {args.rows:,} orders in {time.perf_counter() - start:.1f}s")
+
+        with db.pool.connection() as conn:
+            pending = conn.execute("SELECT COUNT(*) FROM orders WHERE status = 'pending'").fetchone()[0]
+            max_id = conn.execute('SELECT MAX(id) FROM orders').fetchone()[0]
+
+        print(f"{'page depth':<14}{'keyset ms':>12}{'offset ms':>12}")
+        for fraction in (0, 0.1, 0.5, 0.9, 0.99):
+            # The keyset cursor for a page this deep is simply an id that far down
+            cursor = int(max_id * (1 - fraction)) + 1 if fraction else None
+            keyset = timed(lambda: db.get_orders_page(limit=args.page_size, after=cursor))
+            offset = timed(lambda: offset_page(db, int(pending * fraction), args.page_size), repeat=3)
+            print(f"{fraction:<14.0%}{keyset:>12.3f}{offset:>12.3f}")
+
+        middle = (datetime.now(timezone.utc) - timedelta(days=180)).strftime('%Y-%m-%d')
+        month_end = (datetime.now(timezone.utc) - timedelta(days=150)).strftime('%Y-%m-%d')
+        filtered = {
+            'tier': lambda: db.get_orders_page(limit=args.page_size, tier='enterprise'),
+            'date range': lambda: db.get_orders_page(limit=args.page_size, since=middle, until=month_end),
+            'tier + dates': lambda: db.get_orders_page(limit=args.page_size, tier='basic',
+                                                       since=middle, until=month_end),
+        }
+        for name, func in filtered.items():
+            print(f"{name:<14}{timed(func):>12.3f}")
+        db.close()
+
+
+if __name__ == '__main__':
+    main()
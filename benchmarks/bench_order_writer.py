@@ -0,0 +1,68 @@
+"""Orders/sec for concurrent confirmations, one commit each vs group commit.
+
+Usage: python benchmarks/bench_order_writer.py [--orders 2000] [--batch 50] [--wait-ms 5]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from async_db import AsyncDatabase
+from database import Database
+from order_writer import OrderBatchWriter
+from bench_db_pool import ORDER
+
+CONCURRENCY = (1, 10, 100)
+
+
+async def confirm_all(insert, orders, concurrency):
+    """Run ``orders`` confirmations from ``concurrency`` simulated users."""
+    async def user(count):
+        for _ in range(count):
+            await insert(ORDER)
+
+    share, extra = divmod(orders, concurrency)
+    start = time.perf_counter()
+    await asyncio.gather(*(user(share + (i < extra)) for i in range(concurrency)))
+    return orders / (time.perf_counter() - start)
+
+
+async def run(args):
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for concurrency in CONCURRENCY:
+            db = AsyncDatabase(Database(os.path.join(tmp, f'direct_{concurrency}.db')))
+            direct = await confirm_all(db.create_order, args.orders, concurrency)
+            db.close()
+
+            db = AsyncDatabase(Database(os.path.join(tmp, f'batched_{concurrency}.db')))
+            writer = OrderBatchWriter(db, max_batch=args.batch, max_wait=args.wait_ms / 1000)
+            writer.start()
+            batched = await confirm_all(writer.submit, args.orders, concurrency)
+            await writer.stop()
+            db.close()
+
+            results[concurrency] = (direct, batched)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--orders', type=int, default=2000)
+    parser.add_argument('--batch', type=int, default=50)
+    parser.add_argument('--wait-ms', type=float, default=5)
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+
+    print(f"{'concurrency':<14}{'direct orders/s':>18}{'batched orders/s':>18}")
+    for concurrency, (direct, batched) in results.items():
+        print(f"{concurrency:<14}{direct:>18,.0f}{batched:>18,.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,152 @@
+"""Startup cost of opening orders.db, with schema migrations.
+
+Times ``Database()`` (and a whole ``SocialMediaBot()``) on:
+
+- a current database: one ``PRAGMA user_version`` read, no DDL
+- the same database with every boot re-running the schema DDL and checks,
+  as ``init_db`` did before migrations were versioned
+- an empty file (all migrations)
+- a database in the original schema (orders without ``admin_notified``),
+  which gets the column, indexes and order_stats added online: a reader
+  thread keeps querying orders throughout, and its slowest read is shown
+
+Usage: python benchmarks/bench_startup.py [--orders 100000] [--repeat 20]
+"""
+import argparse
+import json
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_order_pages import fill_orders
+from database import Database, _initial_schema
+
+# orders as the bot first created it, before the admin outbox
+LEGACY_ORDERS_SQL = '''
+    CREATE TABLE orders (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER,
+        username TEXT,
+        first_name TEXT,
+        last_name TEXT,
+        phone TEXT,
+        business_name TEXT,
+        selected_tier TEXT,
+        selected_addons TEXT,
+        total_price INTEGER,
+        special_requests TEXT,
+        status TEXT DEFAULT 'pending',
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+'''
+
+
+def timed(func, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def open_current(path):
+    Database(path).close()
+
+
+def open_with_ddl(path):
+    db = Database(path)
+    with db.pool.transaction() as conn:
+        _initial_schema(conn)
+    db.close()
+
+
+def fill_legacy(path, orders, seed=1):
+    rng = random.Random(seed)
+    conn = sqlite3.connect(path)
+    conn.execute('PRAGMA journal_mode = WAL')
+    conn.execute(LEGACY_ORDERS_SQL)
+    with conn:
+        conn.executemany(
+            'INSERT INTO orders (user_id, username, first_name, phone, business_name, selected_tier, '
+            'selected_addons, total_price, special_requests, status, created_at) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+            ((rng.randrange(1, 10 ** 6), 'legacy', 'Legacy', '+251911000000', 'Legacy Cafe',
+              rng.choice(('basic', 'professional', 'enterprise')), json.dumps(['video']),
+              3500, 'none', 'pending', f'2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d} 12:00:00')
+             for _ in range(orders))
+        )
+    conn.close()
+
+
+def upgrade_online(path, orders):
+    """Migrate ``path`` while another connection reads orders; returns the
+    migration time and the slowest read during it, in ms."""
+    stop = threading.Event()
+    slowest = [0.0]
+
+    def reader():
+        conn = sqlite3.connect(path, timeout=30)
+        rng = random.Random(2)
+        while not stop.is_set():
+            start = time.perf_counter()
+            conn.execute('SELECT * FROM orders WHERE id = ?', (rng.randint(1, orders),)).fetchone()
+            slowest[0] = max(slowest[0], time.perf_counter() - start)
+        conn.close()
+
+    thread = threading.Thread(target=reader)
+    thread.start()
+    time.sleep(0.05)
+    start = time.perf_counter()
+    Database(path).close()
+    elapsed = time.perf_counter() - start
+    stop.set()
+    thread.join()
+    return elapsed * 1000, slowest[0] * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--orders', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'orders.db')
+        fresh = timed(lambda: open_current(path), 1)
+        db = Database(path)
+        fill_orders(db, args.orders)
+        db.close()
+        current = timed(lambda: open_current(path), args.repeat)
+        with_ddl = timed(lambda: open_with_ddl(path), args.repeat)
+
+        cwd = os.getcwd()
+        os.chdir(tmp)  # SocialMediaBot opens orders.db in the working directory
+        try:
+            from bot import SocialMediaBot
+            bot = timed(lambda: SocialMediaBot('1:bench').db.close(), max(1, args.repeat // 4))
+        finally:
+            os.chdir(cwd)
+
+        legacy_path = os.path.join(tmp, 'legacy.db')
+        fill_legacy(legacy_path, args.orders)
+        upgrade, slowest_read = upgrade_online(legacy_path, args.orders)
+
+    print(f"{'startup':<44}{'ms':>10}")
+    print(f"{'Database(), schema current':<44}{current:>10.2f}")
+    print(f"{'Database() + DDL on every boot (before)':<44}{with_ddl:>10.2f}")
+    print(f"{'SocialMediaBot(), schema current':<44}{bot:>10.2f}")
+    print(f"{'Database(), empty file (all migrations)':<44}{fresh:>10.2f}")
+    print(f"{f'Database(), original schema, {args.orders:,} orders':<44}{upgrade:>10.2f}")
+    print(f"{'  slowest concurrent read during upgrade':<44}{slowest_read:>10.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+"""Update throughput vs number of active chats: sequential, per-chat ordered
+(PerChatUpdateProcessor) and blanket concurrent_updates.
+
+Every update is handled by one handler that awaits for a random time (mean
+``--handler-ms``, like a Bot API round trip or a database call) and counts
+updates that started while another update from the same chat was still
+being handled, which is what breaks ConversationHandler state. Updates are
+spread round-robin over the active chats and fed straight into the update
+queue; Bot API calls are answered offline.
+
+Usage: python benchmarks/bench_update_processor.py [--updates 400] [--handler-ms 5] [--max-active 64]
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from telegram import Update
+from telegram.ext import Application, TypeHandler
+
+from bench_webhook import OfflineRequest
+from update_processor import PerChatUpdateProcessor
+
+CHAT_COUNTS = (1, 2, 4, 8, 16, 32, 64)
+
+
+def make_updates(bot, count, chats):
+    return [Update.de_json({
+        'update_id': i,
+        'message': {
+            'message_id': i,
+            'date': int(time.time()),
+            'chat': {'id': 1000 + i % chats, 'type': 'private'},
+            'from': {'id': 1000 + i % chats, 'is_bot': False, 'first_name': 'Bench'},
+            'text': 'hello'
+        }
+    }, bot) for i in range(1, count + 1)]
+
+
+async def run(processor, updates_count, chats, handler_ms, seed=1):
+    request = OfflineRequest()
+    builder = Application.builder().token('1:offline').request(request).get_updates_request(request)
+    if processor is not None:
+        builder = builder.concurrent_updates(processor)
+    application = builder.build()
+
+    rng = random.Random(seed)
+    busy = set()
+    handled = 0
+    overlapped = 0
+    done = asyncio.Event()
+
+    async def handle(update, context):
+        nonlocal handled, overlapped
+        chat_id = update.effective_chat.id
+        if chat_id in busy:
+            overlapped += 1
+        busy.add(chat_id)
+        await asyncio.sleep(rng.expovariate(1000 / handler_ms))
+        busy.discard(chat_id)
+        handled += 1
+        if handled == updates_count:
+            done.set()
+
+    application.add_handler(TypeHandler(Update, handle))
+    async with application:
+        await application.start()
+        updates = make_updates(application.bot, updates_count, chats)
+        start = time.perf_counter()
+        for update in updates:
+            application.update_queue.put_nowait(update)
+        await done.wait()
+        elapsed = time.perf_counter() - start
+        await application.stop()
+    return updates_count / elapsed, overlapped
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--updates', type=int, default=400)
+    parser.add_argument('--handler-ms', type=float, default=5.0)
+    parser.add_argument('--max-active', type=int, default=64, help='chats (or updates) handled at once')
+    args = parser.parse_args()
+
+    modes = (
+        ('sequential', lambda: None),
+        ('per-chat', lambda: PerChatUpdateProcessor(max_active_chats=args.max_active)),
+        ('concurrent', lambda: args.max_active),
+    )
+    print(f"{'chats':>6}" + ''.join(f"{name + ' upd/s':>18}" for name, _ in modes) + f"{'overlapped':>12}")
+    for chats in CHAT_COUNTS:
+        line = f"{chats:>6}"
+        overlapped = 0
+        for name, processor in modes:
+            throughput, overlaps = asyncio.run(run(processor(), args.updates, chats, args.handler_ms))
+            line += f"{throughput:>18,.0f}"
+            if name == 'per-chat' and overlaps:
+                raise AssertionError(f"per-chat processing overlapped {overlaps} updates of one chat")
+            if name == 'concurrent':
+                overlapped = overlaps
+        # Only blanket concurrent_updates overlaps a chat's updates
+        print(line + f"{overlapped:>12}")
+
+
+if __name__ == '__main__':
+    main()
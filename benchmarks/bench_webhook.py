@@ -0,0 +1,193 @@
+"""End-to-end update latency through PTB's webhook server vs long polling, offline.
+
+Recorded updates (one Update JSON per line) are replayed by concurrent
+senders; each sender waits for its update to reach a handler before sending
+the next one. No network access is needed: Bot API calls are answered by an
+in-process stand-in. That stand-in answers getUpdates without any network
+round trip, so the polling numbers are a lower bound; the webhook numbers
+include the local HTTP hop and the client's own CPU cost, on the same event
+loop as the bot. The comparison therefore says what the webhook server costs
+per update, not how the two modes compare against the real Bot API, where
+every getUpdates response crosses the internet too.
+
+Usage: python benchmarks/bench_webhook.py [--updates recorded.jsonl] [--count 2000] [--concurrency 20]
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import statistics
+import sys
+import time
+from collections import deque
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from telegram import Update
+from telegram.ext import Application, TypeHandler
+from telegram.request import BaseRequest
+
+SECRET = 'bench-secret'
+SECRET_HEADER = 'X-Telegram-Bot-Api-Secret-Token'
+BOT_USER = {'id': 1, 'is_bot': True, 'first_name': 'Bench', 'username': 'bench_bot'}
+
+
+class OfflineRequest(BaseRequest):
+    """Answers Bot API calls locally; getUpdates serves updates from ``pending``."""
+
+    def __init__(self):
+        self.pending = deque()
+        self.available = asyncio.Event()
+
+    async def initialize(self):
+        pass
+
+    async def shutdown(self):
+        pass
+
+    async def do_request(self, url, method, request_data=None, read_timeout=None,
+                         write_timeout=None, connect_timeout=None, pool_timeout=None):
+        endpoint = url.rsplit('/', 1)[-1]
+        if endpoint == 'getMe':
+            result = BOT_USER
+        elif endpoint == 'getUpdates':
+            if not self.pending:
+                self.available.clear()
+                try:
+                    await asyncio.wait_for(self.available.wait(), 1)
+                except asyncio.TimeoutError:
+                    pass
+            result = [self.pending.popleft() for _ in range(min(100, len(self.pending)))]
+        else:
+            result = True
+        return 200, json.dumps({'ok': True, 'result': result}).encode()
+
+    def push(self, update):
+        self.pending.append(update)
+        self.available.set()
+
+
+def synthetic_updates(count):
+    return [{
+        'message': {
+            'message_id': i,
+            'date': int(time.time()),
+            'chat': {'id': 1000 + i % 500, 'type': 'private'},
+            'from': {'id': 1000 + i % 500, 'is_bot': False, 'first_name': f'User{i}'},
+            'text': '/start'
+        }
+    } for i in range(count)]
+
+
+def load_updates(path, count):
+    with open(path) as f:
+        updates = [json.loads(line) for line in f if line.strip()]
+    return [dict(updates[i % len(updates)]) for i in range(count)]
+
+
+def build_application():
+    request = OfflineRequest()
+    application = (
+        Application.builder()
+        .token('1:offline')
+        .request(request)
+        .get_updates_request(request)
+        .build()
+    )
+    waiters = {}
+
+    async def delivered(update, context):
+        future = waiters.pop(update.update_id, None)
+        if future is not None:
+            future.set_result(time.perf_counter())
+
+    application.add_handler(TypeHandler(Update, delivered))
+    return application, request, waiters
+
+
+async def replay(updates, concurrency, send, waiters):
+    latencies = []
+    queue = deque(enumerate(updates, 1))
+
+    async def sender():
+        loop = asyncio.get_running_loop()
+        while queue:
+            update_id, update = queue.popleft()
+            update = dict(update, update_id=update_id)
+            future = loop.create_future()
+            waiters[update_id] = future
+            start = time.perf_counter()
+            await send(update)
+            latencies.append(await future - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(sender() for _ in range(concurrency)))
+    return latencies, time.perf_counter() - start
+
+
+async def bench_webhook(updates, concurrency):
+    application, _, waiters = build_application()
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        port = probe.getsockname()[1]
+    url = f'http://127.0.0.1:{port}/telegram'
+    async with application:
+        await application.updater.start_webhook(
+            listen='127.0.0.1', port=port, url_path='telegram', webhook_url=url, secret_token=SECRET
+        )
+        await application.start()
+        limits = httpx.Limits(max_connections=concurrency)
+        async with httpx.AsyncClient(limits=limits) as client:
+            async def send(update):
+                response = await client.post(url, json=update, headers={SECRET_HEADER: SECRET})
+                response.raise_for_status()
+            result = await replay(updates, concurrency, send, waiters)
+        await application.updater.stop()
+        await application.stop()
+    return result
+
+
+async def bench_polling(updates, concurrency):
+    application, request, waiters = build_application()
+    async with application:
+        await application.updater.start_polling(poll_interval=0, timeout=1)
+        await application.start()
+
+        async def send(update):
+            request.push(update)
+        result = await replay(updates, concurrency, send, waiters)
+
+        await application.updater.stop()
+        await application.stop()
+    return result
+
+
+def report(name, latencies, elapsed):
+    latencies = sorted(latencies)
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    print(f"{name:<10}{len(latencies) / elapsed:>14,.0f}"
+          f"{statistics.median(latencies) * 1000:>12.2f}{p99 * 1000:>12.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--updates', help='JSONL file of recorded updates')
+    parser.add_argument('--count', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=20)
+    args = parser.parse_args()
+
+    if args.updates:
+        updates = load_updates(args.updates, args.count)
+    else:
+        updates = synthetic_updates(args.count)
+
+    print(f"{'mode':<10}{'updates/s':>14}{'p50 ms':>12}{'p99 ms':>12}")
+    report('webhook', *asyncio.run(bench_webhook(updates, args.concurrency)))
+    report('polling', *asyncio.run(bench_polling(updates, args.concurrency)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,373 @@
+"""Local stand-in for the Telegram Bot API, for load tests without Telegram.
+
+Serves ``<base>/bot<token>/<method>`` over plain HTTP: getUpdates long polls
+updates queued with ``push``, messages sent or edited by the bot are stored
+per chat and returned the way Telegram would (editing a message into what it
+already shows fails with "message is not modified"), and every request is
+recorded as a ``Call``. Load generators push user messages and button taps
+and ``wait_for`` the bot's reply.
+
+Run standalone to point a bot at it by hand:
+
+    python benchmarks/fake_bot_api.py --port 8081 --record calls.jsonl
+    BOT_API_URL=http://127.0.0.1:8081/bot BOT_TOKEN=1:fake python bot.py
+"""
+import argparse
+import asyncio
+import email.parser
+import json
+import time
+from collections import defaultdict
+from typing import Any, Dict, NamedTuple
+from urllib.parse import parse_qsl
+
+BOT_USER = {'id': 1, 'is_bot': True, 'first_name': 'Fake', 'username': 'fake_bot'}
+
+# Methods that send a new message to ``chat_id``
+SEND_METHODS = frozenset((
+    'sendMessage', 'sendDocument', 'sendPhoto', 'sendVideo', 'sendAudio', 'sendVoice',
+    'sendAnimation', 'sendSticker', 'sendLocation', 'sendContact', 'forwardMessage', 'copyMessage'
+))
+EDIT_METHODS = frozenset(('editMessageText', 'editMessageReplyMarkup', 'editMessageCaption'))
+# Methods answered with a plain ``true``
+TRUE_METHODS = frozenset((
+    'answerCallbackQuery', 'deleteMessage', 'setMyCommands',
+    'deleteMyCommands', 'sendChatAction', 'pinChatMessage', 'unpinChatMessage', 'logOut', 'close'
+))
+
+
+class Call(NamedTuple):
+    """One Bot API request as received."""
+    method: str
+    params: Dict[str, Any]
+    at: float
+    result: Any = None
+
+
+class _ApiError(Exception):
+    def __init__(self, status, description):
+        super().__init__(description)
+        self.status = status
+        self.description = description
+
+
+def _decode_params(headers, body):
+    content_type = headers.get('content-type', '')
+    if content_type.startswith('application/json'):
+        return json.loads(body or b'{}')
+    if content_type.startswith('multipart/form-data'):
+        message = email.parser.BytesParser().parsebytes(
+            b'Content-Type: ' + content_type.encode('latin-1') + b'\r\n\r\n' + body
+        )
+        params = {}
+        for part in message.get_payload():
+            name = part.get_param('name', header='content-disposition')
+            if part.get_filename() is None:
+                params[name] = part.get_payload(decode=True).decode()
+            else:
+                params[name] = f'<file {part.get_filename()}>'
+        return params
+    return dict(parse_qsl(body.decode()))
+
+
+def _json_param(value):
+    """PTB sends nested objects (``reply_markup``, ...) as JSON strings."""
+    if isinstance(value, str) and value[:1] in '{[':
+        try:
+            return json.loads(value)
+        except ValueError:
+            pass
+    return value
+
+
+class FakeBotApi:
+    """See the module docstring. ``calls`` holds every request received."""
+
+    def __init__(self, host='127.0.0.1', port=0, record=None):
+        self.host = host
+        self.port = port
+        self.record = record
+        self.calls = []
+        self.chat_calls = defaultdict(list)  # chat id -> sendX/editX calls, in order
+        self.messages = {}  # (chat id, message id) -> message dict
+        self.polled = asyncio.Event()
+        self.webhook_url = ''  # set by setWebhook; getUpdates fails while it is
+        self._updates = []
+        self._next_update_id = 1
+        self._next_message_id = defaultdict(lambda: 1)
+        self._new_updates = asyncio.Event()
+        self._changed = defaultdict(asyncio.Event)
+        self._chat_ids = {}
+        self._record_file = None
+        self._server = None
+        self._connections = set()  # _handle_connection tasks, cancelled by stop()
+
+    @property
+    def base_url(self):
+        return f'http://{self.host}:{self.port}/bot'
+
+    async def start(self):
+        if self.record:
+            self._record_file = open(self.record, 'w', encoding='utf-8')
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            self._new_updates.set()
+            # Idle keep-alive connections would otherwise still be open when
+            # the loop shuts down, which cancels them with a traceback each
+            for task in self._connections:
+                task.cancel()
+            await asyncio.gather(*self._connections, return_exceptions=True)
+            await self._server.wait_closed()
+            self._server = None
+        if self._record_file is not None:
+            self._record_file.close()
+            self._record_file = None
+
+    # Driving the bot
+
+    def chat_id(self, chat):
+        """Numeric id for ``chat``; ``@channel`` usernames get negative ids."""
+        if isinstance(chat, int):
+            return chat
+        try:
+            return int(chat)
+        except ValueError:
+            return self._chat_ids.setdefault(chat, -1000000000000 - len(self._chat_ids))
+
+    def _chat(self, chat_id):
+        if chat_id > 0:
+            return {'id': chat_id, 'type': 'private', 'first_name': f'User{chat_id}'}
+        return {'id': chat_id, 'type': 'channel', 'title': f'Channel{-chat_id}'}
+
+    def _store(self, chat_id, message):
+        self.messages[chat_id, message['message_id']] = message
+        return message
+
+    def push(self, update):
+        """Queue ``update`` (without ``update_id``) for getUpdates; returns its id."""
+        update = dict(update, update_id=self._next_update_id)
+        self._next_update_id += 1
+        self._updates.append(update)
+        self._new_updates.set()
+        return update['update_id']
+
+    def push_message(self, user, text):
+        """Queue ``user`` sending ``text`` in their private chat."""
+        chat_id = user['id']
+        message = {
+            'message_id': self._next_message_id[chat_id],
+            'date': int(time.time()),
+            'chat': self._chat(chat_id),
+            'from': user,
+            'text': text
+        }
+        self._next_message_id[chat_id] += 1
+        if text.startswith('/'):
+            message['entities'] = [{'type': 'bot_command', 'offset': 0, 'length': len(text.split()[0])}]
+        self._store(chat_id, message)
+        return self.push({'message': message})
+
+    def push_callback(self, user, message, data):
+        """Queue ``user`` tapping the button with ``data`` under ``message``."""
+        return self.push({'callback_query': {
+            'id': str(self._next_update_id),
+            'from': user,
+            'chat_instance': str(message['chat']['id']),
+            'message': message,
+            'data': data
+        }})
+
+    async def wait_for(self, chat_id, predicate, after=0, timeout=10.0):
+        """First call to ``chat_id`` at position ``after`` or later that
+        satisfies ``predicate``, and its position."""
+        calls = self.chat_calls[chat_id]
+        changed = self._changed[chat_id]
+        deadline = asyncio.get_running_loop().time() + timeout
+        while True:
+            for index in range(after, len(calls)):
+                if predicate(calls[index]):
+                    return index, calls[index]
+            after = len(calls)
+            changed.clear()
+            remaining = deadline - asyncio.get_running_loop().time()
+            if remaining <= 0:
+                raise asyncio.TimeoutError(f"No matching reply in chat {chat_id} within {timeout}s")
+            try:
+                await asyncio.wait_for(changed.wait(), remaining)
+            except asyncio.TimeoutError:
+                pass
+
+    # Bot API
+
+    async def _get_updates(self, params):
+        offset = int(params.get('offset') or 0)
+        limit = int(params.get('limit') or 100)
+        timeout = float(params.get('timeout') or 0)
+        self.polled.set()
+        if offset:
+            self._updates = [update for update in self._updates if update['update_id'] >= offset]
+        if not self._updates and timeout:
+            self._new_updates.clear()
+            try:
+                await asyncio.wait_for(self._new_updates.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        return self._updates[:limit]
+
+    def _send(self, method, params):
+        chat_id = self.chat_id(params['chat_id'])
+        message = {
+            'message_id': self._next_message_id[chat_id],
+            'date': int(time.time()),
+            'chat': self._chat(chat_id),
+            'from': BOT_USER
+        }
+        self._next_message_id[chat_id] += 1
+        if 'text' in params:
+            message['text'] = params['text']
+        if 'caption' in params:
+            message['caption'] = params['caption']
+        if method == 'sendDocument':
+            message['document'] = {'file_id': f'doc{message["message_id"]}', 'file_unique_id': 'doc'}
+        if 'reply_markup' in params:
+            markup = _json_param(params['reply_markup'])
+            if 'inline_keyboard' in markup:
+                message['reply_markup'] = markup
+        return chat_id, self._store(chat_id, message)
+
+    def _edit(self, method, params):
+        if 'inline_message_id' in params:
+            return None, True
+        chat_id = self.chat_id(params['chat_id'])
+        key = (chat_id, int(params['message_id']))
+        if key not in self.messages:
+            raise _ApiError(400, 'Bad Request: message to edit not found')
+        message = dict(self.messages[key])
+        if method == 'editMessageText':
+            message['text'] = params['text']
+        elif method == 'editMessageCaption':
+            message['caption'] = params.get('caption', '')
+        markup = _json_param(params.get('reply_markup'))
+        if markup:
+            message['reply_markup'] = markup
+        else:
+            message.pop('reply_markup', None)
+        if message == self.messages[key]:
+            raise _ApiError(
+                400, 'Bad Request: message is not modified: specified new message content and '
+                     'reply markup are exactly the same as a current content and reply markup of the message'
+            )
+        message['edit_date'] = int(time.time())
+        return chat_id, self._store(chat_id, message)
+
+    async def _call(self, method, params):
+        chat_id = None
+        if method == 'getMe':
+            result = BOT_USER
+        elif method == 'getUpdates':
+            if self.webhook_url:
+                raise _ApiError(409, "Conflict: can't use getUpdates method while webhook is active; "
+                                     "use deleteWebhook to delete the webhook first")
+            result = await self._get_updates(params)
+        elif method == 'getWebhookInfo':
+            result = {'url': self.webhook_url, 'has_custom_certificate': False,
+                      'pending_update_count': len(self._updates)}
+        elif method == 'setWebhook':
+            self.webhook_url, result = params['url'], True
+        elif method == 'deleteWebhook':
+            self.webhook_url, result = '', True
+        elif method in SEND_METHODS:
+            chat_id, result = self._send(method, params)
+        elif method in EDIT_METHODS:
+            chat_id, result = self._edit(method, params)
+        elif method in TRUE_METHODS:
+            result = True
+        else:
+            raise _ApiError(404, 'Not Found: method not found')
+
+        call = Call(method, params, time.perf_counter(), result)
+        if method != 'getUpdates':
+            self.calls.append(call)
+            if self._record_file is not None:
+                self._record_file.write(json.dumps(call._asdict(), ensure_ascii=False) + '\n')
+        if chat_id is not None:
+            self.chat_calls[chat_id].append(call)
+            self._changed[chat_id].set()
+        return result
+
+    async def _handle_connection(self, reader, writer):
+        task = asyncio.current_task()
+        self._connections.add(task)
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                _, target, _ = request_line.decode('latin-1').split(' ', 2)
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get('content-length', 0))
+                body = await reader.readexactly(length) if length else b''
+
+                method = target.split('?', 1)[0].rsplit('/', 1)[-1]
+                try:
+                    params = {key: _json_param(value) for key, value in _decode_params(headers, body).items()}
+                    status, payload = 200, {'ok': True, 'result': await self._call(method, params)}
+                except _ApiError as e:
+                    status, payload = e.status, {'ok': False, 'error_code': e.status, 'description': e.description}
+                except (KeyError, ValueError) as e:
+                    status, payload = 400, {'ok': False, 'error_code': 400, 'description': f'Bad Request: {e}'}
+
+                data = json.dumps(payload).encode()
+                writer.write(
+                    f"HTTP/1.1 {status} {'OK' if status == 200 else 'Error'}\r\n"
+                    f"Content-Type: application/json\r\n"
+                    f"Content-Length: {len(data)}\r\n\r\n".encode('latin-1') + data
+                )
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        except asyncio.CancelledError:
+            # Cancelled by stop(). End normally: asyncio's stream callback asks
+            # the task for its exception, and on Python < 3.12 that logs a
+            # traceback for a task that ended cancelled
+            pass
+        finally:
+            self._connections.discard(task)
+            writer.close()
+
+
+async def serve(host, port, record):
+    api = FakeBotApi(host, port, record)
+    await api.start()
+    print(f"Fake Bot API on {api.base_url} (any token)")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await api.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8081)
+    parser.add_argument('--record', help='write every request received to this JSONL file')
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port, args.record))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,292 @@
+"""Load test: simulated users drive the bot's conversations over a fake Bot API.
+
+The bot runs unmodified in a subprocess (``bot.py run``, long polling) with
+``BOT_API_URL`` pointing at an in-process ``FakeBotApi`` and a fresh
+orders.db. Every simulated user works through the selected scenarios step by
+step, like a person would: send a message or tap a button from the bot's
+last reply, wait for the reply the step expects, move on. A step that gets
+no such reply within ``--timeout`` counts as failed and ends that scenario
+for the user.
+
+Reports updates/s, reply latency per step (update queued to matching reply
+received, exact) and handler latency per callback (interpolated from the
+bot's own ``handler_seconds`` histograms, scraped from its metrics endpoint).
+Telegram's outbound rate limits are lifted unless ``--telegram-limits`` is
+given, so the numbers reflect the bot rather than the pacing.
+
+Usage: python benchmarks/loadtest.py [--users 200] [--scenarios order,postajob,makecv]
+                                     [--ramp 5] [--think 0] [--timeout 10] [--telegram-limits]
+"""
+import argparse
+import asyncio
+import math
+import os
+import random
+import re
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from collections import Counter, defaultdict
+from typing import Callable, NamedTuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from catalog import CONFIRM, PROCEED, SELECT_TIER, TOGGLE_ADDON
+from fake_bot_api import FakeBotApi
+
+
+class Step(NamedTuple):
+    name: str
+    action: Callable  # (api, user, last bot message, rng) -> update id
+    expect: Callable  # Call -> bool
+
+
+def say(text):
+    return lambda api, user, last, rng: api.push_message(user, text)
+
+
+def tap(route):
+    """Tap a random button of ``route`` on the bot's last message."""
+    def action(api, user, last, rng):
+        return api.push_callback(user, last, rng.choice(buttons(last, route)))
+    return action
+
+
+def buttons(message, route):
+    markup = (message or {}).get('reply_markup') or {}
+    return [
+        button['callback_data']
+        for row in markup.get('inline_keyboard', ())
+        for button in row
+        if button.get('callback_data', '').split(':', 1)[0] == route
+    ]
+
+
+def reply(method='sendMessage', contains=None, route=None):
+    def expect(call):
+        if call.method != method or not isinstance(call.result, dict):
+            return False
+        if contains is not None and contains not in call.result.get('text', ''):
+            return False
+        return route is None or bool(buttons(call.result, route))
+    return expect
+
+
+def edit(contains=None, route=None):
+    return reply('editMessageText', contains, route)
+
+
+SCENARIOS = {
+    'order': (
+        Step('/start', say('/start'), reply()),
+        Step('/order', say('/order'), reply(route=SELECT_TIER)),
+        Step('tier', tap(SELECT_TIER), edit(route=TOGGLE_ADDON)),
+        Step('add-on', tap(TOGGLE_ADDON), edit(route=TOGGLE_ADDON)),
+        Step('proceed', tap(PROCEED), reply(contains='phone number')),
+        Step('contact', say('+251911000000'), reply()),
+        Step('business', say('Load Test Cafe'), reply()),
+        Step('requests', say('none'), reply(route=CONFIRM)),
+        Step('confirm', tap(CONFIRM), edit(contains='Order Submitted')),
+    ),
+    'postajob': (
+        Step('/postajob', say('/postajob'), reply(contains='job title')),
+        Step('title', say('Senior Software Engineer'), reply(contains='description')),
+        Step('description', say('Build and run our Telegram bots. 3+ years of Python.'), reply(contains='apply')),
+        Step('contact', say('jobs@example.com'), reply(contains='Thank you')),
+    ),
+    'makecv': (
+        Step('/makecv', say('/makecv'), reply(contains='full name')),
+        Step('name', say('Abebe Kebede'), reply(contains='headline')),
+        Step('headline', say('Backend Engineer | Python'), reply(contains='skills')),
+        Step('skills', say('Python, SQL, Django'), reply(contains='experience')),
+        Step('experience', say('5 years building web services.'), reply(contains='PROFESSIONAL CV')),
+    ),
+}
+
+
+class Results:
+    def __init__(self):
+        self.latencies = defaultdict(list)  # (scenario, step) -> seconds
+        self.failures = Counter()
+        self.updates = 0
+
+
+async def run_user(api, user, scenarios, results, args, rng):
+    chat_id = user['id']
+    for scenario in scenarios:
+        last = None
+        for step in SCENARIOS[scenario]:
+            if args.think:
+                await asyncio.sleep(rng.expovariate(1000 / args.think))
+            after = len(api.chat_calls[chat_id])
+            start = time.perf_counter()
+            try:
+                step.action(api, user, last, rng)
+                results.updates += 1
+                _, call = await api.wait_for(chat_id, step.expect, after, args.timeout)
+            except (asyncio.TimeoutError, IndexError):
+                results.failures[scenario, step.name] += 1
+                break
+            results.latencies[scenario, step.name].append(call.at - start)
+            last = call.result
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def scrape(port):
+    with urllib.request.urlopen(f'http://127.0.0.1:{port}/metrics', timeout=10) as response:
+        return response.read().decode()
+
+
+BUCKET_LINE = re.compile(r'^handler_seconds_bucket\{handler="([^"]*)",le="([^"]+)"\} (\S+)$')
+ERRORS_LINE = re.compile(r'^handler_errors_total\{handler="([^"]*)"\} (\S+)$')
+
+
+def handler_metrics(text):
+    """``{handler: [(upper bound, cumulative count), ...]}`` and
+    ``{handler: errors}`` from a scrape."""
+    histograms = defaultdict(list)
+    errors = Counter()
+    for line in text.splitlines():
+        match = BUCKET_LINE.match(line)
+        if match:
+            handler, bound, count = match.groups()
+            histograms[handler].append((math.inf if bound == '+Inf' else float(bound), float(count)))
+        match = ERRORS_LINE.match(line)
+        if match:
+            errors[match.group(1)] = int(float(match.group(2)))
+    return histograms, errors
+
+
+def histogram_quantile(q, buckets):
+    """Quantile of a cumulative histogram, interpolating linearly within the
+    bucket it falls in (as Prometheus' ``histogram_quantile`` does)."""
+    total = buckets[-1][1]
+    if not total:
+        return math.nan
+    rank = q * total
+    lower, below = 0.0, 0.0
+    for bound, count in buckets:
+        if count >= rank:
+            if bound == math.inf:
+                return lower
+            return lower + (bound - lower) * (rank - below) / max(count - below, 1e-12)
+        lower, below = bound, count
+    return lower
+
+
+def percentile(samples, q):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * q))]
+
+
+def report(results, elapsed, histograms, errors, api):
+    print(f"\n{results.updates:,} updates in {elapsed:.2f}s: {results.updates / elapsed:,.1f} updates/s")
+
+    print(f"\n{'reply latency':<24}{'ok':>8}{'failed':>8}{'p50 ms':>10}{'p99 ms':>10}")
+    for scenario, steps in SCENARIOS.items():
+        for step in steps:
+            key = (scenario, step.name)
+            samples = results.latencies.get(key)
+            if not samples and not results.failures[key]:
+                continue
+            p50 = percentile(samples, 0.5) * 1000 if samples else math.nan
+            p99 = percentile(samples, 0.99) * 1000 if samples else math.nan
+            print(f"{scenario + ' ' + step.name:<24}{len(samples or ()):>8}{results.failures[key]:>8}"
+                  f"{p50:>10.1f}{p99:>10.1f}")
+
+    print(f"\n{'handler latency':<40}{'calls':>8}{'errors':>8}{'p50 ms':>10}{'p99 ms':>10}")
+    for handler, buckets in sorted(histograms.items(), key=lambda item: -item[1][-1][1]):
+        print(f"{handler:<40}{int(buckets[-1][1]):>8}{errors[handler]:>8}"
+              f"{histogram_quantile(0.5, buckets) * 1000:>10.1f}{histogram_quantile(0.99, buckets) * 1000:>10.1f}")
+
+    methods = Counter(call.method for call in api.calls)
+    print('\nBot API calls: ' + ', '.join(f'{method} {count:,}' for method, count in methods.most_common()))
+
+
+async def load_test(args, workdir):
+    api = FakeBotApi(record=args.record)
+    await api.start()
+    metrics_port = free_port()
+    env = dict(
+        os.environ,
+        BOT_TOKEN='1:loadtest',
+        BOT_API_URL=api.base_url,
+        METRICS_HOST='127.0.0.1',
+        METRICS_PORT=str(metrics_port),
+        RUN_MODE='polling'
+    )
+    if not args.telegram_limits:
+        env.update(OUTBOUND_GLOBAL_RATE='1000000', OUTBOUND_CHAT_RATE='1000000')
+
+    log_path = os.path.join(workdir, 'bot.log')
+    with open(log_path, 'w') as log:
+        bot = subprocess.Popen(
+            [sys.executable, os.path.join(ROOT, 'bot.py'), 'run'],
+            cwd=workdir, env=env, stdout=log, stderr=subprocess.STDOUT
+        )
+    try:
+        try:
+            await asyncio.wait_for(api.polled.wait(), 30)
+        except asyncio.TimeoutError:
+            raise SystemExit(f"Bot did not start polling:\n{open(log_path).read()[-2000:]}")
+
+        scenarios = args.scenarios.split(',')
+        results = Results()
+        rng = random.Random(args.seed)
+
+        async def user(index):
+            await asyncio.sleep(args.ramp * index / args.users)
+            profile = {'id': 100000 + index, 'is_bot': False, 'first_name': f'Load{index}', 'username': f'load{index}'}
+            await run_user(api, profile, scenarios, results, args, random.Random(rng.random()))
+
+        print(f"{args.users} users, scenarios: {', '.join(scenarios)}")
+        start = time.perf_counter()
+        await asyncio.gather(*(user(index) for index in range(args.users)))
+        elapsed = time.perf_counter() - start
+
+        histograms, errors = handler_metrics(await asyncio.to_thread(scrape, metrics_port))
+        report(results, elapsed, histograms, errors, api)
+        if results.failures:
+            errors = [line for line in open(log_path).read().splitlines() if 'Error' in line or 'error' in line]
+            print(f"\n{sum(results.failures.values())} failed steps; last errors in the bot log:")
+            print('\n'.join(errors[-10:]))
+    finally:
+        bot.send_signal(signal.SIGINT)
+        try:
+            await asyncio.to_thread(bot.wait, 30)
+        except subprocess.TimeoutExpired:
+            bot.kill()
+        await api.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS))
+    parser.add_argument('--ramp', type=float, default=5.0, help='seconds over which users start')
+    parser.add_argument('--think', type=float, default=0.0, help='mean think time between steps, ms')
+    parser.add_argument('--timeout', type=float, default=10.0, help='seconds to wait for each reply')
+    parser.add_argument('--telegram-limits', action='store_true', help="keep Telegram's outbound rate limits")
+    parser.add_argument('--record', help='write every Bot API request to this JSONL file')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+    unknown = set(args.scenarios.split(',')) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    with tempfile.TemporaryDirectory() as workdir:
+        asyncio.run(load_test(args, workdir))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,290 @@
+"""Micro-benchmark suite for the storage and rendering hot paths.
+
+Database benchmarks run against a fresh orders.db per table size, filled
+with that many synthetic orders and FAQ rows; rendering benchmarks time the
+message and keyboard work done by the order handlers and the admin
+notification. Each benchmark is timed call by call for at least
+``--min-time`` seconds after one warm-up call.
+
+Results are written as JSON (by default to benchmarks/results/<commit>.json)
+together with the commit, Python and SQLite versions, so runs can be
+compared across commits with ``--compare``:
+
+    python benchmarks/run.py --sizes 1000,100000 -o before.json
+    git checkout my-branch
+    python benchmarks/run.py --sizes 1000,100000 --compare before.json
+
+Usage: python benchmarks/run.py [--sizes 1000,100000,1000000] [--filter db.] [--min-time 1]
+                                [-o results.json] [--compare baseline.json]
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bench_order_pages import fill_orders
+from bot import Config
+from catalog import PROCEED, TOGGLE_ADDON, load_catalog
+from database import INSERT_FAQ_SQL, Database, OrderRow
+from message_editor import content_digest
+
+DEFAULT_SIZES = (1000, 100000, 1000000)
+MIN_ITERATIONS = 5
+FAQ_CATEGORIES = ('general', 'billing', 'services', 'packages')
+
+BENCHMARKS = []
+
+
+def benchmark(name, sized=False):
+    """Register ``setup(context) -> callable`` as benchmark ``name``; sized
+    benchmarks get a database filled to each table size."""
+    def register(setup):
+        BENCHMARKS.append((name, sized, setup))
+        return setup
+    return register
+
+
+def fill_faqs(db, rows, seed=1):
+    """Insert ``rows`` synthetic FAQs. The full-text index is not fed (no
+    benchmark here searches it), which keeps 1M-row fills quick."""
+    rng = random.Random(seed)
+    with db.pool.transaction() as conn:
+        trigger_sql = conn.execute("SELECT sql FROM sqlite_master WHERE name = 'faq_fts_insert'").fetchone()[0]
+        conn.execute('DROP TRIGGER faq_fts_insert')
+        conn.executemany(INSERT_FAQ_SQL, (
+            (f"Question {i} about our services?", f"Answer {i}: " + 'details ' * rng.randint(5, 30),
+             FAQ_CATEGORIES[i % len(FAQ_CATEGORIES)])
+            for i in range(rows)
+        ))
+        conn.execute(trigger_sql)
+
+
+def sample_order_data(rng, catalog):
+    tier_key = rng.choice(catalog.tier_keys)
+    mask = rng.choice(catalog.addon_masks)
+    return {
+        'user_id': rng.randrange(1, 10 ** 9),
+        'username': 'bench',
+        'first_name': 'Bench',
+        'last_name': None,
+        'phone': '+251911000000',
+        'business_name': 'Bench Cafe',
+        'selected_tier': tier_key,
+        'selected_addons': catalog.addons_for(mask),
+        'total_price': catalog.totals[tier_key, mask],
+        'special_requests': 'No special requirements'
+    }
+
+
+class Context:
+    def __init__(self, catalog, db=None, size=None):
+        self.catalog = catalog
+        self.db = db
+        self.size = size
+        self.rng = random.Random(1)
+
+
+# Storage
+
+@benchmark('db.create_order', sized=True)
+def bench_create_order(context):
+    return lambda: context.db.create_order(sample_order_data(context.rng, context.catalog))
+
+
+@benchmark('db.get_orders_page', sized=True)
+def bench_get_orders_page(context):
+    return lambda: context.db.get_orders_page(status='pending')
+
+
+@benchmark('db.get_orders_page.deep', sized=True)
+def bench_get_orders_page_deep(context):
+    middle = context.size // 2
+    return lambda: context.db.get_orders_page(status='pending', after=middle)
+
+
+@benchmark('db.get_faq_by_category', sized=True)
+def bench_get_faq_by_category(context):
+    return lambda: context.db.get_faq_by_category('billing')
+
+
+@benchmark('db.mark_admin_notified', sized=True)
+def bench_mark_admin_notified(context):
+    return lambda: context.db.mark_admin_notified(context.rng.randint(1, context.size))
+
+
+# Rendering: the CPU work of each handler, up to what is handed to the Bot API
+
+@benchmark('render.select_addons')
+def bench_select_addons(context):
+    """Add-on toggle: parse the tapped token, flip the bit, look up the
+    pre-rendered view and hash it for the edit de-duplication."""
+    catalog = context.catalog
+    tokens = [
+        catalog.order_token(TOGGLE_ADDON, tier_key, mask, addon)
+        for tier_key in catalog.tier_keys
+        for mask in catalog.addon_masks
+        for addon in range(len(catalog.addon_keys))
+    ]
+
+    def render():
+        selection = catalog.parse_order_token(context.rng.choice(tokens))
+        mask = selection.mask ^ (1 << selection.addon)
+        text, reply_markup = catalog.addon_views[selection.tier_key, mask]
+        return content_digest(text, reply_markup)
+    return render
+
+
+@benchmark('render.special_requests')
+def bench_special_requests(context):
+    """Order summary: parse the stored selection, render the summary and
+    serialize the confirm keyboard."""
+    catalog = context.catalog
+    tokens = [
+        catalog.order_token(PROCEED, tier_key, mask)
+        for tier_key in catalog.tier_keys
+        for mask in catalog.addon_masks
+    ]
+
+    def render():
+        selection = catalog.parse_order_token(context.rng.choice(tokens))
+        text = catalog.order_summary_text(
+            selection.tier_key, selection.mask, 'Bench Cafe', 'No special requirements'
+        )
+        return text, catalog.confirm_keyboards[selection.tier_key, selection.mask].to_json()
+    return render
+
+
+@benchmark('render.admin_notification')
+def bench_admin_notification(context):
+    rng, catalog = context.rng, context.catalog
+    orders = []
+    for order_id in range(1, 101):
+        data = sample_order_data(rng, catalog)
+        orders.append(OrderRow(
+            id=order_id, status='pending', created_at='2025-01-01 12:00:00', admin_notified=0,
+            **{field: data[field] for field in OrderRow._fields if field in data}
+        ))
+    return lambda: catalog.admin_notification_text(rng.choice(orders))
+
+
+def measure(func, min_time):
+    func()
+    samples = []
+    deadline = time.perf_counter() + min_time
+    while len(samples) < MIN_ITERATIONS or time.perf_counter() < deadline:
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    mean = sum(samples) / len(samples)
+    return {
+        'iterations': len(samples),
+        'mean_us': mean * 1e6,
+        'median_us': samples[len(samples) // 2] * 1e6,
+        'p99_us': samples[min(len(samples) - 1, int(len(samples) * 0.99))] * 1e6,
+        'min_us': samples[0] * 1e6,
+        'ops_per_sec': 1 / mean if mean else None
+    }
+
+
+def git(*args):
+    try:
+        return subprocess.run(
+            ['git', *args], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment(args):
+    return {
+        'commit': git('rev-parse', 'HEAD'),
+        'dirty': bool(git('status', '--porcelain', '--untracked-files=no')),
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'sqlite': sqlite3.sqlite_version,
+        'platform': platform.platform(),
+        'sizes': args.sizes,
+        'min_time': args.min_time
+    }
+
+
+def print_result(result, baseline=None):
+    size = f"{result['size']:,}" if result['size'] else '-'
+    line = (f"{result['name']:<30}{size:>11}{result['iterations']:>10,}"
+            f"{result['median_us']:>12.1f}{result['p99_us']:>12.1f}")
+    if baseline is not None:
+        change = result['median_us'] / baseline['median_us'] - 1
+        line += f"{baseline['median_us']:>12.1f}{change:>+9.1%}"
+    print(line)
+
+
+def run(args):
+    catalog = load_catalog(Config.CATALOG_PATH, Config.SUPPORT_CHAT, Config.ADMIN_CHANNEL)
+    selected = [entry for entry in BENCHMARKS if not args.filter or entry[0].startswith(args.filter)]
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = {(result['name'], result['size']): result for result in json.load(f)['results']}
+
+    header = f"{'benchmark':<30}{'rows':>11}{'calls':>10}{'median us':>12}{'p99 us':>12}"
+    print(header + (f"{'baseline':>12}{'change':>9}" if baseline else ''))
+    results = []
+
+    def record(name, size, func):
+        result = dict(name=name, size=size, **measure(func, args.min_time))
+        results.append(result)
+        print_result(result, baseline.get((name, size)))
+
+    for name, sized, setup in selected:
+        if not sized:
+            record(name, None, setup(Context(catalog)))
+
+    sized = [entry for entry in selected if entry[1]]
+    for size in args.sizes if sized else ():
+        with tempfile.TemporaryDirectory() as tmp:
+            db = Database(os.path.join(tmp, 'orders.db'))
+            start = time.perf_counter()
+            fill_orders(db, size)
+            fill_faqs(db, size)
+            print(f"-- {size:,} orders and FAQs filled in {time.perf_counter() - start:.1f}s")
+            for name, _, setup in sized:
+                record(name, size, setup(Context(catalog, db, size)))
+            db.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)),
+                        help='comma-separated table sizes for the database benchmarks')
+    parser.add_argument('--filter', help='only run benchmarks whose name starts with this')
+    parser.add_argument('--min-time', type=float, default=1.0, help='seconds to time each benchmark for')
+    parser.add_argument('-o', '--output', help='JSON file to write (default: benchmarks/results/<commit>.json)')
+    parser.add_argument('--compare', help='JSON results of an earlier run to compare against')
+    args = parser.parse_args()
+    args.sizes = [int(size) for size in args.sizes.split(',') if size]
+
+    results = run(args)
+    output = args.output
+    if output is None:
+        commit = git('rev-parse', '--short', 'HEAD') or 'unknown'
+        output = os.path.join(ROOT, 'benchmarks', 'results', f'{commit}.json')
+        os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump({'environment': environment(args), 'results': results}, f, indent=2)
+    print(f"Results written to {output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,12 +1,9 @@
+import argparse
+import asyncio
 import os
 import logging
-from telegram import (
-    Update, 
-    InlineKeyboardButton, 
-    InlineKeyboardMarkup,
-    ReplyKeyboardMarkup,
-    KeyboardButton
-)
+import tempfile
+from telegram import Update
 from telegram.ext import (
     Application, 
     CommandHandler, 
@@ -16,9 +13,24 @@ from telegram.ext import (
     ContextTypes,
     ConversationHandler
 )
-import sqlite3
-import json
-from datetime import datetime
+
+from admin_console import CALLBACK_PREFIX, OrdersConsole, parse_filters
+from async_db import AsyncDatabase
+from catalog import CONFIRM, EDIT_ADDONS, PROCEED, SELECT_TIER, TOGGLE_ADDON, CatalogRegistry, load_catalog
+from database import Database
+from dates import parse_date, parse_date_range
+from export import FORMATS, TELEGRAM_PART_SIZE, created_at_range, export_orders, parse_export_args
+from faq_cache import NO_MATCH_TEXT, FaqCache, parse_page_callback, render_answer
+from intent_matcher import FaqMatcher
+from message_editor import MessageEditor
+from metrics import Metrics, MetricsServer, instrument_application
+from handlers import makecv_conv, postajob_conv
+from order_writer import OrderBatchWriter
+from outbound import OutboundScheduler
+from outbox import AdminOutbox
+from persistence import SQLitePersistence
+from router import CallbackRouter
+from update_processor import PerChatUpdateProcessor
 
 # Enable logging
 logging.basicConfig(
@@ -29,282 +41,305 @@ logger = logging.getLogger(__name__)
 
 # Conversation states
 SELECTING_TIER, SELECTING_ADDONS, ENTERING_CONTACT, ENTERING_BUSINESS, SPECIAL_REQUESTS, CONFIRM_ORDER = range(6)
+# What the text steps collect into user_data before an order can be confirmed
+ORDER_DETAILS = ('phone', 'business_name', 'special_requests')
 
 class Config:
     BOT_TOKEN = os.getenv('BOT_TOKEN', 'YOUR_BOT_TOKEN_HERE')
     ADMIN_CHANNEL = os.getenv('ADMIN_CHANNEL', '@habtinfo')  # Your channel username
     SUPPORT_CHAT = os.getenv('SUPPORT_CHAT', '@habtinfo')  # Support group/chat
+    # Comma-separated Telegram user IDs allowed to use the admin commands
+    ADMIN_IDS = [int(user_id) for user_id in os.getenv('ADMIN_IDS', '').split(',') if user_id.strip()]
     
-    SERVICE_TIERS = {
-        'basic': {
-            'name': '📊 Basic Package',
-            'price': 2500,
-            'description': 'Perfect for small businesses starting their social media journey',
-            'features': [
-                '✅ 2 Social Media Platforms',
-                '✅ 5 Posts per week',
-                '✅ Basic Analytics',
-                '✅ Content Creation',
-                '✅ 24/7 Support'
-            ]
-        },
-        'professional': {
-            'name': '🚀 Professional Package',
-            'price': 5000,
-            'description': 'Ideal for growing businesses needing comprehensive management',
-            'features': [
-                '✅ 4 Social Media Platforms',
-                '✅ 10 Posts per week',
-                '✅ Advanced Analytics',
-                '✅ Content Strategy',
-                '✅ Ad Management',
-                '✅ Monthly Reports',
-                '✅ Priority Support'
-            ]
-        },
-        'enterprise': {
-            'name': '🏆 Enterprise Package',
-            'price': 10000,
-            'description': 'Complete solution for established businesses',
-            'features': [
-                '✅ All Social Media Platforms',
-                '✅ 15+ Posts per week',
-                '✅ Competitor Analysis',
-                '✅ Custom Strategy',
-                '✅ Full Ad Campaigns',
-                '✅ Weekly Reports',
-                '✅ Dedicated Account Manager',
-                '✅ 24/7 Premium Support'
-            ]
-        }
-    }
-    
-    ADDON_SERVICES = {
-        'video': {'name': '🎥 Video Content', 'price': 1000},
-        'analytics': {'name': '📈 Advanced Analytics', 'price': 500},
-        'seo': {'name': '🔍 SEO Optimization', 'price': 750},
-        'emergency': {'name': '🚨 24/7 Emergency Support', 'price': 1500}
-    }
-
-class Database:
-    def __init__(self, db_name='orders.db'):
-        self.db_name = db_name
-        self.init_db()
-    
-    def init_db(self):
-        conn = sqlite3.connect(self.db_name)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS orders (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER,
-                username TEXT,
-                first_name TEXT,
-                last_name TEXT,
-                phone TEXT,
-                business_name TEXT,
-                selected_tier TEXT,
-                selected_addons TEXT,
-                total_price INTEGER,
-                special_requests TEXT,
-                status TEXT DEFAULT 'pending',
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                admin_notified INTEGER DEFAULT 0
-            )
-        ''')
-        
-        # Create FAQ table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS faq (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                question TEXT,
-                answer TEXT,
-                category TEXT,
-                is_active INTEGER DEFAULT 1
-            )
-        ''')
-        
-        conn.commit()
-        conn.close()
-        self.insert_sample_faq()
-    
-    def insert_sample_faq(self):
-        conn = sqlite3.connect(self.db_name)
-        cursor = conn.cursor()
-        
-        faqs = [
-            ("What's included in the Basic package?", "The Basic package includes management of 2 social media platforms, 5 posts per week, basic analytics, content creation, and 24/7 support.", "packages"),
-            ("How long does setup take?", "Setup typically takes 1-2 business days after we receive all necessary access and information.", "general"),
-            ("Can I change packages later?", "Yes, you can upgrade or downgrade your package at any time. Changes take effect from the next billing cycle.", "billing"),
-            ("Do you create content?", "Yes! We handle content creation including graphics, captions, and scheduling for all packages.", "services"),
-            ("What platforms do you support?", "We support Facebook, Instagram, Twitter/X, LinkedIn, TikTok, and Telegram.", "services"),
-            ("How do I pay?", "We accept bank transfers, mobile banking (CBE Birr, Telebirr), and cash payments.", "billing"),
-            ("Can I cancel anytime?", "Yes, you can cancel with 30 days notice. No long-term contracts required.", "billing")
-        ]
-        
-        cursor.execute('SELECT COUNT(*) FROM faq')
-        if cursor.fetchone()[0] == 0:
-            cursor.executemany('''
-                INSERT INTO faq (question, answer, category) VALUES (?, ?, ?)
-            ''', faqs)
-        
-        conn.commit()
-        conn.close()
-    
-    def create_order(self, order_data):
-        conn = sqlite3.connect(self.db_name)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT INTO orders (
-                user_id, username, first_name, last_name, phone, 
-                business_name, selected_tier, selected_addons, 
-                total_price, special_requests
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            order_data['user_id'],
-            order_data['username'],
-            order_data['first_name'],
-            order_data['last_name'],
-            order_data['phone'],
-            order_data['business_name'],
-            order_data['selected_tier'],
-            json.dumps(order_data['selected_addons']),
-            order_data['total_price'],
-            order_data['special_requests']
-        ))
-        
-        order_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
-        return order_id
+    # Order inserts are group-committed: up to this many per transaction,
+    # waiting at most this long for a batch to fill
+    ORDER_BATCH_SIZE = int(os.getenv('ORDER_BATCH_SIZE', '50'))
+    ORDER_BATCH_WAIT_MS = float(os.getenv('ORDER_BATCH_WAIT_MS', '5'))
     
-    def mark_admin_notified(self, order_id):
-        conn = sqlite3.connect(self.db_name)
-        cursor = conn.cursor()
-        cursor.execute('UPDATE orders SET admin_notified = 1 WHERE id = ?', (order_id,))
-        conn.commit()
-        conn.close()
+    # Bot API base URL the token is appended to; point it at a local Bot API
+    # server, or at benchmarks/fake_bot_api.py for load tests
+    BOT_API_URL = os.getenv('BOT_API_URL', 'https://api.telegram.org/bot')
     
-    def get_faq_by_category(self, category=None):
-        conn = sqlite3.connect(self.db_name)
-        cursor = conn.cursor()
-        
-        if category:
-            cursor.execute('SELECT question, answer FROM faq WHERE category = ? AND is_active = 1', (category,))
-        else:
-            cursor.execute('SELECT question, answer, category FROM faq WHERE is_active = 1')
-        
-        faqs = cursor.fetchall()
-        conn.close()
-        return faqs
+    # Outbound pacing (messages per second), see OutboundScheduler. Telegram
+    # allows about 30 per second per token; create_post.py keeps 5 of them
+    OUTBOUND_GLOBAL_RATE = float(os.getenv('OUTBOUND_GLOBAL_RATE', '25'))
+    OUTBOUND_CHAT_RATE = float(os.getenv('OUTBOUND_CHAT_RATE', '1'))
+    
+    # Updates from up to this many chats are handled at once; each chat's own
+    # updates are always handled one after another, in order
+    MAX_ACTIVE_CHATS = int(os.getenv('MAX_ACTIVE_CHATS', '16'))
+    MAX_PENDING_UPDATES = int(os.getenv('MAX_PENDING_UPDATES', '1024'))
+    
+    # Updates received but not yet handed to the update processor; when full,
+    # polling pauses and webhook requests wait, so Telegram holds the rest
+    MAX_QUEUED_UPDATES = int(os.getenv('MAX_QUEUED_UPDATES', '1000'))
+    
+    # 'polling' (default) or 'webhook'. The Procfile's web process runs in
+    # webhook mode on $PORT; polling refuses to start while a webhook is set,
+    # so the two never consume updates for the token at the same time
+    RUN_MODE = os.getenv('RUN_MODE', 'polling')
+    WEBHOOK_URL = os.getenv('WEBHOOK_URL')  # Public URL Telegram posts updates to
+    WEBHOOK_LISTEN = os.getenv('WEBHOOK_LISTEN', '0.0.0.0')
+    WEBHOOK_PORT = int(os.getenv('PORT', '8443'))
+    WEBHOOK_PATH = os.getenv('WEBHOOK_PATH', '/telegram')
+    WEBHOOK_SECRET = os.getenv('WEBHOOK_SECRET')  # Required in webhook mode
+    WEBHOOK_MAX_CONNECTIONS = int(os.getenv('WEBHOOK_MAX_CONNECTIONS', '40'))
+    
+    # Pending admin notifications are sent in batches every this many seconds
+    ADMIN_OUTBOX_INTERVAL = float(os.getenv('ADMIN_OUTBOX_INTERVAL', '30'))
+    ADMIN_OUTBOX_BATCH_SIZE = int(os.getenv('ADMIN_OUTBOX_BATCH_SIZE', '20'))
+    
+    # Digest mode: one summary message per window instead of one per order
+    ADMIN_DIGEST = os.getenv('ADMIN_DIGEST', '0') == '1'
+    ADMIN_DIGEST_WINDOW = float(os.getenv('ADMIN_DIGEST_WINDOW', '60'))
+    ADMIN_DIGEST_MAX_ORDERS = int(os.getenv('ADMIN_DIGEST_MAX_ORDERS', '50'))
+    
+    # Free text at least this similar (cosine, 0-1) to a FAQ question is
+    # answered with that FAQ; below it, FAQ keyword search is tried instead
+    FAQ_MATCH_THRESHOLD = float(os.getenv('FAQ_MATCH_THRESHOLD', '0.5'))
+    FAQ_MATCH_BATCH_WAIT_MS = float(os.getenv('FAQ_MATCH_BATCH_WAIT_MS', '5'))
+    
+    # Add-on taps on the same message within this window are rendered as one edit
+    EDIT_DEBOUNCE_MS = float(os.getenv('EDIT_DEBOUNCE_MS', '300'))
+    
+    # Prometheus metrics are served on http://METRICS_HOST:METRICS_PORT/metrics;
+    # set METRICS_PORT=0 to turn the endpoint off
+    METRICS_HOST = os.getenv('METRICS_HOST', '127.0.0.1')
+    METRICS_PORT = int(os.getenv('METRICS_PORT', '9100'))
+    
+    # Seconds between writes of changed conversation/user data to orders.db
+    PERSISTENCE_INTERVAL = float(os.getenv('PERSISTENCE_INTERVAL', '10'))
+    
+    # Service tiers and add-ons with their prices. The file is re-read when it
+    # changes (checked every CATALOG_POLL_INTERVAL seconds, 0 to only reload
+    # on /reloadcatalog); orders already in progress keep their old prices
+    CATALOG_PATH = os.getenv('CATALOG_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'catalog.json'))
+    CATALOG_POLL_INTERVAL = float(os.getenv('CATALOG_POLL_INTERVAL', '30'))
+
+class WebhookInUse(Exception):
+    """Polling was started while Telegram delivers updates to a webhook."""
 
 class SocialMediaBot:
     def __init__(self, token):
         self.token = token
-        self.application = Application.builder().token(token).build()
-        self.db = Database()
+        self.metrics = Metrics()
+        self.db = AsyncDatabase(Database(), calls=self.metrics.calls('db', 'method', 'Database call'))
+        self.persistence = SQLitePersistence(self.db, update_interval=Config.PERSISTENCE_INTERVAL)
+        self.outbound = OutboundScheduler(
+            global_rate=Config.OUTBOUND_GLOBAL_RATE,
+            chat_rate=Config.OUTBOUND_CHAT_RATE,
+            calls=self.metrics.calls('bot_api', 'endpoint', 'Bot API request')
+        )
+        self.update_processor = PerChatUpdateProcessor(
+            max_active_chats=Config.MAX_ACTIVE_CHATS,
+            max_pending_updates=Config.MAX_PENDING_UPDATES
+        )
+        self.application = (
+            Application.builder()
+            .token(token)
+            .base_url(Config.BOT_API_URL)
+            .persistence(self.persistence)
+            .rate_limiter(self.outbound)
+            .concurrent_updates(self.update_processor)
+            .update_queue(asyncio.Queue(maxsize=Config.MAX_QUEUED_UPDATES))
+            .post_init(self.post_init)
+            .post_shutdown(self.post_shutdown)
+            .build()
+        )
+        self.catalogs = CatalogRegistry(
+            Config.CATALOG_PATH,
+            support_chat=Config.SUPPORT_CHAT,
+            admin_channel=Config.ADMIN_CHANNEL
+        )
+        self.faq_cache = FaqCache(self.db)
+        self.editor = MessageEditor(window=Config.EDIT_DEBOUNCE_MS / 1000)
+        self.faq_matcher = FaqMatcher(
+            self.db,
+            threshold=Config.FAQ_MATCH_THRESHOLD,
+            max_wait=Config.FAQ_MATCH_BATCH_WAIT_MS / 1000
+        )
+        self.order_writer = OrderBatchWriter(
+            self.db,
+            max_batch=Config.ORDER_BATCH_SIZE,
+            max_wait=Config.ORDER_BATCH_WAIT_MS / 1000
+        )
+        self.admin_outbox = AdminOutbox(
+            self.db,
+            lambda order: self.catalog.admin_notification_text(order),
+            chat_id=Config.ADMIN_CHANNEL,
+            batch_size=Config.ADMIN_OUTBOX_BATCH_SIZE,
+            render_digest=(lambda orders, limit: self.catalog.admin_digest_text(orders, limit))
+            if Config.ADMIN_DIGEST else None,
+            digest_window=Config.ADMIN_DIGEST_WINDOW,
+            digest_max_orders=Config.ADMIN_DIGEST_MAX_ORDERS
+        )
+        self.orders_console = OrdersConsole(self.db, self.catalogs)
+        self.router = CallbackRouter()
         self.setup_handlers()
+        self.setup_metrics()
+    
+    @property
+    def catalog(self):
+        """The current catalog. Handlers read it once and keep that snapshot,
+        so a reload in between never mixes two versions in one reply."""
+        return self.catalogs.current
+    
+    async def post_init(self, application: Application):
+        if Config.RUN_MODE != 'webhook':
+            # Polling would delete the webhook and take the updates away from
+            # the web process serving it
+            webhook = await application.bot.get_webhook_info()
+            if webhook.url:
+                raise WebhookInUse(webhook.url)
+        self.order_writer.start()
+        await self.faq_cache.load()
+        application.job_queue.run_repeating(
+            self.admin_outbox.dispatch,
+            interval=Config.ADMIN_OUTBOX_INTERVAL,
+            first=1,
+            name='admin_outbox'
+        )
+        if Config.CATALOG_POLL_INTERVAL > 0:
+            application.job_queue.run_repeating(
+                self.poll_catalog,
+                interval=Config.CATALOG_POLL_INTERVAL,
+                first=Config.CATALOG_POLL_INTERVAL,
+                name='catalog_poll'
+            )
+    
+    async def reload_catalog(self, force=False):
+        """Re-read the catalog file off the event loop; returns whether a new
+        version was swapped in. Raises ``OSError``/``ValueError`` if the file
+        is unreadable or invalid, keeping the current catalog."""
+        reload = self.catalogs.reload if force else self.catalogs.reload_if_changed
+        changed = await asyncio.to_thread(reload)
+        if changed:
+            logger.info(f"Catalog version {self.catalog.version} loaded from {Config.CATALOG_PATH}")
+        return changed
+    
+    async def poll_catalog(self, context: ContextTypes.DEFAULT_TYPE):
+        try:
+            await self.reload_catalog()
+        except (OSError, ValueError) as e:
+            logger.error(f"Catalog reload failed, keeping version {self.catalog.version}: {e}")
+    
+    async def post_shutdown(self, application: Application):
+        await self.order_writer.stop()
+    
+    def setup_metrics(self):
+        instrument_application(self.application, self.metrics)
+        # Callback queries all go through router.dispatch; time each route too
+        routes = self.metrics.calls('callback_route', 'route', 'Callback route')
+        for route in self.router.routes.values():
+            route.callback = routes.wrap(route.callback, route.name)
+        
+        self.metrics.gauge(
+            'updates_active', 'Updates being handled right now (one per chat at most).',
+            func=lambda: self.update_processor.active
+        )
+        self.metrics.gauge(
+            'updates_pending', 'Updates handed to handlers but not finished, running or waiting for their chat.',
+            func=lambda: self.update_processor.pending
+        )
+        self.metrics.gauge('db_queue_depth', 'Database calls queued or running.', func=lambda: self.db.pending)
+        self.metrics.gauge(
+            'order_writer_queue_depth', 'Orders waiting to be written.',
+            func=lambda: self.order_writer.pending
+        )
+        self.metrics.gauge(
+            'bot_api_waiting', 'Bot API requests waiting for a rate-limit token.', ['lane'],
+            func=lambda: dict(self.outbound.waiting)
+        )
     
     def setup_handlers(self):
         # Command handlers
         self.application.add_handler(CommandHandler("start", self.start_command))
         self.application.add_handler(CommandHandler("help", self.help_command))
-        self.application.add_handler(CommandHandler("order", self.start_order))
         self.application.add_handler(CommandHandler("services", self.show_services_command))
         self.application.add_handler(CommandHandler("faq", self.faq_command))
         self.application.add_handler(CommandHandler("support", self.support_command))
         self.application.add_handler(CommandHandler("contact", self.contact_command))
         
+        # Admin commands
+        admin_only = filters.User(user_id=Config.ADMIN_IDS)
+        self.application.add_handler(CommandHandler("orders", self.orders_command, filters=admin_only))
+        self.application.add_handler(CommandHandler("export", self.export_command, filters=admin_only, block=False))
+        self.application.add_handler(CommandHandler("stats", self.stats_command, filters=admin_only))
+        self.application.add_handler(CommandHandler("reloadcatalog", self.reload_catalog_command, filters=admin_only))
+        
+        # Every button goes through the router; the handlers below only pick
+        # which routes each conversation state accepts
+        router = self.router
+        router.add('start_order', self.start_order)
+        router.add('back_to_tiers', self.start_order)
+        router.add('cancel_order', self.cancel_order)
+        router.add(SELECT_TIER, self.select_tier, parse=self.catalogs.parse_order_token)
+        router.add(TOGGLE_ADDON, self.select_addons, parse=self.catalogs.parse_order_token)
+        router.add(PROCEED, self.select_addons, parse=self.catalogs.parse_order_token)
+        router.add(CONFIRM, self.confirm_order, parse=self.catalogs.parse_order_token)
+        router.add(EDIT_ADDONS, self.confirm_order, parse=self.catalogs.parse_order_token)
+        router.add('view_services', self.view_services, answer=True)
+        router.add('view_faq', self.faq_command, answer=True)
+        router.add('get_support', self.support_command, answer=True)
+        router.add('contact_admin', self.contact_command, answer=True)
+        router.add('faq', self.show_faq_category, parse=parse_page_callback, answer=True)
+        router.add(CALLBACK_PREFIX, self.orders_page)
+        
+        def routes(*names):
+            return CallbackQueryHandler(router.dispatch, pattern=router.matches(*names))
+        
         # Conversation handler for ordering process
         conv_handler = ConversationHandler(
-            entry_points=[CommandHandler('order', self.start_order)],
+            # Tier and add-on buttons carry their own state, so they work
+            # even where no conversation is in progress
+            entry_points=[CommandHandler('order', self.start_order),
+                          routes('start_order', SELECT_TIER, TOGGLE_ADDON, PROCEED)],
             states={
-                SELECTING_TIER: [CallbackQueryHandler(self.select_tier, pattern='^tier_')],
-                SELECTING_ADDONS: [CallbackQueryHandler(self.select_addons, pattern='^addon_|^proceed_|^back_')],
+                SELECTING_TIER: [routes(SELECT_TIER, 'cancel_order')],
+                SELECTING_ADDONS: [routes(TOGGLE_ADDON, PROCEED, 'back_to_tiers', 'cancel_order')],
                 ENTERING_CONTACT: [MessageHandler(filters.TEXT & ~filters.COMMAND, self.enter_contact),
                                  MessageHandler(filters.CONTACT, self.enter_contact_shared)],
                 ENTERING_BUSINESS: [MessageHandler(filters.TEXT & ~filters.COMMAND, self.enter_business)],
                 SPECIAL_REQUESTS: [MessageHandler(filters.TEXT & ~filters.COMMAND, self.special_requests)],
-                CONFIRM_ORDER: [CallbackQueryHandler(self.confirm_order, pattern='^confirm_|^cancel_|^edit_')]
+                CONFIRM_ORDER: [routes(CONFIRM, EDIT_ADDONS, 'back_to_tiers', 'cancel_order')]
             },
             fallbacks=[CommandHandler('cancel', self.cancel_order)],
-            allow_reentry=True
+            allow_reentry=True,
+            name='order',
+            persistent=True
         )
         
         self.application.add_handler(conv_handler)
-        self.application.add_handler(CallbackQueryHandler(self.button_click))
+        self.application.add_handler(postajob_conv.build_conversation_handler(self.db, persistent=True))
+        self.application.add_handler(makecv_conv.build_conversation_handler(self.db, persistent=True))
+        # Confirm/Edit buttons of an order summary only act inside the order
+        # conversation: a second Confirm tap or an old summary must not submit
+        self.application.add_handler(CallbackQueryHandler(
+            self.order_closed, pattern=router.matches(CONFIRM, EDIT_ADDONS)
+        ))
+        self.application.add_handler(CallbackQueryHandler(router.dispatch))
+        
+        # Private messages no conversation is waiting for are treated as
+        # questions; non-blocking so messages arriving together are matched
+        # against the FAQs as one batch
+        self.application.add_handler(MessageHandler(
+            filters.TEXT & ~filters.COMMAND & filters.ChatType.PRIVATE, self.faq_search_message, block=False
+        ))
     
     async def start_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Send welcome message when command /start is issued."""
         user = update.message.from_user
-        
-        welcome_text = f"""
-👋 *Welcome to Social Media Pro ET*, {user.first_name}!
-
-📱 *Professional Social Media Management Services*
-📍 *Serving Ethiopian Businesses*
-💰 *Prices in Ethiopian Birr*
-
-*Quick Commands:*
-/order - 🛒 Start new order
-/services - 📊 View service packages
-/faq - ❓ Frequently Asked Questions  
-/support - 🆘 Get immediate help
-/contact - 📞 Contact admin directly
-
-*Why Choose Us?*
-✅ Ethiopian Market Expertise
-✅ Affordable Pricing in ETB
-✅ Professional Content Creation
-✅ 24/7 Customer Support
-
-*Start your order with* `/order` or explore our services with `/services`
-        """
-        
-        keyboard = [
-            [InlineKeyboardButton("🛒 Start Order", callback_data="start_order"),
-             InlineKeyboardButton("📊 View Services", callback_data="view_services")],
-            [InlineKeyboardButton("❓ FAQ", callback_data="view_faq"),
-             InlineKeyboardButton("🆘 Support", callback_data="get_support")],
-            [InlineKeyboardButton("📞 Contact Admin", callback_data="contact_admin")]
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
+        catalog = self.catalog
         
         await update.message.reply_text(
-            welcome_text, 
+            catalog.welcome_text(user.first_name), 
             parse_mode='Markdown',
-            reply_markup=reply_markup
+            reply_markup=catalog.welcome_keyboard
         )
     
     async def help_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Send help information."""
-        help_text = f"""
-*🤖 How to Use This Bot:*
-
-*1. Browse Services*  
-Use `/services` to see all packages and pricing
-
-*2. Start Order*
-Use `/order` for step-by-step ordering process
-
-*3. Get Help*
-- `/faq` - Frequently Asked Questions
-- `/support` - Immediate assistance
-- `/contact` - Direct admin contact
-
-*4. Order Process:*
-• Choose service tier
-• Select add-ons
-• Provide contact info
-• Confirm order
-
-*Need Immediate Help?*
-Contact support: {Config.SUPPORT_CHAT}
-        """
-        
-        await update.message.reply_text(help_text, parse_mode='Markdown')
+        await update.message.reply_text(self.catalog.help_text, parse_mode='Markdown')
     
     async def start_order(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Start the order process."""
@@ -318,139 +353,63 @@ Contact support: {Config.SUPPORT_CHAT}
         # Clear any existing user data
         context.user_data.clear()
         
-        # Show service tiers
-        keyboard = []
-        for tier_key, tier in Config.SERVICE_TIERS.items():
-            keyboard.append([
-                InlineKeyboardButton(
-                    f"{tier['name']} - {tier['price']:,} ETB/month", 
-                    callback_data=f"tier_{tier_key}"
-                )
-            ])
-        
-        keyboard.append([InlineKeyboardButton("❌ Cancel", callback_data="cancel_order")])
-        
-        reply_markup = InlineKeyboardMarkup(keyboard)
-        
-        text = """
-*📊 Choose Your Service Package*
-
-Please select one of our service tiers:
-
-*Basic* - 2,500 ETB/month | *Professional* - 5,000 ETB/month | *Enterprise* - 10,000 ETB/month
-
-Click on your preferred package to continue.
-        """
+        catalog = self.catalog
+        text = catalog.tiers_text
+        reply_markup = catalog.tiers_keyboard
         
         if query:
-            await query.edit_message_text(text, parse_mode='Markdown', reply_markup=reply_markup)
+            await self.editor.edit(query.message, text, reply_markup)
         else:
             await message.reply_text(text, parse_mode='Markdown', reply_markup=reply_markup)
         
         return SELECTING_TIER
     
-    async def select_tier(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+    async def stale_order(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Answer a button from an older catalog (prices or packages changed
+        since it was sent) by showing the current packages instead."""
+        context.user_data.clear()
+        catalog = self.catalog
+        await update.callback_query.answer("Our packages have changed, please choose again.")
+        await self.editor.edit(update.callback_query.message, catalog.tiers_text, catalog.tiers_keyboard)
+        return SELECTING_TIER
+    
+    def current_mask(self, message, selection):
+        """The add-on mask ``message`` shows or is about to show.
+        
+        A tap can arrive before the keyboard it was made on has been
+        re-rendered; its token then carries an older mask than the editor's.
+        """
+        tier_key, mask = self.editor.state(message, default=(selection.tier_key, selection.mask))
+        return mask if tier_key == selection.tier_key else selection.mask
+    
+    async def select_tier(self, update: Update, context: ContextTypes.DEFAULT_TYPE, selection):
         """Handle tier selection."""
         query = update.callback_query
+        if selection is None:
+            return await self.stale_order(update, context)
         await query.answer()
         
-        tier_key = query.data.replace('tier_', '')
-        context.user_data['selected_tier'] = tier_key
-        context.user_data['selected_addons'] = []
-        
-        tier = Config.SERVICE_TIERS[tier_key]
-        
-        # Show add-on options
-        keyboard = []
-        for addon_key, addon in Config.ADDON_SERVICES.items():
-            keyboard.append([
-                InlineKeyboardButton(
-                    f"{addon['name']} (+{addon['price']:,} ETB)", 
-                    callback_data=f"addon_{addon_key}"
-                )
-            ])
-        
-        keyboard.append([InlineKeyboardButton("✅ Proceed to Contact", callback_data="proceed_contact")])
-        keyboard.append([InlineKeyboardButton("🔙 Back to Packages", callback_data="back_to_tiers")])
-        keyboard.append([InlineKeyboardButton("❌ Cancel", callback_data="cancel_order")])
-        
-        reply_markup = InlineKeyboardMarkup(keyboard)
-        
-        text = f"""
-*{tier['name']} Selected* - {tier['price']:,} ETB/month
-
-*Package Features:*
-{chr(10).join(tier['features'])}
-
-*💎 Optional Add-on Services:*
-You can enhance your package with these additional services:
-        """
-        
-        await query.edit_message_text(text, parse_mode='Markdown', reply_markup=reply_markup)
+        text, reply_markup = selection.catalog.tier_views[selection.tier_key]
+        await self.editor.edit(query.message, text, reply_markup, state=(selection.tier_key, 0))
         return SELECTING_ADDONS
     
-    async def select_addons(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+    async def select_addons(self, update: Update, context: ContextTypes.DEFAULT_TYPE, selection):
         """Handle add-on selection."""
         query = update.callback_query
-        await query.answer()
+        if selection is None:
+            return await self.stale_order(update, context)
         
-        if query.data == 'proceed_contact':
+        mask = self.current_mask(query.message, selection)
+        if selection.op == PROCEED:
+            # The text steps that follow have no button to carry the selection
+            context.user_data['order_token'] = selection.catalog.order_token(PROCEED, selection.tier_key, mask)
             return await self.enter_contact_info(update, context)
-        elif query.data == 'back_to_tiers':
-            return await self.start_order(update, context)
-        elif query.data == 'cancel_order':
-            return await self.cancel_order(update, context)
-        
-        addon_key = query.data.replace('addon_', '')
-        selected_addons = context.user_data.get('selected_addons', [])
-        
-        if addon_key in selected_addons:
-            selected_addons.remove(addon_key)
-        else:
-            selected_addons.append(addon_key)
-        
-        context.user_data['selected_addons'] = selected_addons
-        
-        # Update the message with current selection
-        tier_key = context.user_data['selected_tier']
-        tier = Config.SERVICE_TIERS[tier_key]
-        
-        total_price = tier['price']
-        addons_text = []
         
-        for addon_key in selected_addons:
-            addon = Config.ADDON_SERVICES[addon_key]
-            total_price += addon['price']
-            addons_text.append(f"✅ {addon['name']} (+{addon['price']:,} ETB)")
-        
-        keyboard = []
-        for addon_key, addon in Config.ADDON_SERVICES.items():
-            status = "✅" if addon_key in selected_addons else "◻️"
-            keyboard.append([
-                InlineKeyboardButton(
-                    f"{status} {addon['name']} (+{addon['price']:,} ETB)", 
-                    callback_data=f"addon_{addon_key}"
-                )
-            ])
-        
-        keyboard.append([InlineKeyboardButton("✅ Proceed to Contact", callback_data="proceed_contact")])
-        keyboard.append([InlineKeyboardButton("🔙 Back to Packages", callback_data="back_to_tiers")])
-        keyboard.append([InlineKeyboardButton("❌ Cancel", callback_data="cancel_order")])
-        
-        reply_markup = InlineKeyboardMarkup(keyboard)
-        
-        text = f"""
-*{tier['name']} Selected* - {tier['price']:,} ETB/month
-
-*Selected Add-ons:*
-{chr(10).join(addons_text) if addons_text else 'No add-ons selected'}
-
-*💰 Total Monthly Price: {total_price:,} ETB*
-
-*Optional Add-on Services:*
-        """
-        
-        await query.edit_message_text(text, parse_mode='Markdown', reply_markup=reply_markup)
+        await query.answer()
+        # Rapid taps are coalesced: only the latest selection gets rendered
+        mask ^= 1 << selection.addon
+        text, reply_markup = selection.catalog.addon_views[selection.tier_key, mask]
+        await self.editor.edit_soon(query.message, text, reply_markup, state=(selection.tier_key, mask))
         return SELECTING_ADDONS
     
     async def enter_contact_info(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -462,22 +421,12 @@ You can enhance your package with these additional services:
         else:
             message = update.message
         
-        # Create contact sharing button
-        contact_keyboard = [[KeyboardButton("📱 Share Phone Number", request_contact=True)]]
-        reply_markup = ReplyKeyboardMarkup(contact_keyboard, one_time_keyboard=True, resize_keyboard=True)
-        
-        text = """
-*📞 Contact Information*
-
-Please share your phone number using the button below, or type it manually.
-
-*Format:* +251 XXX XXX XXX or 09XXXXXXXX
-
-This helps us contact you to discuss your order details.
-        """
+        catalog = self.catalog
+        text = catalog.contact_prompt_text
+        reply_markup = catalog.contact_request_keyboard
         
         if query:
-            await query.edit_message_text(text, parse_mode='Markdown')
+            await self.editor.edit(query.message, text)
             await context.bot.send_message(
                 chat_id=query.message.chat_id,
                 text="Please share your phone number:",
@@ -507,11 +456,11 @@ This helps us contact you to discuss your order details.
     async def enter_business_prompt(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Prompt for business information."""
         # Remove the contact keyboard
-        remove_keyboard = ReplyKeyboardRemove()
+        catalog = self.catalog
         await update.message.reply_text(
-            "✅ *Phone number saved!*\n\nNow, please tell us your *business name*:",
+            catalog.business_prompt_text,
             parse_mode='Markdown',
-            reply_markup=remove_keyboard
+            reply_markup=catalog.remove_keyboard
         )
     
     async def enter_business(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -519,22 +468,7 @@ This helps us contact you to discuss your order details.
         business_name = update.message.text
         context.user_data['business_name'] = business_name
         
-        text = """
-*💼 Special Requests & Requirements*
-
-Do you have any specific requirements for your social media management?
-
-*Examples:*
-- Target audience details
-- Preferred content style (formal/casual)
-- Specific platforms to focus on
-- Campaign goals or KPIs
-- Brand guidelines
-
-Type your requests or type *'None'* if no special requirements.
-        """
-        
-        await update.message.reply_text(text, parse_mode='Markdown')
+        await update.message.reply_text(self.catalog.special_requests_prompt_text, parse_mode='Markdown')
         return SPECIAL_REQUESTS
     
     async def special_requests(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -545,70 +479,42 @@ Type your requests or type *'None'* if no special requirements.
         
         context.user_data['special_requests'] = special_requests
         
-        # Calculate total price
-        tier_key = context.user_data['selected_tier']
-        tier = Config.SERVICE_TIERS[tier_key]
-        total_price = tier['price']
-        
-        selected_addons = context.user_data.get('selected_addons', [])
-        addons_text = []
-        
-        for addon_key in selected_addons:
-            addon = Config.ADDON_SERVICES[addon_key]
-            total_price += addon['price']
-            addons_text.append(f"• {addon['name']} (+{addon['price']:,} ETB)")
-        
-        # Create order summary
-        text = f"""
-*📋 Order Summary - Please Review*
-
-*Service Package:*
-{tier['name']} - {tier['price']:,} ETB/month
-
-*Add-on Services:*
-{chr(10).join(addons_text) if addons_text else '• None selected'}
-
-*Business Name:*
-{context.user_data['business_name']}
-
-*Special Requests:*
-{special_requests}
-
-*💰 Total Monthly Price: {total_price:,} ETB*
-
-*✅ Please confirm your order below. Our team will contact you within 24 hours.*
-        """
-        
-        context.user_data['total_price'] = total_price
-        
-        keyboard = [
-            [InlineKeyboardButton("✅ Confirm & Submit Order", callback_data="confirm_order")],
-            [InlineKeyboardButton("🔙 Edit Add-ons", callback_data="back_to_addons"),
-             InlineKeyboardButton("🔙 Edit Package", callback_data="back_to_tiers")],
-            [InlineKeyboardButton("❌ Cancel Order", callback_data="cancel_order")]
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
+        # Summarised with the catalog the order was started with
+        selection = self.catalogs.parse_order_token(context.user_data.get('order_token', ''))
+        if selection is None:
+            await update.message.reply_text(
+                "Our packages have changed, please choose again.",
+                reply_markup=self.catalog.tiers_keyboard
+            )
+            return SELECTING_TIER
+        catalog, tier_key, mask = selection.catalog, selection.tier_key, selection.mask
+        text = catalog.order_summary_text(
+            tier_key, mask, context.user_data['business_name'], special_requests
+        )
         
-        await update.message.reply_text(text, parse_mode='Markdown', reply_markup=reply_markup)
+        await update.message.reply_text(
+            text, parse_mode='Markdown', reply_markup=catalog.confirm_keyboards[tier_key, mask]
+        )
         return CONFIRM_ORDER
     
-    async def confirm_order(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+    async def confirm_order(self, update: Update, context: ContextTypes.DEFAULT_TYPE, selection):
         """Finalize the order."""
         query = update.callback_query
+        if selection is None:
+            return await self.stale_order(update, context)
+        if not all(key in context.user_data for key in ORDER_DETAILS):
+            return await self.order_closed(update, context)
         await query.answer()
         
-        if query.data == 'cancel_order':
-            await query.edit_message_text("❌ *Order cancelled.* Use `/order` to start a new order when you're ready.", parse_mode='Markdown')
-            return ConversationHandler.END
-        elif query.data in ['back_to_addons', 'back_to_tiers']:
-            if query.data == 'back_to_addons':
-                return await self.select_tier(update, context)
-            else:
-                return await self.start_order(update, context)
+        if selection.op == EDIT_ADDONS:
+            text, reply_markup = selection.catalog.addon_views[selection.tier_key, selection.mask]
+            await self.editor.edit(query.message, text, reply_markup, state=(selection.tier_key, selection.mask))
+            return SELECTING_ADDONS
         
         user = query.from_user
+        catalog = selection.catalog
         
-        # Save order to database
+        # Save order to database, at the prices the order was started with
         order_data = {
             'user_id': user.id,
             'username': user.username,
@@ -616,20 +522,20 @@ Type your requests or type *'None'* if no special requirements.
             'last_name': user.last_name,
             'phone': context.user_data['phone'],
             'business_name': context.user_data['business_name'],
-            'selected_tier': context.user_data['selected_tier'],
-            'selected_addons': context.user_data.get('selected_addons', []),
-            'total_price': context.user_data['total_price'],
+            'selected_tier': selection.tier_key,
+            'selected_addons': catalog.addons_for(selection.mask),
+            'total_price': catalog.totals[selection.tier_key, selection.mask],
             'special_requests': context.user_data['special_requests']
         }
         
-        order_id = self.db.create_order(order_data)
+        order_id = await self.order_writer.submit(order_data)
         
         # Send confirmation to user
         user_text = f"""
 *🎉 Order Submitted Successfully!*
 
 *Order ID:* #{order_id}
-*Service Package:* {Config.SERVICE_TIERS[order_data['selected_tier']]['name']}
+*Service Package:* {catalog.tier_name(order_data['selected_tier'])}
 *Total Monthly:* {order_data['total_price']:,} ETB
 
 *📞 What Happens Next:*
@@ -644,69 +550,32 @@ Contact support: {Config.SUPPORT_CHAT}
 Thank you for choosing Social Media Pro ET! 🚀
         """
         
-        await query.edit_message_text(user_text, parse_mode='Markdown')
+        await self.editor.edit(query.message, user_text)
         
-        # Send notification to admin channel
-        await self.send_admin_notification(order_id, order_data, user)
+        # The admin channel is notified from the outbox, off the user's path
+        self.admin_outbox.kick(context.job_queue)
         
+        context.user_data.clear()
         return ConversationHandler.END
     
-    async def send_admin_notification(self, order_id, order_data, user):
-        """Send order notification to admin channel."""
-        try:
-            tier = Config.SERVICE_TIERS[order_data['selected_tier']]
-            addons_text = ""
-            
-            if order_data['selected_addons']:
-                addons_text = "\n*Add-ons:*\n" + "\n".join([
-                    f"• {Config.ADDON_SERVICES[addon]['name']} (+{Config.ADDON_SERVICES[addon]['price']:,} ETB)"
-                    for addon in order_data['selected_addons']
-                ])
-            
-            admin_text = f"""
-🚨 *NEW ORDER RECEIVED* 🚨
-
-*Order ID:* #{order_id}
-*Customer:* {user.first_name} {user.last_name or ''} (@{user.username or 'No username'})
-*Business:* {order_data['business_name']}
-*Phone:* {order_data['phone']}
-
-*Service Package:*
-{tier['name']} - {tier['price']:,} ETB/month
-{addons_text}
-
-*Total Monthly:* {order_data['total_price']:,} ETB
-
-*Special Requests:*
-{order_data['special_requests']}
-
-*Customer Info:*
-User ID: {user.id}
-Username: @{user.username or 'N/A'}
-Name: {user.first_name} {user.last_name or ''}
-
-*Action Required:* Contact customer within 24 hours
-            """
-            
-            # Send to admin channel (you'll need to handle this properly)
-            # For now, we'll log it and you can set up proper channel integration
-            logger.info(f"NEW ORDER: {admin_text}")
-            
-            # If you have a channel ID, uncomment and use:
-            # await self.application.bot.send_message(
-            #     chat_id=Config.ADMIN_CHANNEL,
-            #     text=admin_text,
-            #     parse_mode='Markdown'
-            # )
-            
-            self.db.mark_admin_notified(order_id)
-            
-        except Exception as e:
-            logger.error(f"Error sending admin notification: {e}")
+    async def order_closed(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Answer a summary button of an order that was already submitted,
+        cancelled or restarted."""
+        await update.callback_query.answer(
+            "This order is already submitted or closed. Use /order to start a new one.", show_alert=True
+        )
+        return ConversationHandler.END
     
     async def cancel_order(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Cancel the order process."""
-        if update.message:
+        context.user_data.clear()
+        if update.callback_query:
+            await update.callback_query.answer()
+            await self.editor.edit(
+                update.callback_query.message,
+                "❌ *Order cancelled.* Use `/order` to start a new order when you're ready."
+            )
+        elif update.message:
             await update.message.reply_text(
                 "❌ Order process cancelled. Use `/order` to start again when you're ready!",
                 parse_mode='Markdown'
@@ -719,158 +588,172 @@ Name: {user.first_name} {user.last_name or ''}
     
     async def show_services(self, message):
         """Show all available services."""
-        text = """
-*📊 Our Service Packages - Prices in ETB*
-
-*Basic Package - 2,500 ETB/month*
-• 2 Social Media Platforms
-• 5 Posts per week
-• Basic Analytics
-• Content Creation
-• 24/7 Support
-
-*Professional Package - 5,000 ETB/month*
-• 4 Social Media Platforms  
-• 10 Posts per week
-• Advanced Analytics
-• Content Strategy
-• Ad Management
-• Monthly Reports
-• Priority Support
-
-*Enterprise Package - 10,000 ETB/month*
-• All Social Media Platforms
-• 15+ Posts per week
-• Competitor Analysis
-• Custom Strategy
-• Full Ad Campaigns
-• Weekly Reports
-• Dedicated Account Manager
-• 24/7 Premium Support
-
-*💎 Add-on Services:*
-• Video Content Creation: +1,000 ETB
-• Advanced Analytics: +500 ETB  
-• SEO Optimization: +750 ETB
-• Emergency Support: +1,500 ETB
-
-*Ready to order?* Use `/order` to get started!
-        """
-        
-        keyboard = [[InlineKeyboardButton("🛒 Start Order", callback_data="start_order")]]
-        reply_markup = InlineKeyboardMarkup(keyboard)
-        
-        await message.reply_text(text, parse_mode='Markdown', reply_markup=reply_markup)
+        catalog = self.catalog
+        await message.reply_text(
+            catalog.services_text,
+            parse_mode='Markdown',
+            reply_markup=catalog.services_keyboard
+        )
     
     async def faq_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
-        """Show FAQ categories."""
-        keyboard = [
-            [InlineKeyboardButton("📦 Packages", callback_data="faq_packages"),
-             InlineKeyboardButton("💰 Billing", callback_data="faq_billing")],
-            [InlineKeyboardButton("🛠️ Services", callback_data="faq_services"),
-             InlineKeyboardButton("❓ General", callback_data="faq_general")],
-            [InlineKeyboardButton("🛒 Start Order", callback_data="start_order")]
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
-        
-        text = """
-*❓ Frequently Asked Questions*
-
-Choose a category to browse FAQs, or use `/order` to start your service request.
-        """
-        
+        """Show FAQ categories, or search them with /faq <question>."""
+        if context.args:
+            await self.answer_question(update, ' '.join(context.args))
+            return
+        await update.effective_message.reply_text(
+            self.catalog.faq_text,
+            parse_mode='Markdown',
+            reply_markup=self.catalog.faq_keyboard
+        )
+    
+    async def faq_search_message(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Answer a plain-text message that no conversation handled from the FAQ."""
+        match = await self.faq_matcher.match(update.message.text)
+        if match is None:
+            await self.answer_question(update, update.message.text)
+            return
+        text, reply_markup = render_answer(match.question, match.answer)
         await update.message.reply_text(text, parse_mode='Markdown', reply_markup=reply_markup)
     
+    async def answer_question(self, update: Update, query):
+        """Reply with the best matching FAQs, or the categories if none match."""
+        result = await self.faq_cache.search(query)
+        if result is None:
+            await update.effective_message.reply_text(
+                NO_MATCH_TEXT,
+                reply_markup=self.catalog.faq_keyboard
+            )
+            return
+        text, reply_markup = result
+        await update.effective_message.reply_text(text, parse_mode='Markdown', reply_markup=reply_markup)
+    
     async def support_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Provide support information."""
-        text = f"""
-*🆘 Customer Support*
-
-*Immediate Assistance:*
-- Support Chat: {Config.SUPPORT_CHAT}
-- Email: support@yourdomain.com
-- Phone: +251 XXX XXX XXX
-
-*Business Hours:*
-Monday-Friday: 8:00 AM - 6:00 PM EAT
-Saturday: 9:00 AM - 2:00 PM EAT
-
-*Emergency Support:*
-Available 24/7 for enterprise customers
-
-*Before contacting support, check* `/faq` *for quick answers.*
-        """
-        
-        keyboard = [
-            [InlineKeyboardButton("❓ FAQ", callback_data="view_faq"),
-             InlineKeyboardButton("📞 Contact", callback_data="contact_admin")],
-            [InlineKeyboardButton("📊 Services", callback_data="view_services")]
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
-        
-        await update.message.reply_text(text, parse_mode='Markdown', reply_markup=reply_markup)
+        await update.effective_message.reply_text(
+            self.catalog.support_text,
+            parse_mode='Markdown',
+            reply_markup=self.catalog.support_keyboard
+        )
     
     async def contact_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Direct contact information."""
-        text = f"""
-*📞 Direct Contact Information*
-
-*For Sales & Orders:*
-- Telegram: {Config.ADMIN_CHANNEL}
-- Phone: +251 XXX XXX XXX
-- Email: sales@yourdomain.com
-
-*For Support:*
-- Support: {Config.SUPPORT_CHAT}
-- Email: support@yourdomain.com
-
-*Office Address:*
-[Your physical address in Ethiopia]
-
-*We typically respond within 1-2 hours during business hours.*
-        """
+        await update.effective_message.reply_text(self.catalog.contact_text, parse_mode='Markdown')
+    
+    async def view_services(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Show services from a button."""
+        await self.show_services(update.callback_query.message)
+    
+    async def orders_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Admin: browse orders, e.g. /orders pending tier=basic from=2025-01-01 to=2025-01-31"""
+        try:
+            order_filters = parse_filters(context.args, self.orders_console.tier_keys)
+        except ValueError as e:
+            await update.message.reply_text(f"❌ {e}")
+            return
         
-        await update.message.reply_text(text, parse_mode='Markdown')
+        text, reply_markup = await self.orders_console.render(order_filters)
+        await update.message.reply_text(text, reply_markup=reply_markup)
     
-    async def button_click(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
-        """Handle button clicks."""
+    async def orders_page(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Admin: show the page an orders console button points at."""
         query = update.callback_query
-        await query.answer()
-        
-        if query.data == 'start_order':
-            await self.start_order(update, context)
-        elif query.data == 'view_services':
-            await self.show_services(query.message)
-        elif query.data == 'view_faq':
-            await self.faq_command(update, context)
-        elif query.data == 'get_support':
-            await self.support_command(update, context)
-        elif query.data == 'contact_admin':
-            await self.contact_command(update, context)
-        elif query.data.startswith('faq_'):
-            category = query.data.replace('faq_', '')
-            await self.show_faq_category(query, category)
-    
-    async def show_faq_category(self, query, category):
-        """Show FAQ for specific category."""
-        faqs = self.db.get_faq_by_category(category)
+        if query.from_user.id not in Config.ADMIN_IDS:
+            await query.answer()
+            return
         
-        if not faqs:
-            text = "No FAQs found for this category."
-        else:
-            text = f"*❓ {category.title()} FAQs*\n\n"
-            for i, (question, answer) in enumerate(faqs, 1):
-                text += f"*{i}. {question}*\n{answer}\n\n"
+        try:
+            order_filters, after, before = self.orders_console.decode(query.data)
+        except ValueError as e:
+            await query.answer(f"❌ {e}", show_alert=True)
+            return
         
-        keyboard = [
-            [InlineKeyboardButton("🔙 Back to FAQ", callback_data="view_faq"),
-             InlineKeyboardButton("🛒 Start Order", callback_data="start_order")]
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
+        await query.answer()
+        text, reply_markup = await self.orders_console.render(order_filters, after=after, before=before)
+        await query.edit_message_text(text, reply_markup=reply_markup)
+    
+    async def export_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Admin: send orders as gzipped CSV/JSONL, e.g. /export csv from=2025-01-01 to=2025-01-31"""
+        try:
+            fmt, status, since, until = parse_export_args(context.args)
+        except ValueError as e:
+            await update.message.reply_text(f"❌ {e}")
+            return
+        
+        since, until = created_at_range(since, until)
+        await update.message.reply_text("⏳ Exporting orders...")
+        with tempfile.TemporaryDirectory() as directory:
+            # Streams from its own pool connection, off the database thread
+            orders = self.db.sync.iter_orders(status=status, since=since, until=until)
+            parts = await asyncio.to_thread(
+                export_orders, orders, os.path.join(directory, 'orders'), fmt,
+                addon_keys=self.catalog.addon_keys, part_size=TELEGRAM_PART_SIZE
+            )
+            
+            for number, (path, rows) in enumerate(parts, 1):
+                caption = f"📦 {rows:,} orders"
+                if len(parts) > 1:
+                    caption += f" (part {number}/{len(parts)})"
+                with open(path, 'rb') as document:
+                    await update.message.reply_document(
+                        document, filename=os.path.basename(path), caption=caption, write_timeout=300
+                    )
+    
+    async def stats_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Admin: revenue and add-on stats, e.g. /stats from=2025-01-01 to=2025-01-31 (default: last 30 days)"""
+        try:
+            since, until = parse_date_range(context.args)
+        except ValueError as e:
+            await update.message.reply_text(f"❌ {e}")
+            return
         
-        await query.edit_message_text(text, parse_mode='Markdown', reply_markup=reply_markup)
+        rows = await self.db.get_order_stats(since.isoformat(), until.isoformat())
+        text = self.catalog.stats_text(rows, since.isoformat(), until.isoformat())
+        await update.message.reply_text(text, parse_mode='Markdown')
+    
+    async def reload_catalog_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Admin: re-read the catalog file now instead of waiting for the next poll."""
+        try:
+            changed = await self.reload_catalog(force=True)
+        except (OSError, ValueError) as e:
+            await update.message.reply_text(f"❌ Catalog not reloaded, keeping version {self.catalog.version}: {e}")
+            return
+        if changed:
+            await update.message.reply_text(f"✅ Catalog version {self.catalog.version} is live")
+        else:
+            await update.message.reply_text(f"Catalog unchanged (version {self.catalog.version})")
+    
+    async def show_faq_category(self, update: Update, context: ContextTypes.DEFAULT_TYPE, target):
+        """Show FAQ for specific category."""
+        category, page = target
+        text, reply_markup = await self.faq_cache.get_page(category, page)
+        await update.callback_query.edit_message_text(text, parse_mode='Markdown', reply_markup=reply_markup)
+
+def export_main(args):
+    """Write orders to a gzip-compressed file without starting the bot."""
+    since, until = created_at_range(args.since, args.until)
+    catalog = load_catalog(Config.CATALOG_PATH, Config.SUPPORT_CHAT, Config.ADMIN_CHANNEL)
+    db = Database()
+    try:
+        orders = db.iter_orders(status=args.status, since=since, until=until)
+        parts = export_orders(
+            orders, args.output, args.format,
+            addon_keys=catalog.addon_keys, part_size=args.part_size
+        )
+    finally:
+        db.close()
+    for path, rows in parts:
+        print(f"✅ {rows:,} orders -> {path}")
+
+def rebuild_stats_main(args):
+    """Regenerate the order_stats aggregates from the orders table."""
+    db = Database()
+    try:
+        db.rebuild_order_stats()
+    finally:
+        db.close()
+    print("✅ Order stats rebuilt")
 
-def main():
+def run_bot():
     """Start the bot."""
     bot_token = Config.BOT_TOKEN
     
@@ -879,18 +762,79 @@ def main():
         print("💡 Get token from @BotFather on Telegram")
         return
     
+    if Config.RUN_MODE == 'webhook' and not Config.WEBHOOK_SECRET:
+        print("❌ ERROR: Webhook mode needs WEBHOOK_SECRET, or anyone could post forged updates!")
+        print("💡 Set it to a random string of letters, digits, _ and -")
+        return
+    
+    if Config.RUN_MODE == 'webhook' and not Config.WEBHOOK_URL:
+        print("❌ ERROR: Webhook mode needs WEBHOOK_URL, the public URL Telegram posts updates to!")
+        return
+    
+    bot = None
+    metrics_server = None
     try:
         bot = SocialMediaBot(bot_token)
+        if Config.METRICS_PORT:
+            metrics_server = MetricsServer(bot.metrics, Config.METRICS_HOST, Config.METRICS_PORT)
+            try:
+                metrics_server.start()
+            except OSError as e:
+                print(f"❌ ERROR: Cannot serve metrics on {Config.METRICS_HOST}:{Config.METRICS_PORT}: {e.strerror}")
+                print("💡 Stop whatever holds that port, or set METRICS_PORT=0 to turn metrics off")
+                return
         print("🤖 Bot is starting...")
         print("✅ Services: Loaded")
         print("✅ Database: Initialized")
         print("✅ Handlers: Configured")
         print("🚀 Bot is ready! Press Ctrl+C to stop")
         
-        bot.application.run_polling()
+        if Config.RUN_MODE == 'webhook':
+            bot.application.run_webhook(
+                listen=Config.WEBHOOK_LISTEN,
+                port=Config.WEBHOOK_PORT,
+                url_path=Config.WEBHOOK_PATH.lstrip('/'),
+                webhook_url=Config.WEBHOOK_URL,
+                secret_token=Config.WEBHOOK_SECRET,
+                allowed_updates=Update.ALL_TYPES,
+                max_connections=Config.WEBHOOK_MAX_CONNECTIONS
+            )
+        else:
+            bot.application.run_polling()
+    except WebhookInUse as e:
+        print(f"❌ ERROR: A webhook is set to {e}, so a web process receives the updates!")
+        print("💡 Stop it and call deleteWebhook before polling, or run with RUN_MODE=webhook")
     except Exception as e:
         print(f"❌ Error starting bot: {e}")
         print("💡 Check your BOT_TOKEN and internet connection")
+    finally:
+        if metrics_server is not None:
+            metrics_server.stop()
+        if bot is not None:
+            bot.db.close()
+
+def main():
+    parser = argparse.ArgumentParser(description='Social media services bot')
+    commands = parser.add_subparsers(dest='command')
+    commands.add_parser('run', help='Run the bot (default)')
+    
+    export_parser = commands.add_parser('export', help='Export orders to gzip-compressed CSV or JSONL')
+    export_parser.add_argument('--format', choices=FORMATS, default='csv')
+    export_parser.add_argument('--status', help='Only orders with this status')
+    export_parser.add_argument('--from', dest='since', type=parse_date, help='First day, YYYY-MM-DD')
+    export_parser.add_argument('--to', dest='until', type=parse_date, help='Last day, YYYY-MM-DD')
+    export_parser.add_argument('--output', '-o', default='orders', help='Output path without extension')
+    export_parser.add_argument('--part-size', type=int, help='Split into parts of about this many bytes')
+    
+    commands.add_parser('rebuild-stats', help='Regenerate the /stats aggregates from all orders')
+    
+    args = parser.parse_args()
+    if args.command == 'export':
+        export_main(args)
+    elif args.command == 'rebuild-stats':
+        rebuild_stats_main(args)
+    else:
+        run_bot()
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
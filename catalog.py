@@ -0,0 +1,697 @@
+import hashlib
+import json
+import os
+import re
+from collections import OrderedDict
+from typing import Any, NamedTuple, Optional
+
+from telegram import (
+    InlineKeyboardButton,
+    InlineKeyboardMarkup,
+    KeyboardButton,
+    ReplyKeyboardMarkup,
+    ReplyKeyboardRemove
+)
+from telegram.helpers import escape_markdown
+
+
+# Order flow buttons carry the whole selection in their callback_data as
+# ``<route>:<catalog version>:<tier index>:<add-on mask, hex>[:<add-on index>]``
+TOKEN_PATTERN = re.compile(r'^(o[a-z]):([0-9a-f]+):(\d+):([0-9a-f]+)(?::(\d+))?$')
+SELECT_TIER = 'ot'
+TOGGLE_ADDON = 'oa'
+PROCEED = 'op'
+CONFIRM = 'oc'
+EDIT_ADDONS = 'oe'
+
+# Every add-on mask gets a pre-rendered screen, so keep 2 ** add-ons small
+MAX_ADDONS = 8
+
+# Telegram's limit on a message's text
+MAX_MESSAGE_LENGTH = 4096
+# Longest typed-in business name and phone shown in admin messages; the
+# special requests get whatever room is left
+MAX_BUSINESS_NAME = 200
+MAX_PHONE = 64
+
+
+class OrderSelection(NamedTuple):
+    op: str
+    tier_key: str
+    mask: int
+    addon: Optional[int]
+    catalog: Any = None  # the Catalog the token was made by
+
+
+
+def message_length(text):
+    """Length of ``text`` as Telegram counts it, in UTF-16 code units."""
+    return len(text.encode('utf-16-le')) // 2
+
+
+def clip(text, limit):
+    """``text`` cut to at most ``limit`` characters, marked with an ellipsis."""
+    return text if len(text) <= limit else text[:max(limit - 1, 0)] + '…'
+
+
+def clip_escaped(text, room):
+    """Longest start of ``text``, plus an ellipsis, that is at most ``room``
+    units long once Markdown-escaped."""
+    used = 1
+    for index, char in enumerate(text):
+        used += message_length(escape_markdown(char))
+        if used > room:
+            return text[:index] + '…'
+    return text
+
+
+def _markup(rows):
+    return InlineKeyboardMarkup(rows)
+
+
+def catalog_version(service_tiers, addon_services):
+    """Short digest of everything a token refers to by index or price."""
+    blob = json.dumps([service_tiers, addon_services], sort_keys=True, ensure_ascii=False)
+    return hashlib.blake2b(blob.encode(), digest_size=4).hexdigest()
+
+
+class Catalog:
+    """Every static message and keyboard the bot sends, built once.
+
+    Texts that only depend on the service tiers, add-ons and contact settings
+    are rendered in ``__init__``; handlers just look them up. Add-ons are
+    identified by a bitmask in ``addon_keys`` order, and the add-on selection
+    screen is pre-rendered for every tier and every mask.
+
+    The order flow keeps no selection state on the server: its buttons carry
+    an order token (see ``order_token``) with the tier, the add-on mask and
+    ``version``, so a button from an older catalog is recognised as stale.
+
+    A catalog is never modified once built; ``CatalogRegistry`` replaces it
+    with a new one when the catalog file changes.
+    """
+
+    def __init__(self, service_tiers, addon_services, support_chat, admin_channel):
+        self.service_tiers = service_tiers
+        self.addon_services = addon_services
+        self.addon_keys = list(addon_services)
+        self.addon_bits = {key: 1 << i for i, key in enumerate(self.addon_keys)}
+        self.addon_masks = range(1 << len(self.addon_keys))
+        self.tier_keys = list(service_tiers)
+        self.version = catalog_version(service_tiers, addon_services)
+
+        self.welcome_keyboard = _markup([
+            [InlineKeyboardButton("🛒 Start Order", callback_data="start_order"),
+             InlineKeyboardButton("📊 View Services", callback_data="view_services")],
+            [InlineKeyboardButton("❓ FAQ", callback_data="view_faq"),
+             InlineKeyboardButton("🆘 Support", callback_data="get_support")],
+            [InlineKeyboardButton("📞 Contact Admin", callback_data="contact_admin")]
+        ])
+        self.help_text = self._help_text(support_chat)
+        self.services_text = self._services_text()
+        self.services_keyboard = _markup([[InlineKeyboardButton("🛒 Start Order", callback_data="start_order")]])
+        self.faq_text = """
+*❓ Frequently Asked Questions*
+
+Choose a category to browse FAQs, or use `/order` to start your service request.
+        """
+        self.faq_keyboard = _markup([
+            [InlineKeyboardButton("📦 Packages", callback_data="faq:packages"),
+             InlineKeyboardButton("💰 Billing", callback_data="faq:billing")],
+            [InlineKeyboardButton("🛠️ Services", callback_data="faq:services"),
+             InlineKeyboardButton("❓ General", callback_data="faq:general")],
+            [InlineKeyboardButton("🛒 Start Order", callback_data="start_order")]
+        ])
+        self.support_text = self._support_text(support_chat)
+        self.support_keyboard = _markup([
+            [InlineKeyboardButton("❓ FAQ", callback_data="view_faq"),
+             InlineKeyboardButton("📞 Contact", callback_data="contact_admin")],
+            [InlineKeyboardButton("📊 Services", callback_data="view_services")]
+        ])
+        self.contact_text = self._contact_text(support_chat, admin_channel)
+
+        self.tiers_text = self._tiers_text()
+        self.tiers_keyboard = _markup(
+            [[InlineKeyboardButton(f"{tier['name']} - {tier['price']:,} ETB/month",
+                                   callback_data=self.order_token(SELECT_TIER, tier_key))]
+             for tier_key, tier in service_tiers.items()]
+            + [[InlineKeyboardButton("❌ Cancel", callback_data="cancel_order")]]
+        )
+
+        self.totals = {
+            (tier_key, mask): tier['price'] + sum(
+                addon_services[key]['price'] for key in self.addons_for(mask))
+            for tier_key, tier in service_tiers.items()
+            for mask in self.addon_masks
+        }
+        self.tier_views = {
+            tier_key: (self._tier_text(tier), self._addons_keyboard(tier_key, 0, markers=False))
+            for tier_key, tier in service_tiers.items()
+        }
+        self.addon_views = {
+            (tier_key, mask): (self._addons_text(tier_key, mask), self._addons_keyboard(tier_key, mask))
+            for tier_key in service_tiers
+            for mask in self.addon_masks
+        }
+        self.summary_addons = {mask: self._summary_addons_text(mask) for mask in self.addon_masks}
+
+        self.contact_prompt_text = """
+*📞 Contact Information*
+
+Please share your phone number using the button below, or type it manually.
+
+*Format:* +251 XXX XXX XXX or 09XXXXXXXX
+
+This helps us contact you to discuss your order details.
+        """
+        self.contact_request_keyboard = ReplyKeyboardMarkup(
+            [[KeyboardButton("📱 Share Phone Number", request_contact=True)]],
+            one_time_keyboard=True,
+            resize_keyboard=True
+        )
+        self.remove_keyboard = ReplyKeyboardRemove()
+        self.business_prompt_text = "✅ *Phone number saved!*\n\nNow, please tell us your *business name*:"
+        self.special_requests_prompt_text = """
+*💼 Special Requests & Requirements*
+
+Do you have any specific requirements for your social media management?
+
+*Examples:*
+- Target audience details
+- Preferred content style (formal/casual)
+- Specific platforms to focus on
+- Campaign goals or KPIs
+- Brand guidelines
+
+Type your requests or type *'None'* if no special requirements.
+        """
+        self.confirm_keyboards = {
+            (tier_key, mask): _markup([
+                [InlineKeyboardButton("✅ Confirm & Submit Order",
+                                      callback_data=self.order_token(CONFIRM, tier_key, mask))],
+                [InlineKeyboardButton("🔙 Edit Add-ons",
+                                      callback_data=self.order_token(EDIT_ADDONS, tier_key, mask)),
+                 InlineKeyboardButton("🔙 Edit Package", callback_data="back_to_tiers")],
+                [InlineKeyboardButton("❌ Cancel Order", callback_data="cancel_order")]
+            ])
+            for tier_key in service_tiers
+            for mask in self.addon_masks
+        }
+
+    def mask_for(self, addon_keys):
+        mask = 0
+        for key in addon_keys:
+            mask |= self.addon_bits[key]
+        return mask
+
+    def addons_for(self, mask):
+        return [key for key in self.addon_keys if mask & self.addon_bits[key]]
+
+    def order_token(self, op, tier_key, mask=0, addon=None):
+        token = f"{op}:{self.version}:{self.tier_keys.index(tier_key)}:{mask:x}"
+        return token if addon is None else f"{token}:{addon}"
+
+    def parse_order_token(self, data):
+        """Return the ``OrderSelection`` in ``data``, or ``None`` if the token
+        is malformed or from another catalog version."""
+        match = TOKEN_PATTERN.match(data)
+        if match is None:
+            return None
+        op, version, tier, mask, addon = match.groups()
+        tier, mask = int(tier), int(mask, 16)
+        if version != self.version or tier >= len(self.tier_keys) or mask not in self.addon_masks:
+            return None
+        if addon is not None:
+            addon = int(addon)
+            if addon >= len(self.addon_keys):
+                return None
+        return OrderSelection(op, self.tier_keys[tier], mask, addon, self)
+
+    def tier_name(self, tier_key):
+        """Name of ``tier_key``, or the key itself for a tier no longer offered."""
+        return self.service_tiers.get(tier_key, {}).get('name', tier_key)
+
+    def addon_name(self, addon_key):
+        return self.addon_services.get(addon_key, {}).get('name', addon_key)
+
+    def _addon_line(self, addon_key):
+        addon = self.addon_services.get(addon_key)
+        if addon is None:
+            return addon_key
+        return f"{addon['name']} (+{addon['price']:,} ETB)"
+
+    def welcome_text(self, first_name):
+        return f"""
+👋 *Welcome to Social Media Pro ET*, {first_name}!
+
+📱 *Professional Social Media Management Services*
+📍 *Serving Ethiopian Businesses*
+💰 *Prices in Ethiopian Birr*
+
+*Quick Commands:*
+/order - 🛒 Start new order
+/services - 📊 View service packages
+/faq - ❓ Frequently Asked Questions
+/support - 🆘 Get immediate help
+/contact - 📞 Contact admin directly
+
+*Why Choose Us?*
+✅ Ethiopian Market Expertise
+✅ Affordable Pricing in ETB
+✅ Professional Content Creation
+✅ 24/7 Customer Support
+
+*Start your order with* `/order` or explore our services with `/services`
+        """
+
+    def _help_text(self, support_chat):
+        return f"""
+*🤖 How to Use This Bot:*
+
+*1. Browse Services*
+Use `/services` to see all packages and pricing
+
+*2. Start Order*
+Use `/order` for step-by-step ordering process
+
+*3. Get Help*
+- `/faq` - Frequently Asked Questions
+- `/support` - Immediate assistance
+- `/contact` - Direct admin contact
+
+*4. Order Process:*
+• Choose service tier
+• Select add-ons
+• Provide contact info
+• Confirm order
+
+*Need Immediate Help?*
+Contact support: {support_chat}
+        """
+
+    def _services_text(self):
+        tiers = "\n\n".join(
+            f"*{tier['name']} - {tier['price']:,} ETB/month*\n" + "\n".join(tier['features'])
+            for tier in self.service_tiers.values()
+        )
+        addons = "\n".join(
+            f"• {addon['name']}: +{addon['price']:,} ETB"
+            for addon in self.addon_services.values()
+        )
+        return f"""
+*📊 Our Service Packages - Prices in ETB*
+
+{tiers}
+
+*💎 Add-on Services:*
+{addons}
+
+*Ready to order?* Use `/order` to get started!
+        """
+
+    def _support_text(self, support_chat):
+        return f"""
+*🆘 Customer Support*
+
+*Immediate Assistance:*
+- Support Chat: {support_chat}
+- Email: support@yourdomain.com
+- Phone: +251 XXX XXX XXX
+
+*Business Hours:*
+Monday-Friday: 8:00 AM - 6:00 PM EAT
+Saturday: 9:00 AM - 2:00 PM EAT
+
+*Emergency Support:*
+Available 24/7 for enterprise customers
+
+*Before contacting support, check* `/faq` *for quick answers.*
+        """
+
+    def _contact_text(self, support_chat, admin_channel):
+        return f"""
+*📞 Direct Contact Information*
+
+*For Sales & Orders:*
+- Telegram: {admin_channel}
+- Phone: +251 XXX XXX XXX
+- Email: sales@yourdomain.com
+
+*For Support:*
+- Support: {support_chat}
+- Email: support@yourdomain.com
+
+*Office Address:*
+[Your physical address in Ethiopia]
+
+*We typically respond within 1-2 hours during business hours.*
+        """
+
+    def _tiers_text(self):
+        prices = " | ".join(
+            f"*{tier['name']}* - {tier['price']:,} ETB/month"
+            for tier in self.service_tiers.values()
+        )
+        return f"""
+*📊 Choose Your Service Package*
+
+Please select one of our service tiers:
+
+{prices}
+
+Click on your preferred package to continue.
+        """
+
+    def _tier_text(self, tier):
+        return f"""
+*{tier['name']} Selected* - {tier['price']:,} ETB/month
+
+*Package Features:*
+{chr(10).join(tier['features'])}
+
+*💎 Optional Add-on Services:*
+You can enhance your package with these additional services:
+        """
+
+    def _addons_keyboard(self, tier_key, mask, markers=True):
+        """Add-on toggles for ``mask``; ``markers=False`` leaves out the selection markers."""
+        keyboard = []
+        for index, (addon_key, addon) in enumerate(self.addon_services.items()):
+            label = f"{addon['name']} (+{addon['price']:,} ETB)"
+            if markers:
+                status = "✅" if mask & self.addon_bits[addon_key] else "◻️"
+                label = f"{status} {label}"
+            callback_data = self.order_token(TOGGLE_ADDON, tier_key, mask, index)
+            keyboard.append([InlineKeyboardButton(label, callback_data=callback_data)])
+
+        keyboard.append([InlineKeyboardButton(
+            "✅ Proceed to Contact", callback_data=self.order_token(PROCEED, tier_key, mask))])
+        keyboard.append([InlineKeyboardButton("🔙 Back to Packages", callback_data="back_to_tiers")])
+        keyboard.append([InlineKeyboardButton("❌ Cancel", callback_data="cancel_order")])
+        return _markup(keyboard)
+
+    def _addons_text(self, tier_key, mask):
+        tier = self.service_tiers[tier_key]
+        addons_text = [
+            f"✅ {self.addon_services[key]['name']} (+{self.addon_services[key]['price']:,} ETB)"
+            for key in self.addons_for(mask)
+        ]
+        return f"""
+*{tier['name']} Selected* - {tier['price']:,} ETB/month
+
+*Selected Add-ons:*
+{chr(10).join(addons_text) if addons_text else 'No add-ons selected'}
+
+*💰 Total Monthly Price: {self.totals[tier_key, mask]:,} ETB*
+
+*Optional Add-on Services:*
+        """
+
+    def _summary_addons_text(self, mask):
+        addons_text = [
+            f"• {self.addon_services[key]['name']} (+{self.addon_services[key]['price']:,} ETB)"
+            for key in self.addons_for(mask)
+        ]
+        return chr(10).join(addons_text) if addons_text else '• None selected'
+
+    def order_summary_text(self, tier_key, mask, business_name, special_requests):
+        tier = self.service_tiers[tier_key]
+        return f"""
+*📋 Order Summary - Please Review*
+
+*Service Package:*
+{tier['name']} - {tier['price']:,} ETB/month
+
+*Add-on Services:*
+{self.summary_addons[mask]}
+
+*Business Name:*
+{business_name}
+
+*Special Requests:*
+{special_requests}
+
+*💰 Total Monthly Price: {self.totals[tier_key, mask]:,} ETB*
+
+*✅ Please confirm your order below. Our team will contact you within 24 hours.*
+        """
+
+    def admin_notification_text(self, order, limit=MAX_MESSAGE_LENGTH):
+        """Admin channel message for an ``OrderRow``. Everything the customer
+        typed is escaped, so it cannot break the Markdown, and the business
+        name, phone and special requests are shortened to fit in ``limit``."""
+        business_name = clip(order.business_name or '', MAX_BUSINESS_NAME)
+        phone = clip(order.phone or '', MAX_PHONE)
+        special_requests = order.special_requests or ''
+        text = self._admin_notification_text(order, business_name, phone, special_requests)
+        if message_length(text) > limit:
+            room = limit - message_length(self._admin_notification_text(order, business_name, phone, ''))
+            special_requests = clip_escaped(special_requests, room)
+            text = self._admin_notification_text(order, business_name, phone, special_requests)
+        return text
+
+    def _admin_notification_text(self, order, business_name, phone, special_requests):
+        first_name = escape_markdown(order.first_name or '')
+        last_name = escape_markdown(order.last_name or '')
+        username = escape_markdown(order.username or '')
+        tier = self.service_tiers.get(order.selected_tier)
+        tier_text = f"{tier['name']} - {tier['price']:,} ETB/month" if tier else order.selected_tier
+        addons_text = ""
+
+        if order.selected_addons:
+            addons_text = "\n*Add-ons:*\n" + "\n".join([
+                f"• {self._addon_line(addon)}" for addon in order.selected_addons
+            ])
+
+        return f"""
+🚨 *NEW ORDER RECEIVED* 🚨
+
+*Order ID:* #{order.id}
+*Customer:* {first_name} {last_name} (@{username or 'No username'})
+*Business:* {escape_markdown(business_name)}
+*Phone:* {escape_markdown(phone)}
+
+*Service Package:*
+{tier_text}
+{addons_text}
+
+*Total Monthly:* {order.total_price:,} ETB
+
+*Special Requests:*
+{escape_markdown(special_requests)}
+
+*Customer Info:*
+User ID: {order.user_id}
+Username: @{username or 'N/A'}
+Name: {first_name} {last_name}
+
+*Action Required:* Contact customer within 24 hours
+        """
+
+    def admin_digest_text(self, orders, limit=MAX_MESSAGE_LENGTH):
+        """Summary message for as many of ``orders`` as fit in ``limit``.
+
+        Returns ``(text, count)`` where ``count`` is how many leading orders
+        the text covers. The text only grows with more orders, so the cut is
+        binary-searched: O(log n) renders instead of one per prefix.
+        """
+        fits, too_many = 0, len(orders) + 1
+        text = None
+        while too_many - fits > 1:
+            count = (fits + too_many) // 2
+            candidate = self._admin_digest_text(orders[:count])
+            if message_length(candidate) <= limit:
+                fits, text = count, candidate
+            else:
+                too_many = count
+        return text, fits
+
+    def _admin_digest_text(self, orders):
+        tier_counts = {}
+        addon_counts = {}
+        for order in orders:
+            count, revenue = tier_counts.get(order.selected_tier, (0, 0))
+            tier_counts[order.selected_tier] = (count + 1, revenue + order.total_price)
+            for addon in order.selected_addons:
+                addon_counts[addon] = addon_counts.get(addon, 0) + 1
+
+        tiers_text = "\n".join(
+            f"• {self.tier_name(tier_key)}: {count} ({revenue:,} ETB)"
+            for tier_key, (count, revenue) in tier_counts.items()
+        )
+        addons_text = "\n".join(
+            f"• {self.addon_name(addon)}: {count}"
+            for addon, count in addon_counts.items()
+        ) or "• None"
+        orders_text = "\n".join(
+            f"[#{order.id}](tg://user?id={order.user_id}) "
+            f"{escape_markdown(clip(order.business_name or '', MAX_BUSINESS_NAME))} - "
+            f"{self.tier_name(order.selected_tier)} - {order.total_price:,} ETB - "
+            f"{escape_markdown(clip(order.phone or '', MAX_PHONE))}"
+            for order in orders
+        )
+        total = sum(order.total_price for order in orders)
+
+        return f"""
+🧾 *ORDER DIGEST* - {len(orders)} new orders, {total:,} ETB/month
+
+*By Package:*
+{tiers_text}
+
+*Add-ons:*
+{addons_text}
+
+*Orders:*
+{orders_text}
+
+*Action Required:* Contact customers within 24 hours
+        """
+
+    def stats_text(self, rows, since, until, max_days=14):
+        """Admin summary of ``Database.get_order_stats`` rows for ``since``..``until``.
+
+        Shows revenue per tier, add-on attach rates and, for the most recent
+        ``max_days`` days with orders, orders per day.
+        """
+        tiers = {}
+        addons = {}
+        days = {}
+        for day, tier, addon, orders, revenue in rows:
+            if addon:
+                addons[addon] = addons.get(addon, 0) + orders
+                continue
+            count, total = tiers.get(tier, (0, 0))
+            tiers[tier] = (count + orders, total + revenue)
+            count, total = days.get(day, (0, 0))
+            days[day] = (count + orders, total + revenue)
+
+        total_orders = sum(count for count, _ in tiers.values())
+        total_revenue = sum(revenue for _, revenue in tiers.values())
+        if not total_orders:
+            return f"📈 *STATS* {since} – {until}\n\nNo orders in this period."
+
+        tiers_text = "\n".join(
+            f"• {self.tier_name(tier)}: {count} ({revenue:,} ETB)"
+            for tier, (count, revenue) in sorted(tiers.items(), key=lambda item: -item[1][1])
+        )
+        addons_text = "\n".join(
+            f"• {self.addon_name(addon)}: {count} ({count / total_orders:.0%})"
+            for addon, count in sorted(addons.items(), key=lambda item: -item[1])
+        ) or "• None"
+        days_text = "\n".join(
+            f"• {day}: {count} ({revenue:,} ETB)"
+            for day, (count, revenue) in sorted(days.items())[-max_days:]
+        )
+
+        return f"""
+📈 *STATS* {since} – {until}
+
+*Orders:* {total_orders} · *Revenue:* {total_revenue:,} ETB/month
+*Average order:* {total_revenue // total_orders:,} ETB
+
+*By Package:*
+{tiers_text}
+
+*Add-on attach rate:*
+{addons_text}
+
+*Orders per day:*
+{days_text}
+        """
+
+
+def _check_priced(section, entries, fields):
+    if not isinstance(entries, dict) or not entries:
+        raise ValueError(f"'{section}' must be a non-empty object")
+    for key, entry in entries.items():
+        if not isinstance(entry, dict):
+            raise ValueError(f"{section}.{key} must be an object")
+        for field, kind in fields.items():
+            if not isinstance(entry.get(field), kind) or isinstance(entry.get(field), bool):
+                raise ValueError(f"{section}.{key}.{field} must be a {kind.__name__}")
+        if entry['price'] < 0:
+            raise ValueError(f"{section}.{key}.price must not be negative")
+
+
+def load_catalog(path, support_chat, admin_channel):
+    """Build a ``Catalog`` from the JSON file at ``path``.
+
+    The file holds ``{"service_tiers": {...}, "addon_services": {...}}`` in
+    the shape ``Catalog`` takes. Raises ``ValueError`` if it is not valid
+    JSON or not a valid catalog.
+    """
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    if not isinstance(data, dict):
+        raise ValueError("Catalog file must hold a JSON object")
+    service_tiers = data.get('service_tiers')
+    addon_services = data.get('addon_services', {})
+    _check_priced('service_tiers', service_tiers, {'name': str, 'price': int, 'features': list})
+    if addon_services:
+        _check_priced('addon_services', addon_services, {'name': str, 'price': int})
+    if len(addon_services) > MAX_ADDONS:
+        raise ValueError(f"At most {MAX_ADDONS} add-on services are supported")
+    return Catalog(service_tiers, addon_services, support_chat, admin_channel)
+
+
+class CatalogRegistry:
+    """The live ``Catalog`` plus the recent versions order tokens refer to.
+
+    ``current`` is what new orders are shown. ``reload`` builds a catalog
+    from ``path`` and only then swaps it in, by assignment, so a handler that
+    takes ``current`` once works with one consistent snapshot throughout.
+    The last ``keep`` versions stay reachable through ``parse_order_token``:
+    an order started before a reload is summarised, priced and confirmed with
+    the catalog it started with, and only tokens of evicted versions are
+    treated as stale.
+    """
+
+    def __init__(self, path, support_chat, admin_channel, keep=8):
+        self.path = path
+        self.support_chat = support_chat
+        self.admin_channel = admin_channel
+        self.keep = keep
+        self.current = None
+        self._versions = OrderedDict()  # version -> Catalog, oldest first
+        self._mtime = None
+        self.reload()
+
+    def reload(self):
+        """Load ``path`` and make it current; return whether the version changed.
+
+        Raises ``OSError`` or ``ValueError`` and keeps the current catalog if
+        the file cannot be loaded. Safe to call from a worker thread.
+        """
+        self._mtime = os.stat(self.path).st_mtime_ns
+        catalog = load_catalog(self.path, self.support_chat, self.admin_channel)
+        if self.current is not None and catalog.version == self.current.version:
+            return False
+
+        versions = OrderedDict(self._versions)
+        versions.pop(catalog.version, None)
+        versions[catalog.version] = catalog
+        while len(versions) > self.keep:
+            versions.popitem(last=False)
+        # Readers may be on another thread: publish the versions before the
+        # catalog that refers to them
+        self._versions = versions
+        self.current = catalog
+        return True
+
+    def reload_if_changed(self):
+        """``reload`` if the file was modified since it was last read."""
+        if os.stat(self.path).st_mtime_ns == self._mtime:
+            return False
+        return self.reload()
+
+    def get(self, version):
+        return self._versions.get(version)
+
+    def parse_order_token(self, data):
+        """``Catalog.parse_order_token`` by the catalog version that made the
+        token; ``None`` if that version is no longer kept."""
+        match = TOKEN_PATTERN.match(data)
+        if match is None:
+            return None
+        catalog = self._versions.get(match.group(2))
+        return catalog.parse_order_token(data) if catalog is not None else None
@@ -1,15 +1,23 @@
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
-from telegram.ext import Application, CommandHandler, ContextTypes, CallbackQueryHandler
+from telegram.ext import Application, CommandHandler, ContextTypes, CallbackQueryHandler, MessageHandler, filters
 import os
 from dotenv import load_dotenv
+from metrics import Metrics, MetricsServer, instrument_application
+from outbound import BULK, OutboundScheduler
 
 # Load environment variables
 load_dotenv()
 BOT_TOKEN = os.getenv('BOT_TOKEN')
 CHANNEL_ID = os.getenv('CHANNEL_ID')  # Your @hiringet channel ID
 
-# Initialize application
-application = Application.builder().token(BOT_TOKEN).build()
+# Initialize application. This process paces its own requests: with the same
+# token as bot.py, the two split Telegram's ~30 messages/s (bot.py 25, this 5)
+metrics = Metrics()
+outbound = OutboundScheduler(
+    global_rate=float(os.getenv('OUTBOUND_GLOBAL_RATE', '5')),
+    calls=metrics.calls('bot_api', 'endpoint', 'Bot API request')
+)
+application = Application.builder().token(BOT_TOKEN).rate_limiter(outbound).build()
 
 async def post_job_ad(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Command to get job post text from admin"""
@@ -54,7 +62,8 @@ Create a professional CV and apply directly!
                 chat_id=CHANNEL_ID,
                 text=formatted_post,
                 reply_markup=reply_markup,
-                parse_mode='Markdown'
+                parse_mode='Markdown',
+                rate_limit_args={'priority': BULK}
             )
             
             await update.message.reply_text(
@@ -84,8 +93,43 @@ def main():
     # Add handler for text messages (must be last)
     application.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, handle_text_input))
     
+    instrument_application(application, metrics)
+    metrics.gauge(
+        'bot_api_waiting', 'Bot API requests waiting for a rate-limit token.', ['lane'],
+        func=lambda: dict(outbound.waiting)
+    )
+    run_webhook = os.getenv('RUN_MODE') == 'webhook'
+    if run_webhook and (not os.getenv('WEBHOOK_SECRET') or not os.getenv('WEBHOOK_URL')):
+        print("Webhook mode needs WEBHOOK_SECRET and WEBHOOK_URL")
+        return
+
+    # Defaults to the port after the main bot's, so both can run on one host
+    metrics_port = int(os.getenv('METRICS_PORT', '9101'))
+    metrics_server = None
+    if metrics_port:
+        metrics_server = MetricsServer(metrics, os.getenv('METRICS_HOST', '127.0.0.1'), metrics_port)
+        try:
+            metrics_server.start()
+        except OSError as e:
+            print(f"Cannot serve metrics on port {metrics_port}: {e.strerror}")
+            return
+
     print("Post creator bot is running...")
-    application.run_polling()
+    try:
+        if run_webhook:
+            application.run_webhook(
+                listen=os.getenv('WEBHOOK_LISTEN', '0.0.0.0'),
+                port=int(os.getenv('PORT', '8443')),
+                url_path=os.getenv('WEBHOOK_PATH', '/telegram').lstrip('/'),
+                webhook_url=os.getenv('WEBHOOK_URL'),
+                secret_token=os.getenv('WEBHOOK_SECRET'),
+                allowed_updates=Update.ALL_TYPES
+            )
+        else:
+            application.run_polling()
+    finally:
+        if metrics_server is not None:
+            metrics_server.stop()
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
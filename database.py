@@ -1,48 +1,331 @@
-import sqlite3
 import json
-from datetime import datetime
+import re
+from typing import List, NamedTuple, Optional
+
+from db_pool import ConnectionPool
+from migrations import Migration, migrate
+
+INSERT_ORDER_SQL = '''
+    INSERT INTO orders (
+        user_id, username, first_name, last_name, phone,
+        business_name, selected_tier, selected_addons,
+        total_price, special_requests
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    RETURNING id, date(created_at)
+'''
+MARK_ADMIN_NOTIFIED_SQL = 'UPDATE orders SET admin_notified = 1 WHERE id = ?'
+# admin_notified = 2: the outbox gave up on the order and logged it instead
+MARK_ADMIN_FAILED_SQL = 'UPDATE orders SET admin_notified = 2 WHERE id = ?'
+INSERT_FAQ_SQL = 'INSERT INTO faq (question, answer, category) VALUES (?, ?, ?)'
+INSERT_JOB_SUBMISSION_SQL = 'INSERT INTO job_submissions (user_id, title, description, contact_info) VALUES (?, ?, ?, ?)'
+INSERT_CV_DRAFT_SQL = 'INSERT INTO cv_drafts (user_id, full_name, headline, skills, experience) VALUES (?, ?, ?, ?, ?)'
+FAQ_BY_CATEGORY_SQL = 'SELECT question, answer FROM faq WHERE category = ? AND is_active = 1'
+FAQ_ALL_SQL = 'SELECT question, answer, category FROM faq WHERE is_active = 1'
+# BM25 over the FTS5 mirror of faq; a question match counts twice an answer match
+SEARCH_FAQ_SQL = '''
+    SELECT faq.question, faq.answer, faq.category
+    FROM faq_fts JOIN faq ON faq.id = faq_fts.rowid
+    WHERE faq_fts MATCH ? AND faq.is_active = 1
+    ORDER BY bm25(faq_fts, 2.0, 1.0)
+    LIMIT ?
+'''
+ORDER_COLUMNS = '''
+    id, user_id, username, first_name, last_name, phone, business_name,
+    selected_tier, selected_addons, total_price, special_requests, status,
+    created_at, admin_notified
+'''
+PENDING_ADMIN_NOTIFICATIONS_SQL = f'SELECT {ORDER_COLUMNS} FROM orders WHERE admin_notified = 0 ORDER BY id LIMIT ?'
+# addon = '' holds every order of the day and tier; other rows count the
+# orders that included that add-on (and their total revenue)
+UPSERT_ORDER_STATS_SQL = '''
+    INSERT INTO order_stats (day, tier, addon, orders, revenue) VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT (day, tier, addon) DO UPDATE SET
+        orders = orders + excluded.orders,
+        revenue = revenue + excluded.revenue
+'''
+REBUILD_ORDER_STATS_SQL = (
+    '''
+    INSERT INTO order_stats (day, tier, addon, orders, revenue)
+    SELECT date(created_at), selected_tier, '', COUNT(*), SUM(total_price)
+    FROM orders GROUP BY 1, 2
+    ''',
+    '''
+    INSERT INTO order_stats (day, tier, addon, orders, revenue)
+    SELECT date(orders.created_at), orders.selected_tier, addon.value, COUNT(*), SUM(orders.total_price)
+    FROM orders, json_each(orders.selected_addons) AS addon GROUP BY 1, 2, 3
+    ''',
+)
+ORDER_STATS_SQL = '''
+    SELECT day, tier, addon, orders, revenue FROM order_stats
+    WHERE day >= ? AND day <= ? ORDER BY day
+'''
+
+
+# Words too common in questions to say anything about which FAQ is meant
+SEARCH_STOPWORDS = frozenset('''
+    a about am an and are can do does for from have how i if in is it me my of
+    on or please should so that the there this to we what when where which who
+    why will with you your
+'''.split())
+
+
+def faq_search_query(text):
+    """Turn free text into an FTS5 query matching any of its significant words.
+
+    Every word is quoted, so punctuation and FTS5 operators typed by users
+    can't cause syntax errors. Returns ``None`` if no word is left.
+    """
+    words = [word for word in re.findall(r'\w\w+', text.lower()) if word not in SEARCH_STOPWORDS]
+    if not words:
+        return None
+    return ' OR '.join(f'"{word}"' for word in dict.fromkeys(words))
+
+
+class OrderRow(NamedTuple):
+    id: int
+    user_id: int
+    username: Optional[str]
+    first_name: Optional[str]
+    last_name: Optional[str]
+    phone: str
+    business_name: str
+    selected_tier: str
+    selected_addons: List[str]
+    total_price: int
+    special_requests: str
+    status: str
+    created_at: str
+    admin_notified: int
+
+    @classmethod
+    def from_db(cls, row):
+        row = list(row)
+        row[8] = json.loads(row[8] or '[]')
+        return cls(*row)
+
+
+class OrderPage(NamedTuple):
+    """One page of orders, newest first, plus cursors for the neighbouring pages.
+
+    Pass ``next_cursor`` as ``after`` to get older orders and ``prev_cursor``
+    as ``before`` to get newer ones; either is ``None`` at that end.
+    """
+    rows: List[OrderRow]
+    next_cursor: Optional[int]
+    prev_cursor: Optional[int]
+
+
+SAMPLE_FAQS = [
+    ("What's included in the Basic package?", "The Basic package includes management of 2 social media platforms, 5 posts per week, basic analytics, content creation, and 24/7 support.", "packages"),
+    ("How long does setup take?", "Setup typically takes 1-2 business days after we receive all necessary access and information.", "general"),
+    ("Can I change packages later?", "Yes, you can upgrade or downgrade your package at any time. Changes take effect from the next billing cycle.", "billing"),
+    ("Do you create content?", "Yes! We handle content creation including graphics, captions, and scheduling for all packages.", "services"),
+    ("What platforms do you support?", "We support Facebook, Instagram, Twitter/X, LinkedIn, TikTok, and Telegram.", "services"),
+    ("How do I pay?", "We accept bank transfers, mobile banking (CBE Birr, Telebirr), and cash payments.", "billing"),
+    ("Can I cancel anytime?", "Yes, you can cancel with 30 days notice. No long-term contracts required.", "billing")
+]
+
+def _initial_schema(conn):
+    """Orders, FAQ, persistence and order_stats. Written to also adopt
+    databases from before schema versioning, whatever subset of it they have."""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS orders (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER,
+            username TEXT,
+            first_name TEXT,
+            last_name TEXT,
+            phone TEXT,
+            business_name TEXT,
+            selected_tier TEXT,
+            selected_addons TEXT,
+            total_price INTEGER,
+            special_requests TEXT,
+            status TEXT DEFAULT 'pending',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            admin_notified INTEGER DEFAULT 0
+        )
+    ''')
+
+    # Databases from before the admin outbox: their orders were announced
+    # when they were placed, so only orders from now on are pending
+    columns = {row[1] for row in conn.execute('PRAGMA table_info(orders)')}
+    if 'admin_notified' not in columns:
+        conn.execute('ALTER TABLE orders ADD COLUMN admin_notified INTEGER DEFAULT 0')
+        conn.execute('UPDATE orders SET admin_notified = 1')
+
+    # Create FAQ table
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS faq (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            question TEXT,
+            answer TEXT,
+            category TEXT,
+            is_active INTEGER DEFAULT 1
+        )
+    ''')
+
+    # Full-text index mirroring faq, kept in sync by the triggers below
+    fts_exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'faq_fts'"
+    ).fetchone()
+    conn.execute('''
+        CREATE VIRTUAL TABLE IF NOT EXISTS faq_fts USING fts5 (
+            question, answer,
+            content = 'faq', content_rowid = 'id',
+            tokenize = 'porter unicode61'
+        )
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS faq_fts_insert AFTER INSERT ON faq BEGIN
+            INSERT INTO faq_fts (rowid, question, answer) VALUES (new.id, new.question, new.answer);
+        END
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS faq_fts_delete AFTER DELETE ON faq BEGIN
+            INSERT INTO faq_fts (faq_fts, rowid, question, answer)
+            VALUES ('delete', old.id, old.question, old.answer);
+        END
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS faq_fts_update AFTER UPDATE OF question, answer ON faq BEGIN
+            INSERT INTO faq_fts (faq_fts, rowid, question, answer)
+            VALUES ('delete', old.id, old.question, old.answer);
+            INSERT INTO faq_fts (rowid, question, answer) VALUES (new.id, new.question, new.answer);
+        END
+    ''')
+    if not fts_exists:
+        # Index FAQs added before the full-text table existed
+        conn.execute("INSERT INTO faq_fts (faq_fts) VALUES ('rebuild')")
+
+    # PTB persistence (see persistence.py)
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS persistence_user_data (
+            user_id INTEGER PRIMARY KEY,
+            data BLOB
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS persistence_chat_data (
+            chat_id INTEGER PRIMARY KEY,
+            data BLOB
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS persistence_bot_data (
+            id INTEGER PRIMARY KEY,
+            data BLOB
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS persistence_callback_data (
+            id INTEGER PRIMARY KEY,
+            data BLOB
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS persistence_conversations (
+            name TEXT,
+            conversation_key TEXT,
+            state BLOB,
+            PRIMARY KEY (name, conversation_key)
+        )
+    ''')
+
+    # Per day x tier x add-on aggregates, kept current by create_order(s)
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS order_stats (
+            day TEXT,
+            tier TEXT,
+            addon TEXT,
+            orders INTEGER,
+            revenue INTEGER,
+            PRIMARY KEY (day, tier, addon)
+        )
+    ''')
+
+    # Indexes for the order access patterns: paging by status (optionally
+    # per tier), date range lookups, per-user history and the admin outbox
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_orders_status_id ON orders (status, id)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_orders_status_tier_id ON orders (status, selected_tier, id)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_orders_created_at ON orders (created_at)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_orders_user_id ON orders (user_id, id)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_orders_admin_pending ON orders (id) WHERE admin_notified = 0')
+
+    if not conn.execute('SELECT EXISTS (SELECT 1 FROM faq)').fetchone()[0]:
+        conn.executemany(INSERT_FAQ_SQL, SAMPLE_FAQS)
+
+    # Databases created before order_stats existed start without aggregates
+    if (conn.execute('SELECT EXISTS (SELECT 1 FROM orders)').fetchone()[0]
+            and not conn.execute('SELECT EXISTS (SELECT 1 FROM order_stats)').fetchone()[0]):
+        for sql in REBUILD_ORDER_STATS_SQL:
+            conn.execute(sql)
+
+
+def _job_portal_schema(conn):
+    conn.execute('''
+        CREATE TABLE job_submissions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER,
+            title TEXT,
+            description TEXT,
+            contact_info TEXT,
+            status TEXT DEFAULT 'pending',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE cv_drafts (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER,
+            full_name TEXT,
+            headline TEXT,
+            skills TEXT,
+            experience TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    conn.execute('CREATE INDEX idx_job_submissions_status_id ON job_submissions (status, id)')
+
+
+def _orders_by_date_index(conn):
+    # Date-filtered order pages; created_at is not guaranteed to follow id
+    # (imported or backdated rows), so it needs its own index per status
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_orders_status_created_at ON orders (status, created_at, id)')
+
+
+# Append new migrations at the end; never edit one that has shipped
+MIGRATIONS = (
+    Migration(1, 'orders, FAQ with full-text index, persistence, order_stats', _initial_schema),
+    Migration(2, 'job_submissions and cv_drafts', _job_portal_schema),
+    Migration(3, 'orders by status and created_at', _orders_by_date_index),
+)
+
 
 class Database:
-    def __init__(self, db_name='orders.db'):
+    def __init__(self, db_name='orders.db', pool_size=4):
         self.db_name = db_name
+        self.pool = ConnectionPool(db_name, size=pool_size)
+        self._faq_listeners = []
         self.init_db()
-    
+
+    def add_faq_listener(self, callback):
+        """Call ``callback()`` after any change to the FAQ table."""
+        self._faq_listeners.append(callback)
+
+    def _faq_changed(self):
+        for callback in self._faq_listeners:
+            callback()
+
     def init_db(self):
-        conn = sqlite3.connect(self.db_name)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS orders (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER,
-                username TEXT,
-                first_name TEXT,
-                last_name TEXT,
-                phone TEXT,
-                business_name TEXT,
-                selected_tier TEXT,
-                selected_addons TEXT,
-                total_price INTEGER,
-                special_requests TEXT,
-                status TEXT DEFAULT 'pending',
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        conn.commit()
-        conn.close()
-    
-    def create_order(self, order_data):
-        conn = sqlite3.connect(self.db_name)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT INTO orders (
-                user_id, username, first_name, last_name, phone, 
-                business_name, selected_tier, selected_addons, 
-                total_price, special_requests
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
+        """Bring orders.db up to the current schema; nothing to do (and no
+        DDL run) when it already is."""
+        with self.pool.connection() as conn:
+            migrate(conn, MIGRATIONS)
+
+    @staticmethod
+    def _order_params(order_data):
+        return (
             order_data['user_id'],
             order_data['username'],
             order_data['first_name'],
@@ -53,19 +336,184 @@ class Database:
             json.dumps(order_data['selected_addons']),
             order_data['total_price'],
             order_data['special_requests']
-        ))
-        
-        order_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
-        return order_id
-    
-    def get_orders(self, status='pending'):
-        conn = sqlite3.connect(self.db_name)
-        cursor = conn.cursor()
-        
-        cursor.execute('SELECT * FROM orders WHERE status = ? ORDER BY created_at DESC', (status,))
-        orders = cursor.fetchall()
-        
-        conn.close()
-        return orders
\ No newline at end of file
+        )
+
+    def _insert_orders(self, conn, orders):
+        """Insert orders and fold them into order_stats on the same connection.
+
+        The aggregates are summed per batch first, so a batch costs one
+        upsert per distinct (day, tier, add-on) rather than per order.
+        """
+        order_ids = []
+        stats = {}
+        for order_data in orders:
+            order_id, day = conn.execute(INSERT_ORDER_SQL, self._order_params(order_data)).fetchone()
+            order_ids.append(order_id)
+            tier = order_data['selected_tier']
+            for addon in [''] + list(order_data['selected_addons']):
+                count, revenue = stats.get((day, tier, addon), (0, 0))
+                stats[day, tier, addon] = (count + 1, revenue + order_data['total_price'])
+        conn.executemany(UPSERT_ORDER_STATS_SQL, [key + value for key, value in stats.items()])
+        return order_ids
+
+    def create_order(self, order_data):
+        with self.pool.transaction() as conn:
+            return self._insert_orders(conn, [order_data])[0]
+
+    def create_orders(self, orders):
+        """Insert several orders in one transaction and return their IDs in order."""
+        with self.pool.transaction() as conn:
+            return self._insert_orders(conn, orders)
+
+    def rebuild_order_stats(self):
+        """Recompute order_stats from the orders table (a full scan)."""
+        with self.pool.transaction() as conn:
+            conn.execute('DELETE FROM order_stats')
+            for sql in REBUILD_ORDER_STATS_SQL:
+                conn.execute(sql)
+
+    def get_order_stats(self, since, until):
+        """Aggregate rows ``(day, tier, addon, orders, revenue)`` for days
+        ``since``..``until`` (``'YYYY-MM-DD'``, both inclusive)."""
+        with self.pool.connection() as conn:
+            return conn.execute(ORDER_STATS_SQL, (since, until)).fetchall()
+
+    def mark_admin_notified(self, order_id):
+        with self.pool.transaction() as conn:
+            conn.execute(MARK_ADMIN_NOTIFIED_SQL, (order_id,))
+
+    def mark_admin_failed(self, order_id):
+        """Take an order out of the admin outbox without it being delivered."""
+        with self.pool.transaction() as conn:
+            conn.execute(MARK_ADMIN_FAILED_SQL, (order_id,))
+
+    def add_faq(self, question, answer, category):
+        with self.pool.transaction() as conn:
+            faq_id = conn.execute(INSERT_FAQ_SQL, (question, answer, category)).lastrowid
+        self._faq_changed()
+        return faq_id
+
+    def add_job_submission(self, user_id, title, description, contact_info):
+        """Store a /postajob submission for review; returns its ID."""
+        with self.pool.transaction() as conn:
+            return conn.execute(INSERT_JOB_SUBMISSION_SQL, (user_id, title, description, contact_info)).lastrowid
+
+    def add_cv_draft(self, user_id, full_name, headline, skills, experience):
+        """Store a /makecv draft (``skills`` is a list); returns its ID."""
+        with self.pool.transaction() as conn:
+            return conn.execute(
+                INSERT_CV_DRAFT_SQL, (user_id, full_name, headline, json.dumps(skills), experience)
+            ).lastrowid
+
+    def set_faq_active(self, faq_id, is_active=True):
+        with self.pool.transaction() as conn:
+            conn.execute('UPDATE faq SET is_active = ? WHERE id = ?', (int(is_active), faq_id))
+        self._faq_changed()
+
+    def mark_admin_notified_many(self, order_ids):
+        with self.pool.transaction() as conn:
+            conn.executemany(MARK_ADMIN_NOTIFIED_SQL, [(order_id,) for order_id in order_ids])
+
+    def get_pending_admin_notifications(self, limit=20):
+        """Oldest orders the admin channel has not been told about."""
+        with self.pool.connection() as conn:
+            rows = conn.execute(PENDING_ADMIN_NOTIFICATIONS_SQL, (limit,)).fetchall()
+        return [OrderRow.from_db(row) for row in rows]
+
+    def get_faq_by_category(self, category=None):
+        with self.pool.connection() as conn:
+            if category:
+                return conn.execute(FAQ_BY_CATEGORY_SQL, (category,)).fetchall()
+            return conn.execute(FAQ_ALL_SQL).fetchall()
+
+    def search_faq(self, text, limit=3):
+        """Active FAQs best matching free ``text``, as ``(question, answer, category)``."""
+        query = faq_search_query(text)
+        if query is None:
+            return []
+        with self.pool.connection() as conn:
+            return conn.execute(SEARCH_FAQ_SQL, (query, limit)).fetchall()
+
+    @staticmethod
+    def _created_at_conditions(since, until, conditions, params):
+        if since is not None:
+            conditions.append('created_at >= ?')
+            params.append(since)
+        if until is not None:
+            conditions.append('created_at < ?')
+            params.append(until)
+
+    def get_orders_page(self, status='pending', limit=20, after=None, before=None,
+                        tier=None, since=None, until=None):
+        """Keyset-paginated orders with ``status``, newest first.
+
+        ``after``/``before`` are cursors from a previous ``OrderPage``.
+        ``tier`` filters on selected_tier and ``since``/``until`` on created_at
+        (``'YYYY-MM-DD[ HH:MM:SS]'``, until is exclusive). Every page is an
+        index seek plus ``limit`` rows, however deep it is; a date range reads
+        the (status, created_at) index instead, so it costs the rows in range.
+        """
+        conditions = ['status = ?']
+        params = [status]
+        if tier is not None:
+            conditions.append('selected_tier = ?')
+            params.append(tier)
+        self._created_at_conditions(since, until, conditions, params)
+
+        with self.pool.connection() as conn:
+            if before is not None:
+                conditions.append('id > ?')
+                params.append(before)
+                order = 'ASC'
+            else:
+                if after is not None:
+                    conditions.append('id < ?')
+                    params.append(after)
+                order = 'DESC'
+
+            sql = (f"SELECT {ORDER_COLUMNS} FROM orders WHERE {' AND '.join(conditions)} "
+                   f"ORDER BY id {order} LIMIT ?")
+            rows = conn.execute(sql, params + [limit + 1]).fetchall()
+
+        has_more = len(rows) > limit
+        rows = [OrderRow.from_db(row) for row in rows[:limit]]
+        if before is not None:
+            rows.reverse()
+            next_cursor = rows[-1].id if rows else None
+            prev_cursor = rows[0].id if rows and has_more else None
+        else:
+            next_cursor = rows[-1].id if rows and has_more else None
+            prev_cursor = rows[0].id if rows and after is not None else None
+        return OrderPage(rows, next_cursor, prev_cursor)
+
+    def iter_orders(self, status=None, since=None, until=None, batch_size=1000):
+        """Yield every matching order as an ``OrderRow``, oldest first.
+
+        Rows are stepped from a single cursor ``batch_size`` at a time, so
+        memory stays flat however many orders match. The generator holds one
+        pool connection (a consistent WAL snapshot) until it is exhausted or
+        closed; run it off the database thread. ``since``/``until`` work as in
+        ``get_orders_page``.
+        """
+        conditions = []
+        params = []
+        if status is not None:
+            conditions.append('status = ?')
+            params.append(status)
+        self._created_at_conditions(since, until, conditions, params)
+
+        with self.pool.connection() as conn:
+            where = f"WHERE {' AND '.join(conditions)} " if conditions else ''
+            cursor = conn.execute(f"SELECT {ORDER_COLUMNS} FROM orders {where}ORDER BY id", params)
+            try:
+                while True:
+                    rows = cursor.fetchmany(batch_size)
+                    if not rows:
+                        return
+                    for row in rows:
+                        yield OrderRow.from_db(row)
+            finally:
+                cursor.close()
+
+    def close(self):
+        self.pool.close()
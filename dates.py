@@ -0,0 +1,42 @@
+from datetime import datetime, timedelta, timezone
+
+# from=/to= date arguments, shared by the admin commands and the export CLI
+
+
+def parse_date(value):
+    return datetime.strptime(value, '%Y-%m-%d').date()
+
+
+def split_date_args(args):
+    """Take ``from=YYYY-MM-DD`` and ``to=YYYY-MM-DD`` out of command ``args``.
+
+    Returns ``(since, until, rest)``: the inclusive dates (``None`` if not
+    given) and the other arguments, in order. Raises ``ValueError`` with a
+    user-facing message on a bad date.
+    """
+    dates = {}
+    rest = []
+    for arg in args:
+        key, sep, value = arg.partition('=')
+        if not sep or key not in ('from', 'to'):
+            rest.append(arg)
+            continue
+        try:
+            dates[key] = parse_date(value)
+        except ValueError:
+            raise ValueError(f"Dates must look like 2025-01-31, got '{value}'")
+    return dates.get('from'), dates.get('to'), rest
+
+
+def parse_date_range(args, default_days=30):
+    """Parse ``[from=YYYY-MM-DD] [to=YYYY-MM-DD]`` into inclusive ``(since, until)``.
+
+    ``until`` defaults to today and ``since`` to ``default_days`` before it.
+    Raises ``ValueError`` with a user-facing message on bad input.
+    """
+    since, until, rest = split_date_args(args)
+    if rest:
+        raise ValueError(f"Unknown argument '{rest[0]}'. Use from=YYYY-MM-DD and to=YYYY-MM-DD")
+    until = until or datetime.now(timezone.utc).date()
+    since = since or until - timedelta(days=default_days - 1)
+    return since, until
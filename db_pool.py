@@ -0,0 +1,92 @@
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+# Applied to every connection when it is opened. WAL lets readers run while a
+# writer commits, and synchronous=NORMAL only fsyncs at checkpoints in WAL mode.
+PRAGMAS = (
+    'PRAGMA journal_mode = WAL',
+    'PRAGMA synchronous = NORMAL',
+    'PRAGMA cache_size = -8000',
+    'PRAGMA temp_store = MEMORY',
+    'PRAGMA mmap_size = 67108864',
+    'PRAGMA busy_timeout = 5000',
+)
+
+
+class ConnectionPool:
+    """A small pool of long-lived SQLite connections.
+
+    Connections are opened lazily up to ``size`` and handed out one caller at a
+    time. Each keeps its own prepared-statement cache, so queries should use
+    constant SQL strings to get cache hits.
+    """
+
+    def __init__(self, db_name, size=4, cached_statements=256, timeout=10.0):
+        # Every connection to ':memory:' is a separate database, so only one
+        if db_name == ':memory:':
+            size = 1
+        self.db_name = db_name
+        self.size = size
+        self.cached_statements = cached_statements
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()
+        self._all = []
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def _connect(self):
+        conn = sqlite3.connect(
+            self.db_name,
+            timeout=self.timeout,
+            check_same_thread=False,
+            cached_statements=self.cached_statements
+        )
+        for pragma in PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    def acquire(self):
+        if self._closed:
+            raise RuntimeError('Connection pool is closed')
+
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            if len(self._all) < self.size:
+                conn = self._connect()
+                self._all.append(conn)
+                return conn
+
+        return self._idle.get(timeout=self.timeout)
+
+    def release(self, conn):
+        if conn.in_transaction:
+            conn.rollback()
+        self._idle.put(conn)
+
+    @contextmanager
+    def connection(self):
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    @contextmanager
+    def transaction(self):
+        """Yield a connection and commit on success, roll back on error."""
+        with self.connection() as conn:
+            with conn:
+                yield conn
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            for conn in self._all:
+                conn.close()
+            self._all.clear()
@@ -0,0 +1,139 @@
+import csv
+import gzip
+import io
+import json
+import os
+from datetime import timedelta
+
+from dates import split_date_args
+
+FORMATS = ('csv', 'jsonl')
+
+# Telegram bots may upload documents up to 50 MB; leave room for gzip's
+# buffered tail that is not yet visible in the file size.
+TELEGRAM_PART_SIZE = 45 * 1024 * 1024
+
+CSV_COLUMNS = [
+    'id', 'created_at', 'status', 'user_id', 'username', 'first_name', 'last_name',
+    'phone', 'business_name', 'selected_tier', 'total_price', 'special_requests',
+    'admin_notified'
+]
+
+
+def created_at_range(since=None, until=None):
+    """Turn inclusive ``date`` bounds into the ``since``/``until`` strings
+    ``Database.iter_orders`` takes (``until`` is exclusive there)."""
+    return (
+        since.isoformat() if since else None,
+        (until + timedelta(days=1)).isoformat() if until else None
+    )
+
+
+def parse_export_args(args):
+    """Parse ``/export [csv|jsonl] [status=<status>] [from=YYYY-MM-DD] [to=YYYY-MM-DD]``.
+
+    Returns ``(fmt, status, since, until)``; raises ``ValueError`` with a
+    user-facing message on bad input.
+    """
+    since, until, rest = split_date_args(args)
+    fmt, status = 'csv', None
+    for arg in rest:
+        key, sep, value = arg.partition('=')
+        if not sep:
+            if arg not in FORMATS:
+                raise ValueError(f"Unknown format '{arg}'. Use one of: {', '.join(FORMATS)}")
+            fmt = arg
+        elif key == 'status':
+            status = value
+        else:
+            raise ValueError(f"Unknown filter '{key}'")
+    return fmt, status, since, until
+
+
+class _CsvEncoder:
+    """One CSV line per order, with ``selected_addons`` expanded into an
+    ``addon_<key>`` 0/1 column per known add-on. Add-ons no longer in the
+    catalog go to ``other_addons``."""
+
+    def __init__(self, addon_keys):
+        self.addon_keys = list(addon_keys)
+        self._known = set(self.addon_keys)
+        self._buffer = io.StringIO()
+        self._writer = csv.writer(self._buffer)
+
+    def _line(self, values):
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        self._writer.writerow(values)
+        return self._buffer.getvalue()
+
+    def header(self):
+        return self._line(CSV_COLUMNS + [f'addon_{key}' for key in self.addon_keys] + ['other_addons'])
+
+    def encode(self, order):
+        addons = set(order.selected_addons)
+        other = [key for key in order.selected_addons if key not in self._known]
+        return self._line(
+            [getattr(order, column) for column in CSV_COLUMNS]
+            + [int(key in addons) for key in self.addon_keys]
+            + [';'.join(other)]
+        )
+
+
+class _JsonlEncoder:
+    """One JSON object per line; ``selected_addons`` stays a list."""
+
+    def header(self):
+        return ''
+
+    def encode(self, order):
+        return json.dumps(order._asdict(), ensure_ascii=False) + '\n'
+
+
+def export_orders(orders, path, fmt='csv', addon_keys=(), part_size=None):
+    """Stream ``orders`` (any iterable of ``OrderRow``) into gzip-compressed files.
+
+    Each order is encoded and compressed as it arrives, so memory use does not
+    depend on the number of rows. With ``part_size`` set, a new part is started
+    once the compressed output reaches it; every part is a complete file with
+    its own header, named ``<stem>.partNNN.<fmt>.gz``. Returns a list of
+    ``(path, row_count)``, one per file written.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format '{fmt}'")
+    encoder = _CsvEncoder(addon_keys) if fmt == 'csv' else _JsonlEncoder()
+
+    stem = path[:-len(f'.{fmt}.gz')] if path.endswith(f'.{fmt}.gz') else path
+    parts = []
+    raw = stream = None
+    rows = 0
+
+    def open_part():
+        part_path = f'{stem}.part{len(parts) + 1:03d}.{fmt}.gz' if part_size else f'{stem}.{fmt}.gz'
+        part_raw = open(part_path, 'wb')
+        part_stream = io.TextIOWrapper(gzip.GzipFile(fileobj=part_raw, mode='wb'), encoding='utf-8', newline='')
+        part_stream.write(encoder.header())
+        return part_path, part_raw, part_stream
+
+    def close_part():
+        stream.close()
+        raw.close()
+        parts.append((part_path, rows))
+
+    part_path, raw, stream = open_part()
+    try:
+        for order in orders:
+            if part_size and rows and raw.tell() >= part_size:
+                close_part()
+                rows = 0
+                part_path, raw, stream = open_part()
+            stream.write(encoder.encode(order))
+            rows += 1
+        close_part()
+    except BaseException:
+        stream.close()
+        raw.close()
+        for written_path in [written for written, _ in parts] + [part_path]:
+            os.remove(written_path)
+        raise
+    return parts
@@ -0,0 +1,143 @@
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup
+from telegram.helpers import escape_markdown
+
+# Telegram rejects messages longer than this
+MAX_MESSAGE_LENGTH = 4096
+
+EMPTY_CATEGORY_TEXT = "No FAQs found for this category."
+NO_MATCH_TEXT = (
+    "🤔 I couldn't find an answer to that.\n\n"
+    "Browse the FAQ categories below or use /support to ask our team."
+)
+
+
+def _footer_row():
+    return [InlineKeyboardButton("🔙 Back to FAQ", callback_data="view_faq"),
+            InlineKeyboardButton("🛒 Start Order", callback_data="start_order")]
+
+
+def _render_entry(number, question, answer, limit):
+    entry = f"*{number}. {question}*\n{answer}\n\n"
+    if len(entry) > limit:
+        entry = entry[:limit - 2] + "…\n"
+    return entry
+
+
+def render_category_pages(category, faqs, limit=MAX_MESSAGE_LENGTH):
+    """Split a category's FAQs into message texts no longer than ``limit``."""
+    # Leave room for the " (page x/y)" suffix added once the page count is known
+    body_limit = limit - len(f"*❓ {category.title()} FAQs (page 999/999)*\n\n")
+    bodies = []
+    current = []
+    current_length = 0
+
+    for number, (question, answer) in enumerate(faqs, 1):
+        entry = _render_entry(number, question, answer, body_limit)
+        if current and current_length + len(entry) > body_limit:
+            bodies.append(''.join(current))
+            current = []
+            current_length = 0
+        current.append(entry)
+        current_length += len(entry)
+
+    if current:
+        bodies.append(''.join(current))
+
+    if len(bodies) == 1:
+        return [f"*❓ {category.title()} FAQs*\n\n" + bodies[0]]
+    return [
+        f"*❓ {category.title()} FAQs (page {number}/{len(bodies)})*\n\n" + body
+        for number, body in enumerate(bodies, 1)
+    ]
+
+
+def render_search_results(query, faqs, limit=MAX_MESSAGE_LENGTH):
+    """Message text for the FAQs found for a free-text ``query``."""
+    header = f"*🔎 Answers for \"{escape_markdown(query[:100])}\"*\n\n"
+    body = ''
+    for number, (question, answer, _) in enumerate(faqs, 1):
+        entry = _render_entry(number, question, answer, limit - len(header))
+        if len(header) + len(body) + len(entry) > limit:
+            break
+        body += entry
+    return header + body
+
+
+def render_answer(question, answer):
+    """``(text, reply_markup)`` answering a message with a single FAQ."""
+    return f"*💡 {question}*\n\n{answer}", InlineKeyboardMarkup([_footer_row()])
+
+
+def parse_page_callback(data):
+    """``(category, page)`` from ``faq:<category>[:<page>]`` callback data."""
+    payload = data.partition(':')[2]
+    category, _, page = payload.rpartition(':')
+    if category and page.isdigit():
+        return category, int(page)
+    return payload, 0
+
+
+def _page_keyboard(category, page, page_count):
+    keyboard = []
+    nav_row = []
+    if page > 0:
+        nav_row.append(InlineKeyboardButton("◀️ Previous", callback_data=f"faq:{category}:{page - 1}"))
+    if page < page_count - 1:
+        nav_row.append(InlineKeyboardButton("Next ▶️", callback_data=f"faq:{category}:{page + 1}"))
+    if nav_row:
+        keyboard.append(nav_row)
+    keyboard.append(_footer_row())
+    return InlineKeyboardMarkup(keyboard)
+
+
+class FaqCache:
+    """Pre-rendered FAQ category pages, loaded from the database on demand.
+
+    All active FAQs are read in one query and every category is rendered into
+    ready-to-send ``(text, reply_markup)`` pages. The cache stays valid until
+    ``invalidate`` is called, which ``Database`` does whenever FAQ rows change.
+    """
+
+    def __init__(self, db):
+        self.db = db
+        self._pages = None
+        self._empty = (EMPTY_CATEGORY_TEXT, InlineKeyboardMarkup([_footer_row()]))
+        db.sync.add_faq_listener(self.invalidate)
+
+    def invalidate(self):
+        self._pages = None
+
+    def build(self, rows):
+        by_category = {}
+        for question, answer, category in rows:
+            by_category.setdefault(category, []).append((question, answer))
+
+        pages = {}
+        for category, faqs in by_category.items():
+            texts = render_category_pages(category, faqs)
+            pages[category] = [
+                (text, _page_keyboard(category, page, len(texts)))
+                for page, text in enumerate(texts)
+            ]
+        return pages
+
+    async def load(self):
+        self._pages = self.build(await self.db.get_faq_by_category())
+
+    async def get_page(self, category, page=0):
+        """Return ``(text, reply_markup)`` for one page of a category."""
+        if self._pages is None:
+            await self.load()
+
+        pages = self._pages.get(category)
+        if not pages:
+            return self._empty
+        return pages[min(max(page, 0), len(pages) - 1)]
+
+    async def search(self, query, limit=3):
+        """Return ``(text, reply_markup)`` with the best matching FAQs, or
+        ``None`` when nothing matches."""
+        faqs = await self.db.search_faq(query, limit)
+        if not faqs:
+            return None
+        return render_search_results(query, faqs), InlineKeyboardMarkup([_footer_row()])
@@ -1,7 +1,7 @@
+from functools import partial
+
 from telegram import Update, ReplyKeyboardRemove
-from telegram.ext import ContextTypes, ConversationHandler, MessageHandler, filters
-import database as db
-import json
+from telegram.ext import CommandHandler, ContextTypes, ConversationHandler, MessageHandler, filters
 
 # Conversation states
 FULL_NAME, HEADLINE, SKILLS, EXPERIENCE = range(4)
@@ -35,12 +35,12 @@ async def receive_skills(update: Update, context: ContextTypes.DEFAULT_TYPE):
     )
     return EXPERIENCE
 
-async def receive_experience(update: Update, context: ContextTypes.DEFAULT_TYPE):
+async def receive_experience(update: Update, context: ContextTypes.DEFAULT_TYPE, db):
     user_data = context.user_data
     experience = update.message.text
     
     # Save to database
-    db.add_cv_draft(
+    await db.add_cv_draft(
         user_id=update.effective_user.id,
         full_name=user_data['full_name'],
         headline=user_data['headline'],
@@ -84,3 +84,18 @@ async def cancel_cv(update: Update, context: ContextTypes.DEFAULT_TYPE):
     )
     context.user_data.clear()
     return ConversationHandler.END
+
+def build_conversation_handler(db, persistent=False):
+    """``db`` is the bot's ``AsyncDatabase``."""
+    return ConversationHandler(
+        entry_points=[CommandHandler('makecv', makecv_command)],
+        states={
+            FULL_NAME: [MessageHandler(filters.TEXT & ~filters.COMMAND, receive_full_name)],
+            HEADLINE: [MessageHandler(filters.TEXT & ~filters.COMMAND, receive_headline)],
+            SKILLS: [MessageHandler(filters.TEXT & ~filters.COMMAND, receive_skills)],
+            EXPERIENCE: [MessageHandler(filters.TEXT & ~filters.COMMAND, partial(receive_experience, db=db))]
+        },
+        fallbacks=[CommandHandler('cancel', cancel_cv)],
+        name='makecv',
+        persistent=persistent
+    )
@@ -1,6 +1,8 @@
+from functools import partial
+
 from telegram import Update, ReplyKeyboardRemove
-from telegram.ext import ContextTypes, ConversationHandler, MessageHandler, filters
-import database as db
+from telegram.ext import CommandHandler, ContextTypes, ConversationHandler, MessageHandler, filters
+from outbound import BULK
 
 # Conversation states
 TITLE, DESCRIPTION, CONTACT = range(3)
@@ -26,12 +28,12 @@ async def receive_description(update: Update, context: ContextTypes.DEFAULT_TYPE
     )
     return CONTACT
 
-async def receive_contact(update: Update, context: ContextTypes.DEFAULT_TYPE):
+async def receive_contact(update: Update, context: ContextTypes.DEFAULT_TYPE, db):
     user_data = context.user_data
     contact_info = update.message.text
     
     # Save to database
-    db.add_job_submission(
+    await db.add_job_submission(
         user_id=update.effective_user.id,
         title=user_data['title'],
         description=user_data['description'],
@@ -51,7 +53,11 @@ async def receive_contact(update: Update, context: ContextTypes.DEFAULT_TYPE):
     # Send to admin channel (you'll set this in environment variables)
     admin_channel_id = context.bot_data.get('admin_channel_id')
     if admin_channel_id:
-        await context.bot.send_message(chat_id=admin_channel_id, text=admin_message)
+        await context.bot.send_message(
+            chat_id=admin_channel_id,
+            text=admin_message,
+            rate_limit_args={'priority': BULK}
+        )
     
     await update.message.reply_text(
         "✅ Thank you! Your job post has been submitted for review. "
@@ -70,3 +76,17 @@ async def cancel(update: Update, context: ContextTypes.DEFAULT_TYPE):
     )
     context.user_data.clear()
     return ConversationHandler.END
+
+def build_conversation_handler(db, persistent=False):
+    """``db`` is the bot's ``AsyncDatabase``."""
+    return ConversationHandler(
+        entry_points=[CommandHandler('postajob', postajob_command)],
+        states={
+            TITLE: [MessageHandler(filters.TEXT & ~filters.COMMAND, receive_title)],
+            DESCRIPTION: [MessageHandler(filters.TEXT & ~filters.COMMAND, receive_description)],
+            CONTACT: [MessageHandler(filters.TEXT & ~filters.COMMAND, partial(receive_contact, db=db))]
+        },
+        fallbacks=[CommandHandler('cancel', cancel)],
+        name='postajob',
+        persistent=persistent
+    )
@@ -0,0 +1,180 @@
+import asyncio
+import logging
+import math
+import re
+import time
+from collections import Counter
+from typing import Dict, List, NamedTuple, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def char_ngrams(text, n=3):
+    """Character n-grams of the words in ``text``, padded so word starts and
+    ends are n-grams of their own. Robust to typos and inflections."""
+    text = ' ' + ' '.join(re.findall(r'\w+', text.lower())) + ' '
+    return [text[i:i + n] for i in range(len(text) - n + 1)]
+
+
+class FaqMatch(NamedTuple):
+    question: str
+    answer: str
+    category: str
+    similarity: float
+
+
+class _FaqIndex(NamedTuple):
+    faqs: List[Tuple[str, str, str]]
+    vocabulary: Dict[str, int]
+    idf: np.ndarray
+    oov_idf: float
+    matrix: np.ndarray  # one L2-normalised TF-IDF row per FAQ question
+
+
+def build_index(faqs):
+    """Embed FAQ questions into a dense char-trigram TF-IDF matrix."""
+    faqs = list(faqs)
+    counts = [Counter(char_ngrams(question)) for question, _, _ in faqs]
+    vocabulary = {}
+    document_frequency = Counter()
+    for row in counts:
+        for gram in row:
+            vocabulary.setdefault(gram, len(vocabulary))
+        document_frequency.update(row.keys())
+
+    # Smoothed idf, as if one extra document contained every term
+    idf = np.ones(len(vocabulary), dtype=np.float32)
+    for gram, index in vocabulary.items():
+        idf[index] += math.log((1 + len(faqs)) / (1 + document_frequency[gram]))
+    oov_idf = 1 + math.log(1 + len(faqs))
+
+    matrix = np.zeros((len(faqs), len(vocabulary)), dtype=np.float32)
+    for row, grams in enumerate(counts):
+        for gram, count in grams.items():
+            matrix[row, vocabulary[gram]] = 1 + math.log(count)
+    matrix *= idf
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    matrix /= np.maximum(norms, 1e-12)
+    return _FaqIndex(faqs, vocabulary, idf, oov_idf, matrix)
+
+
+def score(index, texts):
+    """Best matching FAQ for every text, scored with one matrix product.
+
+    Returns ``(faq_indices, similarities)`` arrays. Trigrams no FAQ contains
+    still count towards a text's norm, so unrelated words lower its score.
+    """
+    queries = np.zeros((len(texts), len(index.vocabulary)), dtype=np.float32)
+    oov_norm_sq = np.zeros(len(texts), dtype=np.float32)
+    for row, text in enumerate(texts):
+        for gram, count in Counter(char_ngrams(text)).items():
+            weight = 1 + math.log(count)
+            column = index.vocabulary.get(gram)
+            if column is None:
+                oov_norm_sq[row] += (weight * index.oov_idf) ** 2
+            else:
+                queries[row, column] = weight
+    queries *= index.idf
+    norms = np.sqrt((queries ** 2).sum(axis=1) + oov_norm_sq)
+
+    similarities = queries @ index.matrix.T
+    best = similarities.argmax(axis=1)
+    best_similarity = similarities[np.arange(len(texts)), best] / np.maximum(norms, 1e-12)
+    return best, best_similarity
+
+
+class FaqMatcher:
+    """Auto-answers free text with the most similar FAQ question.
+
+    Questions from ``Database.get_faq_by_category`` are embedded once into a
+    char-trigram TF-IDF matrix, rebuilt only after ``Database`` reports a FAQ
+    change. Messages passed to ``match`` within ``max_wait`` seconds of each
+    other are scored together as one batch (one matrix product); a message is
+    answered when its cosine similarity reaches ``threshold``. Hit rate and
+    latency are logged every ``log_every`` messages.
+    """
+
+    def __init__(self, db, threshold=0.5, max_wait=0.005, log_every=100):
+        self.db = db
+        self.threshold = threshold
+        self.max_wait = max_wait
+        self.log_every = log_every
+        self.messages = 0
+        self.hits = 0
+        self.batches = 0
+        self.seconds = 0.0
+        self._index = None
+        self._generation = 0  # bumped by invalidate, so stale rebuilds are dropped
+        self._pending = []
+        self._task = None
+        db.sync.add_faq_listener(self.invalidate)
+
+    def invalidate(self):
+        self._generation += 1
+        self._index = None
+
+    async def load(self):
+        """Build an index from the current FAQs and install it, unless the
+        FAQs changed while it was being built; it is returned either way."""
+        generation = self._generation
+        index = build_index(await self.db.get_faq_by_category())
+        if generation == self._generation:
+            self._index = index
+        return index
+
+    async def match(self, text):
+        """Return the ``FaqMatch`` for ``text``, or ``None`` below the threshold."""
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((text, future))
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        return await future
+
+    async def _run(self):
+        # Let messages that arrive together join the batch first
+        await asyncio.sleep(self.max_wait)
+        while self._pending:
+            batch, self._pending = self._pending, []
+            try:
+                results = await self._match_batch([text for text, _ in batch])
+            except Exception as e:
+                logger.error(f"Error matching {len(batch)} messages against FAQs: {e}")
+                results = [None] * len(batch)
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+
+    async def _match_batch(self, texts):
+        # Read once: invalidate may be called from the database thread
+        index = self._index
+        if index is None:
+            index = await self.load()
+        if not index.faqs:
+            return [None] * len(texts)
+
+        start = time.perf_counter()
+        best, similarities = score(index, texts)
+        elapsed = time.perf_counter() - start
+
+        results = [
+            FaqMatch(*index.faqs[faq], float(similarity)) if similarity >= self.threshold else None
+            for faq, similarity in zip(best, similarities)
+        ]
+        self._record(len(texts), sum(result is not None for result in results), elapsed)
+        return results
+
+    def _record(self, messages, hits, seconds):
+        logged_before = self.messages // self.log_every
+        self.messages += messages
+        self.hits += hits
+        self.batches += 1
+        self.seconds += seconds
+        logger.debug(f"Matched {messages} messages against FAQs in {seconds * 1000:.2f} ms, {hits} hits")
+        if self.messages // self.log_every > logged_before:
+            logger.info(
+                f"FAQ matcher: {self.messages} messages, hit rate {self.hits / self.messages:.0%}, "
+                f"{self.seconds / self.batches * 1000:.2f} ms per batch "
+                f"({self.messages / self.batches:.1f} messages per batch)"
+            )
@@ -0,0 +1,121 @@
+import asyncio
+import hashlib
+import logging
+from collections import OrderedDict
+
+from telegram.error import BadRequest
+
+logger = logging.getLogger(__name__)
+
+
+def content_digest(text, reply_markup=None):
+    blob = text + '\0' + (reply_markup.to_json() if reply_markup is not None else '')
+    return hashlib.blake2b(blob.encode(), digest_size=8).digest()
+
+
+class _Entry:
+    __slots__ = ('digest', 'state', 'last_edit', 'pending', 'task')
+
+    def __init__(self):
+        self.digest = None
+        self.state = None
+        self.last_edit = float('-inf')
+        self.pending = None
+        self.task = None
+
+
+class MessageEditor:
+    """Coalesces edits of the same message and drops edits that change nothing.
+
+    ``edit`` sends right away. ``edit_soon`` sends right away too unless the
+    message was edited less than ``window`` seconds ago; then only the latest
+    content requested within the window is sent, once it ends. Either way an
+    edit whose text and markup hash to what the message already shows is
+    skipped.
+
+    Each message can also carry a small ``state`` (e.g. the add-on selection
+    it shows or is about to show), so a tap on a button that has not been
+    re-rendered yet can still be applied to the newest selection. Only the
+    ``max_messages`` most recently edited messages are remembered.
+    """
+
+    def __init__(self, window=0.3, max_messages=10000):
+        self.window = window
+        self.max_messages = max_messages
+        self.sent = 0
+        self.skipped = 0
+        self.coalesced = 0
+        self._entries = OrderedDict()
+
+    def _entry(self, message):
+        key = (message.chat_id, message.message_id)
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = self._entries[key] = _Entry()
+            if len(self._entries) > self.max_messages:
+                _, oldest = self._entries.popitem(last=False)
+                if oldest.task is not None:
+                    oldest.task.cancel()
+        else:
+            self._entries.move_to_end(key)
+        return entry
+
+    def state(self, message, default=None):
+        """The ``state`` of the last edit requested for ``message``."""
+        entry = self._entries.get((message.chat_id, message.message_id))
+        if entry is None or entry.state is None:
+            return default
+        return entry.state
+
+    async def edit(self, message, text, reply_markup=None, parse_mode='Markdown', state=None):
+        """Edit ``message`` now, replacing any edit still waiting for it."""
+        entry = self._entry(message)
+        entry.state = state
+        if entry.task is not None:
+            entry.task.cancel()
+            entry.task = None
+            entry.pending = None
+        await self._send(message, entry, text, reply_markup, parse_mode)
+
+    async def edit_soon(self, message, text, reply_markup=None, parse_mode='Markdown', state=None):
+        """Edit ``message`` now, or at the end of its debounce window."""
+        entry = self._entry(message)
+        entry.state = state
+        loop = asyncio.get_running_loop()
+        delay = entry.last_edit + self.window - loop.time()
+        if delay <= 0 and entry.task is None:
+            await self._send(message, entry, text, reply_markup, parse_mode)
+            return
+
+        if entry.pending is not None:
+            self.coalesced += 1
+        entry.pending = (text, reply_markup, parse_mode)
+        if entry.task is None:
+            entry.task = asyncio.create_task(self._send_later(message, entry, delay))
+
+    async def _send_later(self, message, entry, delay):
+        await asyncio.sleep(max(delay, 0))
+        text, reply_markup, parse_mode = entry.pending
+        entry.task = None
+        entry.pending = None
+        try:
+            await self._send(message, entry, text, reply_markup, parse_mode)
+        except Exception as e:
+            logger.error(f"Error editing message {message.message_id} in chat {message.chat_id}: {e}")
+
+    async def _send(self, message, entry, text, reply_markup, parse_mode):
+        digest = content_digest(text, reply_markup)
+        if digest == entry.digest:
+            self.skipped += 1
+            return
+        entry.last_edit = asyncio.get_running_loop().time()
+        try:
+            await message.edit_text(text, parse_mode=parse_mode, reply_markup=reply_markup)
+        except BadRequest as e:
+            # The message already shows this content (e.g. edited before a restart)
+            if 'not modified' not in str(e).lower():
+                raise
+            self.skipped += 1
+        else:
+            self.sent += 1
+        entry.digest = digest
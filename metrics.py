@@ -0,0 +1,288 @@
+import bisect
+import functools
+import logging
+import math
+import socket
+import threading
+import time
+
+from flask import Flask, Response
+from telegram.ext import ConversationHandler
+from werkzeug.serving import make_server
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Seconds; Telegram round trips are ~50-300 ms, SQLite calls well under 10 ms
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_value(value):
+    if value == math.inf:
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(names, values, extra=''):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+class _Family:
+    """A metric name with one series per combination of label values."""
+
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=(), lock=None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = lock or threading.Lock()
+        self._series = {}
+
+    def _key(self, labels):
+        return labels if isinstance(labels, tuple) else (labels,)
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.kind}']
+        with self._lock:
+            series = sorted(self._series.items())
+            lines.extend(self._render_series(series))
+        return lines
+
+    def _render_series(self, series):
+        for labels, value in series:
+            yield f'{self.name}{_labels(self.labelnames, labels)} {_format_value(value)}'
+
+
+class Counter(_Family):
+    kind = 'counter'
+
+    def inc(self, labels=(), amount=1):
+        key = self._key(labels)
+        with self._lock:
+            self._series[key] = self._series.get(key, 0) + amount
+
+
+class Gauge(_Family):
+    """A value set directly, or read from ``func`` at every scrape.
+
+    ``func`` returns a number, or with labels a dict of label values (a tuple,
+    or a plain value for a single label) to numbers.
+    """
+
+    kind = 'gauge'
+
+    def __init__(self, name, documentation, labelnames=(), lock=None, func=None):
+        super().__init__(name, documentation, labelnames, lock)
+        self.func = func
+
+    def inc(self, labels=(), amount=1):
+        key = self._key(labels)
+        with self._lock:
+            self._series[key] = self._series.get(key, 0) + amount
+
+    def dec(self, labels=(), amount=1):
+        self.inc(labels, -amount)
+
+    def set(self, value, labels=()):
+        with self._lock:
+            self._series[self._key(labels)] = value
+
+    def render(self):
+        if self.func is not None:
+            try:
+                value = self.func()
+            except Exception as e:
+                logger.error(f"Error reading gauge {self.name}: {e}")
+                value = {}
+            values = value.items() if isinstance(value, dict) else [((), value)]
+            with self._lock:
+                self._series = {self._key(labels): value for labels, value in values}
+        return super().render()
+
+
+class Histogram(_Family):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), lock=None, buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames, lock)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, labels=()):
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                # One count per bucket (not cumulative) plus +Inf, then the sum
+                series = self._series[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[bisect.bisect_left(self.buckets, value)] += 1
+            series[-1] += value
+
+    def _render_series(self, series):
+        for labels, values in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), values):
+                cumulative += count
+                le = 'le="' + _format_value(float(bound)) + '"'
+                yield f'{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}'
+            yield f'{self.name}_sum{_labels(self.labelnames, labels)} {_format_value(values[-1])}'
+            yield f'{self.name}_count{_labels(self.labelnames, labels)} {cumulative}'
+
+
+class CallMetrics:
+    """Latency histogram, in-flight gauge and error counter for one kind of call.
+
+    Exposed as ``<prefix>_seconds``, ``<prefix>_in_flight`` and
+    ``<prefix>_errors_total``, labelled with ``label``.
+    """
+
+    def __init__(self, metrics, prefix, label, description):
+        self.seconds = metrics.histogram(f'{prefix}_seconds', f'{description} latency in seconds.', [label])
+        self.in_flight = metrics.gauge(f'{prefix}_in_flight', f'{description}s in progress.', [label])
+        self.errors = metrics.counter(f'{prefix}_errors_total', f'{description}s that raised.', [label])
+
+    async def track(self, name, awaitable):
+        """Await ``awaitable`` and record it under ``name``."""
+        self.in_flight.inc(name)
+        start = time.perf_counter()
+        try:
+            return await awaitable
+        except Exception:
+            self.errors.inc(name)
+            raise
+        finally:
+            self.seconds.observe(time.perf_counter() - start, name)
+            self.in_flight.dec(name)
+
+    def wrap(self, callback, name=None):
+        """``callback`` as a coroutine function recorded under ``name``."""
+        name = name or callback_name(callback)
+
+        @functools.wraps(callback)
+        async def tracked(*args, **kwargs):
+            return await self.track(name, callback(*args, **kwargs))
+
+        tracked.metrics_name = name
+        return tracked
+
+
+class Metrics:
+    """Registry of metric families, rendered in Prometheus text format."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._families = {}
+
+    def _add(self, cls, name, *args, **kwargs):
+        family = self._families.get(name)
+        if family is None:
+            family = self._families[name] = cls(name, *args, lock=self._lock, **kwargs)
+        elif not isinstance(family, cls):
+            raise ValueError(f"Metric {name} is already registered as a {family.kind}")
+        return family
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._add(Counter, name, documentation, labelnames)
+
+    def gauge(self, name, documentation, labelnames=(), func=None):
+        return self._add(Gauge, name, documentation, labelnames, func=func)
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._add(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def calls(self, prefix, label, description):
+        return CallMetrics(self, prefix, label, description)
+
+    def render(self):
+        lines = []
+        for family in list(self._families.values()):
+            lines.extend(family.render())
+        return '\n'.join(lines) + '\n'
+
+
+def callback_name(callback):
+    """``SocialMediaBot.start_command``, ``postajob_conv.receive_title``, ..."""
+    if isinstance(callback, functools.partial):
+        callback = callback.func
+    name = getattr(callback, 'metrics_name', None) or getattr(callback, '__qualname__', None)
+    if name is None:
+        return type(callback).__name__
+    module = getattr(callback, '__module__', None)
+    if '.' not in name and module and module != '__main__':
+        name = f"{module.rsplit('.', 1)[-1]}.{name}"
+    return name
+
+
+def _iter_handlers(handlers):
+    for handler in handlers:
+        if isinstance(handler, ConversationHandler):
+            yield from _iter_handlers(handler.entry_points)
+            for state_handlers in handler.states.values():
+                yield from _iter_handlers(state_handlers)
+            yield from _iter_handlers(handler.fallbacks)
+        else:
+            yield handler
+
+
+def instrument_application(application, metrics):
+    """Record every handler callback registered on ``application``, including
+    those nested in conversations, under ``handler_seconds`` and friends.
+
+    Call it after all handlers are added; handlers added later are not
+    recorded. Also exports the depth of the update queue.
+    """
+    calls = metrics.calls('handler', 'handler', 'Handler callback')
+    for group in application.handlers.values():
+        for handler in _iter_handlers(group):
+            if not hasattr(handler.callback, 'metrics_name'):
+                handler.callback = calls.wrap(handler.callback)
+    metrics.gauge(
+        'update_queue_depth', 'Updates received but not yet processed.',
+        func=application.update_queue.qsize
+    )
+    return calls
+
+
+class MetricsServer:
+    """Serves ``GET /metrics`` from a small Flask app on a daemon thread."""
+
+    def __init__(self, metrics, host='127.0.0.1', port=9100):
+        self.metrics = metrics
+        self.host = host
+        self.port = port
+        self.app = Flask(__name__)
+        self.app.add_url_rule('/metrics', 'metrics', self._render)
+        self._server = None
+        self._thread = None
+
+    def _render(self):
+        return Response(self.metrics.render(), content_type=CONTENT_TYPE)
+
+    def start(self):
+        """Bind and start serving; raises ``OSError`` if the port is taken."""
+        # Bind here: werkzeug reports a failed bind with sys.exit(1), which
+        # callers could not tell apart from any other shutdown
+        family = socket.AF_INET6 if ':' in self.host else socket.AF_INET
+        with socket.create_server((self.host, self.port), family=family) as sock:
+            self._server = make_server(self.host, self.port, self.app, threaded=True, fd=sock.fileno())
+        self.port = self._server.port
+        self._thread = threading.Thread(target=self._server.serve_forever, name='metrics', daemon=True)
+        self._thread.start()
+        logger.info(f"Serving metrics on http://{self.host}:{self.port}/metrics")
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._thread.join()
+            self._server.server_close()
+            self._server = None
@@ -0,0 +1,59 @@
+import logging
+import time
+from typing import Callable, NamedTuple
+
+logger = logging.getLogger(__name__)
+
+
+class Migration(NamedTuple):
+    version: int
+    description: str
+    apply: Callable  # (connection) -> None, run inside the migration transaction
+
+
+def schema_version(conn):
+    return conn.execute('PRAGMA user_version').fetchone()[0]
+
+
+def migrate(conn, migrations):
+    """Apply the ``migrations`` newer than the database's ``user_version``.
+
+    A database that is already current costs one ``PRAGMA user_version``
+    read and no DDL. Otherwise every pending migration runs, in version
+    order, in one ``BEGIN IMMEDIATE`` transaction that also bumps
+    ``user_version``, so a failed migration leaves the schema untouched and
+    two processes starting together migrate only once. Migrations should be
+    additive (new tables, columns and indexes): in WAL mode readers carry on
+    against the old schema while they run, and writers wait at most for the
+    transaction to commit.
+
+    Returns the versions applied.
+    """
+    latest = migrations[-1].version if migrations else 0
+    current = schema_version(conn)
+    if current >= latest:
+        if current > latest:
+            logger.warning(f"Database schema is at version {current}, newer than this code's {latest}")
+        return []
+
+    applied = []
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        # Re-read under the write lock: another process may have just migrated
+        current = schema_version(conn)
+        for migration in migrations:
+            if migration.version <= current:
+                continue
+            start = time.perf_counter()
+            migration.apply(conn)
+            conn.execute(f'PRAGMA user_version = {migration.version:d}')
+            applied.append(migration.version)
+            logger.info(
+                f"Applied schema migration {migration.version} ({migration.description}) "
+                f"in {(time.perf_counter() - start) * 1000:.1f} ms"
+            )
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    return applied
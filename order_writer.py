@@ -0,0 +1,95 @@
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class OrderBatchWriter:
+    """Write-behind queue that group-commits order inserts.
+
+    ``submit`` enqueues an order and waits for its ID. A background task takes
+    whatever has queued up, waits at most ``max_wait`` seconds for the batch to
+    fill to ``max_batch``, and inserts the whole batch in one transaction via
+    ``Database.create_orders``. Orders arriving while a batch is committing
+    form the next batch. The wait only applies during a burst (the previous
+    batch was at least half full), so light traffic is written immediately.
+    """
+
+    def __init__(self, db, max_batch=50, max_wait=0.005):
+        self.db = db
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._queue = None
+        self._task = None
+        self._last_batch_size = 0
+
+    def start(self):
+        if self._task is None:
+            self._queue = asyncio.Queue()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Commit everything already submitted, then stop the writer task."""
+        if self._task is None:
+            return
+        await self._queue.put(_STOP)
+        await self._task
+        self._task = None
+
+    async def submit(self, order_data):
+        """Queue ``order_data`` for insertion and return its order ID."""
+        self.start()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((order_data, future))
+        return await future
+
+    @property
+    def pending(self):
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def _collect(self, first):
+        batch = [first]
+        loop = asyncio.get_running_loop()
+        max_wait = self.max_wait if self._last_batch_size * 2 >= self.max_batch else 0
+        deadline = loop.time() + max_wait
+
+        while len(batch) < self.max_batch:
+            try:
+                item = self._queue.get_nowait()
+            except asyncio.QueueEmpty:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+
+        return batch, False
+
+    async def _run(self):
+        stopping = False
+        while not stopping:
+            first = await self._queue.get()
+            if first is _STOP:
+                break
+            batch, stopping = await self._collect(first)
+            self._last_batch_size = len(batch)
+
+            try:
+                order_ids = await self.db.create_orders([order_data for order_data, _ in batch])
+            except Exception as e:
+                logger.error(f"Error writing batch of {len(batch)} orders: {e}")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            for (_, future), order_id in zip(batch, order_ids):
+                if not future.done():
+                    future.set_result(order_id)
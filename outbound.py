@@ -0,0 +1,180 @@
+import asyncio
+import logging
+import time
+
+from telegram.error import RetryAfter
+from telegram.ext import BaseRateLimiter
+
+logger = logging.getLogger(__name__)
+
+# Priority lanes, passed as ``rate_limit_args={'priority': BULK}``
+INTERACTIVE = 'interactive'
+BULK = 'bulk'
+
+
+class TokenBucket:
+    """Token bucket refilled at ``rate`` tokens per second, holding at most ``burst``.
+
+    ``reserve`` always takes a token and returns how long the caller must wait
+    for it, so waiters are served in the order they reserved.
+    """
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self):
+        now = time.monotonic()
+        self._refill(now)
+        self.tokens -= 1
+        wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        return max(wait, self.paused_until - now)
+
+    def try_acquire(self):
+        """Take a token only if one is free right now."""
+        now = time.monotonic()
+        self._refill(now)
+        if self.tokens >= 1 and now >= self.paused_until:
+            self.tokens -= 1
+            return True
+        return False
+
+    def time_until_token(self):
+        now = time.monotonic()
+        self._refill(now)
+        return max((1 - self.tokens) / self.rate, self.paused_until - now, 0.0)
+
+    def pause(self, seconds):
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+    def idle_since(self, now):
+        return self.tokens >= self.burst and now >= self.paused_until
+
+
+class OutboundScheduler(BaseRateLimiter):
+    """Paces every Bot API request through global, per-chat and per-group buckets.
+
+    Defaults follow Telegram's limits: about 30 messages per second overall,
+    one per second in a private chat, and 20 per minute in a group or
+    channel. Requests without a ``chat_id`` (getUpdates, answerCallbackQuery,
+    ...) are not paced.
+
+    Interactive requests (the default lane) reserve tokens immediately. Bulk
+    requests only take a global token when one is free and no interactive
+    request is waiting for a global token, so channel posts and admin
+    notifications never delay replies to users. Interactive requests held
+    back only by their own chat's pace do not hold up bulk ones. A
+    ``RetryAfter`` pauses the affected chat for the requested time and the
+    request is retried up to ``max_retries`` times.
+
+    The buckets live in one process. Processes sending with the same token
+    (bot.py and create_post.py) must split ``global_rate`` between them.
+
+    With ``calls`` (a ``metrics.CallMetrics``) every request is timed by
+    endpoint, not counting the time spent waiting for a token.
+    """
+
+    def __init__(self, global_rate=30, chat_rate=1, chat_burst=3, group_rate=20 / 60,
+                 group_burst=1, max_retries=3, calls=None):
+        self.global_bucket = TokenBucket(global_rate, global_rate)
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        self.group_rate = group_rate
+        self.group_burst = group_burst
+        self.max_retries = max_retries
+        self.calls = calls
+        self.waiting = {INTERACTIVE: 0, BULK: 0}
+        self.waiting_global = 0  # interactive requests waiting for a global token
+        self._chat_buckets = {}
+        self._requests_since_cleanup = 0
+
+    async def initialize(self):
+        pass
+
+    async def shutdown(self):
+        pass
+
+    def _chat_bucket(self, chat_id):
+        bucket = self._chat_buckets.get(chat_id)
+        if bucket is None:
+            is_group = isinstance(chat_id, str) or chat_id < 0
+            if is_group:
+                bucket = TokenBucket(self.group_rate, self.group_burst)
+            else:
+                bucket = TokenBucket(self.chat_rate, self.chat_burst)
+            self._chat_buckets[chat_id] = bucket
+        return bucket
+
+    def _cleanup(self):
+        """Forget buckets that have fully refilled; they hold no state."""
+        self._requests_since_cleanup += 1
+        if self._requests_since_cleanup < 1000:
+            return
+        self._requests_since_cleanup = 0
+        now = time.monotonic()
+        for chat_id in [key for key, bucket in self._chat_buckets.items() if bucket.idle_since(now)]:
+            del self._chat_buckets[chat_id]
+
+    async def _wait(self, lane, delay, is_global=False):
+        if delay <= 0:
+            return
+        self.waiting[lane] += 1
+        self.waiting_global += is_global
+        try:
+            await asyncio.sleep(delay)
+        finally:
+            self.waiting[lane] -= 1
+            self.waiting_global -= is_global
+
+    async def _acquire(self, lane, chat_bucket):
+        await self._wait(lane, chat_bucket.reserve())
+
+        if lane == INTERACTIVE:
+            await self._wait(lane, self.global_bucket.reserve(), is_global=True)
+            return
+
+        self.waiting[lane] += 1
+        try:
+            while self.waiting_global or not self.global_bucket.try_acquire():
+                await asyncio.sleep(max(self.global_bucket.time_until_token(), 0.01))
+        finally:
+            self.waiting[lane] -= 1
+
+    async def _call(self, callback, args, kwargs, endpoint):
+        if self.calls is None:
+            return await callback(*args, **kwargs)
+        return await self.calls.track(endpoint, callback(*args, **kwargs))
+
+    async def process_request(self, callback, args, kwargs, endpoint, data, rate_limit_args):
+        rate_limit_args = rate_limit_args or {}
+        lane = rate_limit_args.get('priority', INTERACTIVE)
+        max_retries = rate_limit_args.get('max_retries', self.max_retries)
+
+        chat_id = data.get('chat_id')
+        if chat_id is None:
+            return await self._call(callback, args, kwargs, endpoint)
+        try:
+            chat_id = int(chat_id)
+        except (TypeError, ValueError):
+            pass
+
+        chat_bucket = self._chat_bucket(chat_id)
+        self._cleanup()
+
+        for attempt in range(max_retries + 1):
+            await self._acquire(lane, chat_bucket)
+            try:
+                return await self._call(callback, args, kwargs, endpoint)
+            except RetryAfter as e:
+                if attempt == max_retries:
+                    raise
+                retry_after = float(e.retry_after)
+                logger.warning(f"{endpoint} to {chat_id} hit flood control, retrying in {retry_after}s")
+                chat_bucket.pause(retry_after)
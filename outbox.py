@@ -0,0 +1,185 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+
+from telegram.error import BadRequest, TelegramError
+
+from outbound import BULK
+
+logger = logging.getLogger(__name__)
+
+
+def is_parse_error(error):
+    """Whether Telegram rejected a message because of its Markdown."""
+    return isinstance(error, BadRequest) and "can't parse entities" in error.message.lower()
+
+
+class AdminOutbox:
+    """Delivers admin notifications for orders with ``admin_notified = 0``.
+
+    The orders table is the outbox: ``confirm_order`` only commits the order,
+    and ``dispatch`` (run by the JobQueue) later sends the pending ones to the
+    admin channel in batches. An order is marked notified only after its
+    message was accepted. Failed orders are retried with exponential backoff,
+    tracked in memory, so one bad order never blocks the rest.
+
+    A notification whose Markdown Telegram cannot parse is resent as plain
+    text. Telegram errors, including a wrong or inaccessible admin chat, are
+    retried until they are fixed. An order is given up on, logged in full
+    and marked failed (``admin_notified = 2``) only if even its plain text is
+    rejected, or if it failed ``max_attempts`` times for another reason.
+
+    With ``render_digest`` set, pending orders are instead collected into one
+    summary message. A digest is sent once the oldest pending order is
+    ``digest_window`` seconds old, ``digest_max_orders`` are pending, or the
+    pending orders no longer fit in one ``max_length`` message. A digest
+    whose Markdown Telegram cannot parse is not retried; its orders are sent
+    one by one instead, each handled as above.
+
+    A ``kick`` that arrives while a dispatch is running makes that dispatch
+    look for pending orders once more before it returns.
+    """
+
+    def __init__(self, db, render, chat_id, batch_size=20, base_delay=5, max_delay=600, max_attempts=10,
+                 render_digest=None, digest_window=60, digest_max_orders=50, max_length=4096):
+        self.db = db
+        self.render = render
+        self.chat_id = chat_id
+        self.batch_size = batch_size
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_attempts = max_attempts
+        self.render_digest = render_digest
+        self.digest_window = digest_window
+        self.digest_max_orders = digest_max_orders
+        self.max_length = max_length
+        self._backoff = {}
+        self._digest_backoff = (0, 0)
+        self._lock = asyncio.Lock()
+        self._rerun = False
+
+    def kick(self, job_queue):
+        """Run a dispatch right away instead of waiting for the next interval."""
+        job_queue.run_once(self.dispatch, 0, name='admin_outbox_kick')
+
+    async def dispatch(self, context):
+        if self._lock.locked():
+            self._rerun = True
+            return
+        async with self._lock:
+            self._rerun = True
+            while self._rerun:
+                self._rerun = False
+                if self.render_digest is not None:
+                    while await self._dispatch_digest(context.bot):
+                        pass
+                else:
+                    while await self._dispatch_batch(context.bot) == self.batch_size:
+                        pass
+
+    async def _dispatch_digest(self, bot):
+        """Send one digest if a flush is due; return whether one was sent."""
+        attempts, retry_at = self._digest_backoff
+        if retry_at > time.monotonic():
+            return False
+
+        orders = await self.db.get_pending_admin_notifications(self.digest_max_orders)
+        if not orders:
+            return False
+
+        text, count = self.render_digest(orders, self.max_length)
+        oldest = datetime.strptime(orders[0].created_at, '%Y-%m-%d %H:%M:%S').replace(tzinfo=timezone.utc)
+        age = (datetime.now(timezone.utc) - oldest).total_seconds()
+        if count == len(orders) < self.digest_max_orders and age < self.digest_window:
+            return False
+
+        if count == 0:
+            # A single order too long for a digest line goes out on its own
+            return await self._send_order(bot, orders[0])
+
+        try:
+            await self._send(bot, text)
+        except BadRequest as e:
+            if not is_parse_error(e):
+                return self._retry_digest_later(attempts, count, e)
+            logger.error(f"Admin digest of {count} orders has broken Markdown, sending them one by one: {e}")
+            for order in orders[:count]:
+                await self._send_order(bot, order)
+            # Anything still pending waits for the next run
+            return False
+        except Exception as e:
+            return self._retry_digest_later(attempts, count, e)
+
+        await self.db.mark_admin_notified_many([order.id for order in orders[:count]])
+        self._digest_backoff = (0, 0)
+        return True
+
+    def _retry_digest_later(self, attempts, count, error):
+        delay = min(self.base_delay * 2 ** attempts, self.max_delay)
+        self._digest_backoff = (attempts + 1, time.monotonic() + delay)
+        logger.error(f"Error sending admin digest of {count} orders "
+                     f"(attempt {attempts + 1}, retrying in {delay}s): {error}")
+        return False
+
+    async def _dispatch_batch(self, bot):
+        now = time.monotonic()
+        orders = await self.db.get_pending_admin_notifications(self.batch_size + len(self._backoff))
+        due = [order for order in orders
+               if self._backoff.get(order.id, (0, 0))[1] <= now][:self.batch_size]
+
+        delivered = 0
+        for order in due:
+            delivered += await self._send_order(bot, order)
+        return delivered
+
+    async def _send(self, bot, text, parse_mode='Markdown'):
+        await bot.send_message(
+            chat_id=self.chat_id,
+            text=text,
+            parse_mode=parse_mode,
+            rate_limit_args={'priority': BULK}
+        )
+
+    async def _send_order(self, bot, order):
+        """Send one order's notification; return whether it was delivered."""
+        attempts = self._backoff.get(order.id, (0, 0))[0] + 1
+        try:
+            text = self.render(order)
+            try:
+                await self._send(bot, text)
+            except BadRequest as e:
+                if not is_parse_error(e):
+                    raise
+                logger.warning(f"Admin notification for order #{order.id} has broken Markdown ({e}), "
+                               f"resending it as plain text")
+                try:
+                    await self._send(bot, text, parse_mode=None)
+                except BadRequest as e:
+                    return await self._give_up(order, attempts, e)
+        except TelegramError as e:
+            # Also a wrong or inaccessible admin chat: retried until it is fixed
+            self._retry_later(order, attempts, e)
+            return False
+        except Exception as e:
+            if attempts >= self.max_attempts:
+                return await self._give_up(order, attempts, e)
+            self._retry_later(order, attempts, e)
+            return False
+
+        await self.db.mark_admin_notified(order.id)
+        self._backoff.pop(order.id, None)
+        return True
+
+    async def _give_up(self, order, attempts, error):
+        logger.error(f"Giving up on the admin notification for order #{order.id} "
+                     f"after {attempts} attempts: {error}; order: {order}")
+        await self.db.mark_admin_failed(order.id)
+        self._backoff.pop(order.id, None)
+        return False
+
+    def _retry_later(self, order, attempts, error):
+        delay = min(self.base_delay * 2 ** (attempts - 1), self.max_delay)
+        self._backoff[order.id] = (attempts, time.monotonic() + delay)
+        logger.error(f"Error sending admin notification for order #{order.id} "
+                     f"(attempt {attempts}, retrying in {delay}s): {error}")
@@ -0,0 +1,194 @@
+import asyncio
+import hashlib
+import json
+import logging
+import pickle
+
+from telegram.ext import BasePersistence, PersistenceInput
+
+logger = logging.getLogger(__name__)
+
+USER_DATA = 'user_data'
+CHAT_DATA = 'chat_data'
+BOT_DATA = 'bot_data'
+CALLBACK_DATA = 'callback_data'
+CONVERSATION = 'conversation'
+
+LOAD_SQL = {
+    USER_DATA: 'SELECT data FROM persistence_user_data WHERE user_id = ?',
+    CHAT_DATA: 'SELECT data FROM persistence_chat_data WHERE chat_id = ?',
+    BOT_DATA: 'SELECT data FROM persistence_bot_data WHERE id = ?',
+    CALLBACK_DATA: 'SELECT data FROM persistence_callback_data WHERE id = ?',
+}
+SAVE_SQL = {
+    USER_DATA: 'INSERT OR REPLACE INTO persistence_user_data (user_id, data) VALUES (?, ?)',
+    CHAT_DATA: 'INSERT OR REPLACE INTO persistence_chat_data (chat_id, data) VALUES (?, ?)',
+    BOT_DATA: 'INSERT OR REPLACE INTO persistence_bot_data (id, data) VALUES (?, ?)',
+    CALLBACK_DATA: 'INSERT OR REPLACE INTO persistence_callback_data (id, data) VALUES (?, ?)',
+    CONVERSATION: 'INSERT OR REPLACE INTO persistence_conversations (name, conversation_key, state) VALUES (?, ?, ?)',
+}
+DELETE_SQL = {
+    USER_DATA: 'DELETE FROM persistence_user_data WHERE user_id = ?',
+    CHAT_DATA: 'DELETE FROM persistence_chat_data WHERE chat_id = ?',
+    CONVERSATION: 'DELETE FROM persistence_conversations WHERE name = ? AND conversation_key = ?',
+}
+CONVERSATIONS_SQL = 'SELECT conversation_key, state FROM persistence_conversations WHERE name = ?'
+
+
+def _dumps(data):
+    return pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def _digest(blob):
+    return hashlib.blake2b(blob, digest_size=8).digest()
+
+
+class SQLitePersistence(BasePersistence):
+    """PTB persistence stored in the bot's SQLite database.
+
+    Only keys whose contents actually changed since they were last written
+    are saved. ``update_*`` calls made during one persistence run are
+    collected and written together in a single transaction on the database
+    thread. User and chat data are not loaded at startup; each user or chat
+    is read the first time an update for it arrives, via ``refresh_*``.
+    Conversation states are small and are loaded per handler on startup.
+    """
+
+    def __init__(self, db, update_interval=10, store_data=None):
+        super().__init__(
+            store_data=store_data or PersistenceInput(callback_data=False),
+            update_interval=update_interval
+        )
+        self.db = db
+        self._loaded = {USER_DATA: set(), CHAT_DATA: set()}
+        self._written = {}
+        self._dirty = {}
+        self._flush_task = None
+
+    # Loading
+
+    def _load_rows(self, kind, keys):
+        with self.db.sync.pool.connection() as conn:
+            rows = {}
+            for key in keys:
+                row = conn.execute(LOAD_SQL[kind], (key,)).fetchone()
+                if row is not None:
+                    rows[key] = row[0]
+            return rows
+
+    def _load_conversations(self, name):
+        with self.db.sync.pool.connection() as conn:
+            return conn.execute(CONVERSATIONS_SQL, (name,)).fetchall()
+
+    async def _load(self, kind, key):
+        blob = (await self.db.run(self._load_rows, kind, [key])).get(key)
+        if blob is None:
+            return None
+        self._written[kind, key] = _digest(blob)
+        return pickle.loads(blob)
+
+    async def get_user_data(self):
+        return {}
+
+    async def get_chat_data(self):
+        return {}
+
+    async def get_bot_data(self):
+        return await self._load(BOT_DATA, 0) or {}
+
+    async def get_callback_data(self):
+        return await self._load(CALLBACK_DATA, 0)
+
+    async def get_conversations(self, name):
+        conversations = {}
+        for key, blob in await self.db.run(self._load_conversations, name):
+            conversations[tuple(json.loads(key))] = pickle.loads(blob)
+            self._written[CONVERSATION, (name, key)] = _digest(blob)
+        return conversations
+
+    async def _refresh(self, kind, key, data):
+        if key in self._loaded[kind]:
+            return
+        self._loaded[kind].add(key)
+        stored = await self._load(kind, key)
+        if stored and not data:
+            data.update(stored)
+
+    async def refresh_user_data(self, user_id, user_data):
+        await self._refresh(USER_DATA, user_id, user_data)
+
+    async def refresh_chat_data(self, chat_id, chat_data):
+        await self._refresh(CHAT_DATA, chat_id, chat_data)
+
+    async def refresh_bot_data(self, bot_data):
+        pass
+
+    # Saving
+
+    def _mark(self, kind, key, blob):
+        """Queue ``blob`` for writing unless it matches what is stored."""
+        digest = _digest(blob) if blob is not None else None
+        if self._written.get((kind, key)) == digest:
+            self._dirty.pop((kind, key), None)
+            return
+        self._dirty[kind, key] = blob
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_soon())
+
+    async def update_user_data(self, user_id, data):
+        # Never overwrite a row for a user whose stored data was not loaded
+        if user_id not in self._loaded[USER_DATA] and not data:
+            return
+        self._mark(USER_DATA, user_id, _dumps(data) if data else None)
+
+    async def update_chat_data(self, chat_id, data):
+        if chat_id not in self._loaded[CHAT_DATA] and not data:
+            return
+        self._mark(CHAT_DATA, chat_id, _dumps(data) if data else None)
+
+    async def update_bot_data(self, data):
+        self._mark(BOT_DATA, 0, _dumps(data))
+
+    async def update_callback_data(self, data):
+        self._mark(CALLBACK_DATA, 0, _dumps(data))
+
+    async def update_conversation(self, name, key, new_state):
+        blob = _dumps(new_state) if new_state is not None else None
+        self._mark(CONVERSATION, (name, json.dumps(list(key))), blob)
+
+    async def drop_user_data(self, user_id):
+        self._loaded[USER_DATA].add(user_id)
+        self._mark(USER_DATA, user_id, None)
+
+    async def drop_chat_data(self, chat_id):
+        self._loaded[CHAT_DATA].add(chat_id)
+        self._mark(CHAT_DATA, chat_id, None)
+
+    def _write(self, batch):
+        with self.db.sync.pool.transaction() as conn:
+            for (kind, key), blob in batch.items():
+                params = key if kind == CONVERSATION else (key,)
+                if blob is None:
+                    conn.execute(DELETE_SQL[kind], params)
+                else:
+                    conn.execute(SAVE_SQL[kind], params + (blob,))
+
+    async def _flush_soon(self):
+        # Let the rest of this persistence run queue its changes first
+        await asyncio.sleep(0)
+        await self.flush()
+
+    async def flush(self):
+        if not self._dirty:
+            return
+        batch, self._dirty = self._dirty, {}
+        try:
+            await self.db.run(self._write, batch)
+        except Exception as e:
+            logger.error(f"Error writing {len(batch)} persistence entries: {e}")
+            # Keep the entries for the next run unless they were updated since
+            self._dirty = {**batch, **self._dirty}
+            return
+
+        for entry, blob in batch.items():
+            self._written[entry] = _digest(blob) if blob is not None else None
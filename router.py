@@ -0,0 +1,86 @@
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# callback_data is ``<route>`` or ``<route>:<payload>``
+SEPARATOR = ':'
+
+
+def route_key(data):
+    return data.partition(SEPARATOR)[0]
+
+
+class Route:
+    """One callback route and its dispatch counters."""
+
+    __slots__ = ('name', 'callback', 'parse', 'answer', 'hits', 'errors', 'seconds', 'max_seconds')
+
+    def __init__(self, name, callback, parse=None, answer=False):
+        self.name = name
+        self.callback = callback
+        self.parse = parse
+        self.answer = answer
+        self.hits = 0
+        self.errors = 0
+        self.seconds = 0.0
+        self.max_seconds = 0.0
+
+
+class CallbackRouter:
+    """Dispatches callback queries with one dict lookup on their route key.
+
+    A route's callback is called as ``callback(update, context)``, or with a
+    parser as ``callback(update, context, parse(callback_data))``. With
+    ``answer=True`` the query is answered before the callback runs.
+    ``dispatch`` returns the callback's result, so routes can drive
+    ``ConversationHandler`` states; use ``matches`` as the handler pattern to
+    limit a ``CallbackQueryHandler`` to some routes.
+    """
+
+    def __init__(self):
+        self.routes = {}
+        self.unknown = Route('unknown', None)
+
+    def add(self, name, callback, parse=None, answer=False):
+        if SEPARATOR in name:
+            raise ValueError(f"Route name {name!r} must not contain {SEPARATOR!r}")
+        self.routes[name] = Route(name, callback, parse, answer)
+
+    def matches(self, *names):
+        """``CallbackQueryHandler`` pattern accepting callbacks for ``names``."""
+        names = frozenset(names)
+        return lambda data: isinstance(data, str) and route_key(data) in names
+
+    async def dispatch(self, update, context):
+        query = update.callback_query
+        route = self.routes.get(route_key(query.data or ''))
+        if route is None:
+            self.unknown.hits += 1
+            logger.debug(f"No route for callback data {query.data!r}")
+            await query.answer()
+            return None
+
+        start = time.perf_counter()
+        try:
+            args = (route.parse(query.data),) if route.parse is not None else ()
+            if route.answer:
+                await query.answer()
+            return await route.callback(update, context, *args)
+        except Exception:
+            route.errors += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            route.hits += 1
+            route.seconds += elapsed
+            route.max_seconds = max(route.max_seconds, elapsed)
+
+    def stats(self):
+        """``(name, hits, errors, mean ms, max ms)`` per route, busiest first."""
+        rows = [
+            (route.name, route.hits, route.errors,
+             route.seconds / route.hits * 1000 if route.hits else 0.0, route.max_seconds * 1000)
+            for route in list(self.routes.values()) + [self.unknown]
+        ]
+        return sorted(rows, key=lambda row: -row[1])
@@ -0,0 +1,10 @@
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The bot's modules live at the repository root. The end-to-end tests drive
+# the bot through benchmarks/fake_bot_api.py and reuse loadtest's helpers for
+# reading replies; those are scripts, importable from their own directory
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
@@ -0,0 +1,165 @@
+"""Admin order notifications: rendering limits and outbox delivery."""
+import asyncio
+import os
+
+import pytest
+from telegram.error import BadRequest, Forbidden
+
+from async_db import AsyncDatabase
+from catalog import MAX_MESSAGE_LENGTH, load_catalog, message_length
+from database import Database, OrderRow
+from outbox import AdminOutbox
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def catalog():
+    return load_catalog(os.path.join(ROOT, 'catalog.json'), '@support', '@admins')
+
+
+def order_row(**fields):
+    values = dict(
+        id=1, user_id=42, username='some_user', first_name='Abebe', last_name=None,
+        phone='+251911000000', business_name='Cafe', selected_tier='basic',
+        selected_addons=[], total_price=2500, special_requests='None',
+        status='pending', created_at='2025-01-01 12:00:00', admin_notified=0
+    )
+    values.update(fields)
+    return OrderRow(**values)
+
+
+def test_long_special_requests_are_shortened_to_fit(catalog):
+    order = order_row(special_requests='x' * 3900, business_name='B' * 4096, phone='9' * 4096)
+    text = catalog.admin_notification_text(order)
+    assert message_length(text) <= MAX_MESSAGE_LENGTH
+    assert 'x' * 3000 in text and '…' in text
+    assert 'B' * 4096 not in text
+
+
+def test_escaped_and_wide_characters_still_fit(catalog):
+    # Every _ doubles when escaped and every emoji is two UTF-16 units
+    order = order_row(special_requests='_😀' * 2000)
+    text = catalog.admin_notification_text(order)
+    assert message_length(text) <= MAX_MESSAGE_LENGTH
+    assert text.count('\\_😀') > 900
+
+
+def test_short_order_is_unchanged(catalog):
+    text = catalog.admin_notification_text(order_row(special_requests='Deliver on Monday'))
+    assert 'Deliver on Monday\n' in text
+    assert '…' not in text
+
+
+class FakeBot:
+    """Records sent messages; ``fail(text, parse_mode)`` may raise instead."""
+
+    def __init__(self, fail=None):
+        self.fail = fail
+        self.sent = []
+
+    async def send_message(self, chat_id, text, parse_mode=None, rate_limit_args=None):
+        if self.fail is not None:
+            self.fail(text, parse_mode)
+        self.sent.append((text, parse_mode))
+
+
+def deliver(tmp_path, catalog, bot, rounds=1, **fields):
+    """Place one order and run the outbox ``rounds`` times; return its admin_notified."""
+    async def main():
+        db = AsyncDatabase(Database(str(tmp_path / 'orders.db')))
+        try:
+            await db.create_order(dict(
+                user_id=42, username='some_user', first_name='Abebe', last_name=None,
+                phone='+251911000000', business_name='Cafe', selected_tier='basic',
+                selected_addons=[], total_price=2500, special_requests='None', **fields
+            ))
+            outbox = AdminOutbox(db, catalog.admin_notification_text, '@admins', base_delay=0)
+            for _ in range(rounds):
+                await outbox._dispatch_batch(bot)
+            with db.sync.pool.connection() as conn:
+                return conn.execute('SELECT admin_notified FROM orders').fetchone()[0]
+        finally:
+            db.close()
+    return asyncio.run(main())
+
+
+def test_unparsable_markdown_is_resent_as_plain_text(tmp_path, catalog):
+    def fail(text, parse_mode):
+        if parse_mode == 'Markdown':
+            raise BadRequest("Can't parse entities: can't find end of the entity starting at byte offset 10")
+
+    bot = FakeBot(fail)
+    assert deliver(tmp_path, catalog, bot) == 1
+    assert [parse_mode for _, parse_mode in bot.sent] == [None]
+
+
+@pytest.mark.parametrize('error', [BadRequest('Chat not found'), Forbidden('Bot is not a member of the channel')])
+def test_admin_chat_errors_are_retried_not_dropped(tmp_path, catalog, error):
+    def fail(text, parse_mode):
+        raise error
+
+    assert deliver(tmp_path, catalog, FakeBot(fail), rounds=20) == 0
+
+
+def test_order_rejected_even_as_plain_text_is_given_up(tmp_path, catalog):
+    def fail(text, parse_mode):
+        if parse_mode == 'Markdown':
+            raise BadRequest("Can't parse entities: unsupported start tag")
+        raise BadRequest('Message is too long')
+
+    assert deliver(tmp_path, catalog, FakeBot(fail)) == 2
+
+
+def test_digest_covers_the_longest_prefix_that_fits(catalog):
+    orders = [order_row(id=i, business_name=f'Business {i} ' * (i % 7 + 1)) for i in range(1, 200)]
+    text, count = catalog.admin_digest_text(orders, limit=4096)
+    assert 0 < count < len(orders)
+    assert message_length(text) <= 4096
+    assert text == catalog._admin_digest_text(orders[:count])
+    assert message_length(catalog._admin_digest_text(orders[:count + 1])) > 4096
+    assert catalog.admin_digest_text(orders[:3]) == (catalog._admin_digest_text(orders[:3]), 3)
+
+
+def place_order(db, business_name):
+    return db.create_order(dict(
+        user_id=42, username='some_user', first_name='Abebe', last_name=None,
+        phone='+251911000000', business_name=business_name, selected_tier='basic',
+        selected_addons=[], total_price=2500, special_requests='None'
+    ))
+
+
+def test_kick_during_a_flush_is_not_lost(tmp_path, catalog):
+    class SlowBot(FakeBot):
+        def __init__(self):
+            super().__init__()
+            self.sending = asyncio.Event()
+            self.release = asyncio.Event()
+
+        async def send_message(self, **kwargs):
+            self.sending.set()
+            await self.release.wait()
+            await super().send_message(**kwargs)
+
+    class Context:
+        def __init__(self, bot):
+            self.bot = bot
+
+    async def main():
+        db = AsyncDatabase(Database(str(tmp_path / 'orders.db')))
+        try:
+            outbox = AdminOutbox(db, catalog.admin_notification_text, '@admins')
+            context = Context(SlowBot())
+            await place_order(db, 'First')
+            flush = asyncio.create_task(outbox.dispatch(context))
+            await context.bot.sending.wait()
+            await place_order(db, 'Second')
+            await outbox.dispatch(context)  # the kick, while the flush is sending
+            context.bot.release.set()
+            await flush
+            return [text for text, _ in context.bot.sent]
+        finally:
+            db.close()
+
+    sent = asyncio.run(main())
+    assert len(sent) == 2 and 'Second' in sent[1]
@@ -0,0 +1,24 @@
+"""from=/to= date arguments."""
+from datetime import date, datetime, timezone
+
+import pytest
+
+from dates import parse_date_range, split_date_args
+
+
+def test_split_date_args_keeps_other_arguments_in_order():
+    assert split_date_args(['csv', 'from=2025-01-01', 'status=new', 'to=2025-01-31']) == (
+        date(2025, 1, 1), date(2025, 1, 31), ['csv', 'status=new']
+    )
+    with pytest.raises(ValueError):
+        split_date_args(['to=2025-02-30'])
+
+
+def test_parse_date_range_defaults_to_the_last_days_in_utc():
+    today = datetime.now(timezone.utc).date()
+    since, until = parse_date_range([], default_days=7)
+    assert until == today
+    assert (until - since).days == 6
+    assert parse_date_range(['to=2025-01-31'], default_days=31) == (date(2025, 1, 1), date(2025, 1, 31))
+    with pytest.raises(ValueError):
+        parse_date_range(['tier=basic'])
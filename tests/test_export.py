@@ -0,0 +1,88 @@
+"""Streaming order export: argument parsing and gzipped CSV/JSONL output."""
+import csv
+import gzip
+import json
+import os
+from datetime import date
+
+import pytest
+
+from database import Database
+from export import created_at_range, export_orders, parse_export_args
+
+
+def make_order(n, addons=()):
+    return {
+        'user_id': n, 'username': f'user{n}', 'first_name': 'Test', 'last_name': None,
+        'phone': '+251900000000', 'business_name': f'Business, "{n}"', 'selected_tier': 'basic',
+        'selected_addons': list(addons), 'total_price': 2500, 'special_requests': 'Line one\nline two',
+    }
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = Database(str(tmp_path / 'orders.db'))
+    yield db
+    db.close()
+
+
+def read_lines(path):
+    with gzip.open(path, 'rt', encoding='utf-8', newline='') as f:
+        return f.read()
+
+
+def test_parse_export_args():
+    assert parse_export_args([]) == ('csv', None, None, None)
+    assert parse_export_args(['jsonl', 'status=completed', 'from=2025-01-01', 'to=2025-01-31']) == (
+        'jsonl', 'completed', date(2025, 1, 1), date(2025, 1, 31)
+    )
+    for args in (['xml'], ['colour=red'], ['from=31-01-2025']):
+        with pytest.raises(ValueError):
+            parse_export_args(args)
+
+
+def test_created_at_range_makes_the_last_day_inclusive():
+    assert created_at_range(date(2025, 1, 1), date(2025, 1, 31)) == ('2025-01-01', '2025-02-01')
+    assert created_at_range() == (None, None)
+
+
+def test_csv_export_round_trips_awkward_fields(db, tmp_path):
+    db.create_orders([make_order(1, ['video']), make_order(2, ['retired_addon'])])
+
+    [(path, count)] = export_orders(db.iter_orders(), str(tmp_path / 'orders'), 'csv', addon_keys=['video'])
+    assert (os.path.basename(path), count) == ('orders.csv.gz', 2)
+
+    rows = list(csv.DictReader(read_lines(path).splitlines(keepends=True)))
+    assert [row['business_name'] for row in rows] == ['Business, "1"', 'Business, "2"']
+    assert rows[0]['special_requests'] == 'Line one\nline two'
+    assert [(row['addon_video'], row['other_addons']) for row in rows] == [('1', ''), ('0', 'retired_addon')]
+
+
+def test_jsonl_export_keeps_addons_as_lists(db, tmp_path):
+    db.create_orders([make_order(1, ['video', 'logo'])])
+
+    [(path, _)] = export_orders(db.iter_orders(), str(tmp_path / 'orders'), 'jsonl')
+    [order] = [json.loads(line) for line in read_lines(path).splitlines()]
+    assert (order['id'], order['selected_addons']) == (1, ['video', 'logo'])
+
+
+def test_export_splits_into_complete_parts(db, tmp_path):
+    db.create_orders([make_order(n) for n in range(200)])
+
+    parts = export_orders(db.iter_orders(batch_size=7), str(tmp_path / 'orders'), 'csv', part_size=1)
+    assert len(parts) > 1
+    assert sum(count for _, count in parts) == 200
+    for path, count in parts:
+        assert os.path.basename(path).startswith('orders.part')
+        rows = list(csv.DictReader(read_lines(path).splitlines(keepends=True)))
+        assert len(rows) == count
+
+
+def test_failed_export_removes_partial_files(tmp_path):
+    def orders():
+        raise RuntimeError('database went away')
+        yield
+
+    with pytest.raises(RuntimeError):
+        export_orders(orders(), str(tmp_path / 'orders'), 'csv')
+    assert os.listdir(tmp_path) == []
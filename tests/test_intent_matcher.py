@@ -0,0 +1,61 @@
+"""FaqMatcher index rebuilds racing FAQ changes."""
+import asyncio
+from types import SimpleNamespace
+
+from intent_matcher import FaqMatcher
+
+
+class FaqDb:
+    """``get_faq_by_category`` stand-in whose reads can be held open."""
+
+    def __init__(self, faqs):
+        self.faqs = faqs
+        self.reads = 0
+        self.reading = asyncio.Event()
+        self.release = asyncio.Event()
+        self.release.set()
+        self.sync = SimpleNamespace(add_faq_listener=lambda callback: None)
+
+    async def get_faq_by_category(self):
+        faqs = list(self.faqs)
+        self.reads += 1
+        self.reading.set()
+        await self.release.wait()
+        return faqs
+
+
+def test_matches_are_scored_against_the_faqs():
+    async def main():
+        db = FaqDb([('How much does the basic package cost?', 'From 2500 Birr.', 'pricing')])
+        matcher = FaqMatcher(db, threshold=0.5, max_wait=0)
+        hit = await matcher.match('how much does the basic package cost')
+        miss = await matcher.match('zzz qqq')
+        return hit, miss
+
+    hit, miss = asyncio.run(main())
+    assert hit.answer == 'From 2500 Birr.'
+    assert miss is None
+
+
+def test_invalidate_during_a_rebuild_discards_its_index():
+    async def main():
+        db = FaqDb([('How much does the basic package cost?', 'From 2500 Birr.', 'pricing')])
+        matcher = FaqMatcher(db, max_wait=0)
+        db.release.clear()
+        first = asyncio.create_task(matcher.match('what are your working hours'))
+        await db.reading.wait()
+
+        # A FAQ is added while the rebuild still holds the old list
+        db.faqs.append(('What are your working hours?', 'Monday to Saturday.', 'general'))
+        matcher.invalidate()
+        db.release.set()
+        stale = await first
+
+        assert matcher._index is None
+        fresh = await matcher.match('what are your working hours')
+        return stale, fresh, db.reads
+
+    stale, fresh, reads = asyncio.run(main())
+    assert stale is None
+    assert fresh.answer == 'Monday to Saturday.'
+    assert reads == 2
@@ -0,0 +1,132 @@
+"""MessageEditor: debouncing, coalescing and skipped no-op edits."""
+import asyncio
+
+import pytest
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup
+from telegram.error import BadRequest
+
+from message_editor import MessageEditor
+
+NOT_MODIFIED = ('Message is not modified: specified new message content and reply markup are '
+                'exactly the same as a current content and reply markup of the message')
+
+
+class FakeMessage:
+    def __init__(self, message_id=1, chat_id=42, fail=None):
+        self.message_id = message_id
+        self.chat_id = chat_id
+        self.fail = fail
+        self.edits = []
+
+    async def edit_text(self, text, parse_mode=None, reply_markup=None):
+        if self.fail is not None:
+            raise self.fail
+        self.edits.append(text)
+
+
+def markup(label):
+    return InlineKeyboardMarkup([[InlineKeyboardButton(label, callback_data=label)]])
+
+
+def test_rapid_edits_are_coalesced_into_the_latest():
+    async def main():
+        editor = MessageEditor(window=0.05)
+        message = FakeMessage()
+        for n in range(5):
+            await editor.edit_soon(message, f'selection {n}', state=n)
+        assert message.edits == ['selection 0']
+        assert editor.state(message) == 4
+        await asyncio.sleep(0.1)
+        return editor, message
+
+    editor, message = asyncio.run(main())
+    assert message.edits == ['selection 0', 'selection 4']
+    assert (editor.sent, editor.coalesced) == (2, 3)
+
+
+def test_edit_after_the_window_is_sent_immediately():
+    async def main():
+        editor = MessageEditor(window=0.02)
+        message = FakeMessage()
+        await editor.edit_soon(message, 'one')
+        await asyncio.sleep(0.05)
+        await editor.edit_soon(message, 'two')
+        return message.edits
+
+    assert asyncio.run(main()) == ['one', 'two']
+
+
+def test_edit_replaces_a_pending_debounced_edit():
+    async def main():
+        editor = MessageEditor(window=0.05)
+        message = FakeMessage()
+        await editor.edit_soon(message, 'one')
+        await editor.edit_soon(message, 'pending')
+        await editor.edit(message, 'final')
+        await asyncio.sleep(0.1)
+        return message.edits
+
+    assert asyncio.run(main()) == ['one', 'final']
+
+
+def test_identical_content_is_not_sent_again():
+    async def main():
+        editor = MessageEditor(window=0)
+        message = FakeMessage()
+        await editor.edit(message, 'same', markup('a'))
+        await editor.edit(message, 'same', markup('a'))
+        await editor.edit(message, 'same', markup('b'))
+        return editor, message
+
+    editor, message = asyncio.run(main())
+    assert message.edits == ['same', 'same']
+    assert (editor.sent, editor.skipped) == (2, 1)
+
+
+def test_debounced_edit_back_to_the_shown_content_is_skipped():
+    async def main():
+        editor = MessageEditor(window=0.05)
+        message = FakeMessage()
+        await editor.edit_soon(message, 'shown')
+        await editor.edit_soon(message, 'toggled')
+        await editor.edit_soon(message, 'shown')  # toggled twice: nothing to change
+        await asyncio.sleep(0.1)
+        return editor, message
+
+    editor, message = asyncio.run(main())
+    assert message.edits == ['shown']
+    assert editor.skipped == 1
+
+
+def test_message_not_modified_counts_as_skipped():
+    async def main():
+        editor = MessageEditor(window=0)
+        message = FakeMessage(fail=BadRequest(NOT_MODIFIED))
+        await editor.edit(message, 'already shown')
+        message.fail = None
+        await editor.edit(message, 'already shown')
+        return editor, message
+
+    editor, message = asyncio.run(main())
+    assert message.edits == []
+    assert (editor.sent, editor.skipped) == (0, 2)
+
+
+def test_other_edit_errors_are_raised():
+    async def main():
+        editor = MessageEditor(window=0)
+        await editor.edit(FakeMessage(fail=BadRequest('Message to edit not found')), 'text')
+
+    with pytest.raises(BadRequest, match='not found'):
+        asyncio.run(main())
+
+
+def test_only_the_most_recent_messages_are_remembered():
+    async def main():
+        editor = MessageEditor(window=0, max_messages=2)
+        messages = [FakeMessage(message_id=n) for n in range(3)]
+        for n, message in enumerate(messages):
+            await editor.edit(message, 'text', state=n)
+        return [editor.state(message) for message in messages]
+
+    assert asyncio.run(main()) == [None, 1, 2]
@@ -0,0 +1,30 @@
+"""MetricsServer start/stop."""
+import socket
+import urllib.request
+
+import pytest
+
+from metrics import Metrics, MetricsServer
+
+
+def test_taken_port_raises_oserror():
+    with socket.create_server(('127.0.0.1', 0)) as taken:
+        server = MetricsServer(Metrics(), '127.0.0.1', taken.getsockname()[1])
+        with pytest.raises(OSError):
+            server.start()
+        server.stop()
+
+
+def test_stop_releases_the_port():
+    metrics = Metrics()
+    metrics.gauge('up', 'Always one.', func=lambda: 1)
+    server = MetricsServer(metrics, '127.0.0.1', 0)
+    server.start()
+    port = server.port
+    with urllib.request.urlopen(f'http://127.0.0.1:{port}/metrics') as response:
+        assert b'up 1' in response.read()
+    server.stop()
+
+    again = MetricsServer(Metrics(), '127.0.0.1', port)
+    again.start()
+    again.stop()
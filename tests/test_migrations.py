@@ -0,0 +1,106 @@
+"""migrations.migrate and upgrading an existing orders.db."""
+import sqlite3
+
+import pytest
+
+from database import MIGRATIONS, Database
+from migrations import Migration, migrate, schema_version
+
+# The orders table as the bot created it before schema versioning
+LEGACY_ORDERS_SQL = '''
+    CREATE TABLE orders (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER,
+        username TEXT,
+        first_name TEXT,
+        last_name TEXT,
+        phone TEXT,
+        business_name TEXT,
+        selected_tier TEXT,
+        selected_addons TEXT,
+        total_price INTEGER,
+        special_requests TEXT,
+        status TEXT DEFAULT 'pending',
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+'''
+
+
+def connect(path):
+    return sqlite3.connect(str(path), isolation_level=None)
+
+
+def tables(conn):
+    return {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+
+
+def create_table(name):
+    return lambda conn: conn.execute(f'CREATE TABLE {name} (id INTEGER)')
+
+
+def test_pending_migrations_run_in_order_once(tmp_path):
+    conn = connect(tmp_path / 'test.db')
+    migrations = (Migration(1, 'a', create_table('a')), Migration(2, 'b', create_table('b')))
+
+    assert migrate(conn, migrations[:1]) == [1]
+    assert migrate(conn, migrations) == [2]
+    assert migrate(conn, migrations) == []
+    assert schema_version(conn) == 2
+    assert {'a', 'b'} <= tables(conn)
+
+
+def test_failed_migration_leaves_schema_untouched(tmp_path):
+    conn = connect(tmp_path / 'test.db')
+
+    def broken(conn):
+        conn.execute('CREATE TABLE c (id INTEGER)')
+        raise RuntimeError('boom')
+
+    with pytest.raises(RuntimeError):
+        migrate(conn, (Migration(1, 'b', create_table('b')), Migration(2, 'c', broken)))
+    assert schema_version(conn) == 0
+    assert not {'b', 'c'} & tables(conn)
+
+
+def test_newer_schema_is_left_alone(tmp_path):
+    conn = connect(tmp_path / 'test.db')
+    conn.execute('PRAGMA user_version = 9')
+    assert migrate(conn, (Migration(1, 'a', create_table('a')),)) == []
+    assert schema_version(conn) == 9
+
+
+def test_baseline_database_upgrades_and_keeps_its_orders(tmp_path):
+    path = tmp_path / 'orders.db'
+    conn = connect(path)
+    conn.execute(LEGACY_ORDERS_SQL)
+    conn.execute(
+        "INSERT INTO orders (user_id, username, first_name, phone, business_name, selected_tier, "
+        "selected_addons, total_price, special_requests, created_at) "
+        "VALUES (1, 'legacy', 'Legacy', '+251911000000', 'Legacy Cafe', 'basic', '[\"video\"]', "
+        "3500, 'none', '2024-05-01 12:00:00')"
+    )
+    conn.close()
+
+    db = Database(str(path))
+    try:
+        with db.pool.connection() as conn:
+            assert schema_version(conn) == MIGRATIONS[-1].version
+            assert {'faq', 'order_stats', 'job_submissions', 'cv_drafts'} <= tables(conn)
+        [order] = db.get_orders_page().rows
+        assert (order.business_name, order.selected_addons) == ('Legacy Cafe', ['video'])
+        # The old bot notified the admin directly, so the outbox must not resend
+        assert db.get_pending_admin_notifications() == []
+        assert db.get_order_stats('2024-05-01', '2024-05-01') == [
+            ('2024-05-01', 'basic', '', 1, 3500), ('2024-05-01', 'basic', 'video', 1, 3500)
+        ]
+        assert db.create_order({
+            'user_id': 2, 'username': 'new', 'first_name': 'New', 'last_name': None,
+            'phone': '+251900000000', 'business_name': 'New Shop', 'selected_tier': 'basic',
+            'selected_addons': [], 'total_price': 2500, 'special_requests': 'None',
+        }) == 2
+    finally:
+        db.close()
+
+    # Opening it again finds it current and runs no migrations
+    conn = connect(path)
+    assert migrate(conn, MIGRATIONS) == []
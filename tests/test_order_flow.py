@@ -0,0 +1,111 @@
+"""Order conversation driven end to end through the fake Bot API."""
+import asyncio
+
+import pytest
+
+from bot import Config, SocialMediaBot
+from catalog import CONFIRM, PROCEED, SELECT_TIER, TOGGLE_ADDON
+from fake_bot_api import FakeBotApi
+from loadtest import buttons, edit, reply
+
+USER = {'id': 4242, 'is_bot': False, 'first_name': 'Test', 'username': 'tester'}
+
+
+class BotHarness:
+    """A ``SocialMediaBot`` polling a ``FakeBotApi``, driven like a user would."""
+
+    def __init__(self, api, bot):
+        self.api = api
+        self.bot = bot
+
+    async def step(self, action, expect):
+        after = len(self.api.chat_calls[USER['id']])
+        action()
+        _, call = await self.api.wait_for(USER['id'], expect, after, timeout=10)
+        return call.result
+
+    def say(self, text):
+        return lambda: self.api.push_message(USER, text)
+
+    def tap(self, message, route):
+        return lambda: self.api.push_callback(USER, message, buttons(message, route)[0])
+
+    async def order_summary(self):
+        """Walk /order up to the summary and return the message with Confirm."""
+        message = await self.step(self.say('/order'), reply(route=SELECT_TIER))
+        message = await self.step(self.tap(message, SELECT_TIER), edit(route=TOGGLE_ADDON))
+        await self.step(self.tap(message, PROCEED), reply(contains='phone number'))
+        await self.step(self.say('+251911000000'), reply())
+        await self.step(self.say('Test Cafe'), reply())
+        return await self.step(self.say('none'), reply(route=CONFIRM))
+
+    async def answers(self, count, timeout=10):
+        """Wait until ``count`` callback queries were answered; return them."""
+        deadline = asyncio.get_running_loop().time() + timeout
+        while True:
+            calls = [call for call in self.api.calls if call.method == 'answerCallbackQuery']
+            if len(calls) >= count or asyncio.get_running_loop().time() > deadline:
+                return calls
+            await asyncio.sleep(0.01)
+
+    def order_count(self):
+        with self.bot.db.sync.pool.connection() as conn:
+            return conn.execute('SELECT COUNT(*) FROM orders').fetchone()[0]
+
+
+@pytest.fixture
+def run_bot(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(Config, 'OUTBOUND_GLOBAL_RATE', 1000000.0)
+    monkeypatch.setattr(Config, 'OUTBOUND_CHAT_RATE', 1000000.0)
+
+    def run(scenario):
+        async def main():
+            api = FakeBotApi()
+            await api.start()
+            monkeypatch.setattr(Config, 'BOT_API_URL', api.base_url)
+            bot = SocialMediaBot('1:test')
+            application = bot.application
+            try:
+                async with application:
+                    await bot.post_init(application)
+                    await application.start()
+                    await application.updater.start_polling(poll_interval=0, timeout=1)
+                    try:
+                        await scenario(BotHarness(api, bot))
+                    finally:
+                        await application.updater.stop()
+                        await application.stop()
+                        await bot.post_shutdown(application)
+            finally:
+                bot.db.close()
+                await api.stop()
+        asyncio.run(main())
+    return run
+
+
+def test_double_tapped_confirm_submits_one_order(run_bot):
+    async def scenario(harness):
+        summary = await harness.order_summary()
+        answered = len(await harness.answers(0))
+        harness.tap(summary, CONFIRM)()
+        harness.tap(summary, CONFIRM)()
+        await harness.api.wait_for(USER['id'], edit(contains='Order Submitted'))
+        answers = await harness.answers(answered + 2)
+        assert 'already submitted' in answers[-1].params.get('text', '')
+        assert harness.order_count() == 1
+
+    run_bot(scenario)
+
+
+def test_confirm_from_an_old_summary_after_restarting_the_order(run_bot):
+    async def scenario(harness):
+        summary = await harness.order_summary()
+        await harness.step(harness.say('/order'), reply(route=SELECT_TIER))
+        answered = len(await harness.answers(0))
+        harness.tap(summary, CONFIRM)()
+        answers = await harness.answers(answered + 1)
+        assert 'already submitted' in answers[-1].params.get('text', '')
+        assert harness.order_count() == 0
+
+    run_bot(scenario)
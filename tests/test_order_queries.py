@@ -0,0 +1,80 @@
+"""Database.get_orders_page keyset paging and iter_orders."""
+import pytest
+
+from database import Database
+
+
+def make_order(n, tier='basic'):
+    return {
+        'user_id': n, 'username': f'user{n}', 'first_name': 'Test', 'last_name': None,
+        'phone': '+251900000000', 'business_name': f'Business {n}', 'selected_tier': tier,
+        'selected_addons': [], 'total_price': 2500, 'special_requests': 'None',
+    }
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = Database(str(tmp_path / 'orders.db'))
+    yield db
+    db.close()
+
+
+def set_created_at(db, order_id, created_at):
+    with db.pool.transaction() as conn:
+        conn.execute('UPDATE orders SET created_at = ? WHERE id = ?', (created_at, order_id))
+
+
+def ids(page):
+    return [row.id for row in page.rows]
+
+
+def test_pages_walk_forward_and_back(db):
+    db.create_orders([make_order(n) for n in range(7)])
+
+    first = db.get_orders_page(limit=3)
+    assert ids(first) == [7, 6, 5]
+    assert first.prev_cursor is None
+    second = db.get_orders_page(limit=3, after=first.next_cursor)
+    assert ids(second) == [4, 3, 2]
+    last = db.get_orders_page(limit=3, after=second.next_cursor)
+    assert ids(last) == [1]
+    assert last.next_cursor is None
+
+    back = db.get_orders_page(limit=3, before=last.prev_cursor)
+    assert ids(back) == [4, 3, 2]
+    assert ids(db.get_orders_page(limit=3, before=back.prev_cursor)) == [7, 6, 5]
+
+
+def test_pages_filter_on_status_and_tier(db):
+    db.create_orders([make_order(n, 'premium' if n % 2 else 'basic') for n in range(6)])
+    with db.pool.transaction() as conn:
+        conn.execute("UPDATE orders SET status = 'completed' WHERE id = 6")
+
+    assert ids(db.get_orders_page(tier='premium')) == [4, 2]
+    assert ids(db.get_orders_page(status='completed')) == [6]
+
+
+def test_date_filter_follows_created_at_not_id(db):
+    db.create_orders([make_order(n) for n in range(4)])
+    set_created_at(db, 1, '2024-01-10 09:00:00')
+    set_created_at(db, 2, '2024-02-10 09:00:00')
+    set_created_at(db, 3, '2024-03-10 09:00:00')
+    # Imported after the others, but dated back into January
+    set_created_at(db, 4, '2024-01-20 09:00:00')
+
+    january = db.get_orders_page(since='2024-01-01', until='2024-02-01')
+    assert ids(january) == [4, 1]
+    assert ids(db.get_orders_page(since='2024-02-01')) == [3, 2]
+    assert ids(db.get_orders_page(until='2024-02-01')) == [4, 1]
+    assert ids(db.get_orders_page(since='2025-01-01')) == []
+
+    assert [row.id for row in db.iter_orders(since='2024-01-01', until='2024-02-01')] == [1, 4]
+
+
+def test_iter_orders_yields_every_row_across_batches(db):
+    db.create_orders([make_order(n) for n in range(25)])
+    with db.pool.transaction() as conn:
+        conn.execute("UPDATE orders SET status = 'completed' WHERE id % 5 = 0")
+
+    assert [row.id for row in db.iter_orders(batch_size=4)] == list(range(1, 26))
+    assert [row.id for row in db.iter_orders(status='completed', batch_size=2)] == [5, 10, 15, 20, 25]
@@ -0,0 +1,140 @@
+"""OrderBatchWriter: group commit of order inserts."""
+import asyncio
+
+import pytest
+
+from async_db import AsyncDatabase
+from database import Database
+from order_writer import OrderBatchWriter
+
+
+class GatedDb:
+    """``create_orders`` stand-in that records batches and can be held open."""
+
+    def __init__(self):
+        self.batches = []
+        self.open = asyncio.Event()
+        self.open.set()
+        self.committing = asyncio.Event()
+        self.fail_next = None
+
+    async def create_orders(self, orders):
+        self.committing.set()
+        await self.open.wait()
+        if self.fail_next is not None:
+            error, self.fail_next = self.fail_next, None
+            raise error
+        start = sum(len(batch) for batch in self.batches)
+        self.batches.append([order['n'] for order in orders])
+        return list(range(start + 1, start + len(orders) + 1))
+
+
+async def hold_first_batch(db, writer):
+    """Submit one order and keep its commit open; returns its task."""
+    db.open.clear()
+    first = asyncio.create_task(writer.submit({'n': 0}))
+    await db.committing.wait()
+    return first
+
+
+def test_light_traffic_is_written_immediately():
+    async def main():
+        db = GatedDb()
+        writer = OrderBatchWriter(db, max_batch=50, max_wait=10)
+        order_id = await asyncio.wait_for(writer.submit({'n': 0}), 1)
+        await writer.stop()
+        return order_id, db.batches
+
+    assert asyncio.run(main()) == (1, [[0]])
+
+
+def test_orders_arriving_during_a_commit_form_the_next_batch():
+    async def main():
+        db = GatedDb()
+        writer = OrderBatchWriter(db, max_batch=50, max_wait=0.01)
+        first = await hold_first_batch(db, writer)
+        rest = [asyncio.create_task(writer.submit({'n': n})) for n in range(1, 11)]
+        await asyncio.sleep(0.01)
+        db.open.set()
+        ids = await asyncio.gather(first, *rest)
+        await writer.stop()
+        return ids, db.batches
+
+    ids, batches = asyncio.run(main())
+    assert batches == [[0], list(range(1, 11))]
+    assert ids == list(range(1, 12))
+
+
+def test_batches_are_capped_at_max_batch():
+    async def main():
+        db = GatedDb()
+        writer = OrderBatchWriter(db, max_batch=50, max_wait=0.01)
+        first = await hold_first_batch(db, writer)
+        rest = [asyncio.create_task(writer.submit({'n': n})) for n in range(1, 121)]
+        await asyncio.sleep(0.01)
+        db.open.set()
+        await asyncio.gather(first, *rest)
+        await writer.stop()
+        return db.batches
+
+    batches = asyncio.run(main())
+    assert [len(batch) for batch in batches] == [1, 50, 50, 20]
+    assert [n for batch in batches for n in batch] == list(range(121))
+
+
+def test_stop_commits_everything_already_submitted():
+    async def main():
+        db = GatedDb()
+        writer = OrderBatchWriter(db, max_batch=50, max_wait=0.01)
+        first = await hold_first_batch(db, writer)
+        rest = [asyncio.create_task(writer.submit({'n': n})) for n in range(1, 6)]
+        await asyncio.sleep(0.01)
+        stopping = asyncio.create_task(writer.stop())
+        await asyncio.sleep(0.01)
+        db.open.set()
+        await stopping
+        return await asyncio.gather(first, *rest), db.batches
+
+    ids, batches = asyncio.run(main())
+    assert ids == [1, 2, 3, 4, 5, 6]
+    assert sum(len(batch) for batch in batches) == 6
+
+
+def test_a_failed_batch_fails_its_orders_only():
+    async def main():
+        db = GatedDb()
+        writer = OrderBatchWriter(db, max_batch=50, max_wait=0.01)
+        first = await hold_first_batch(db, writer)
+        db.fail_next = RuntimeError('disk full')
+        db.open.set()
+        with pytest.raises(RuntimeError, match='disk full'):
+            await first
+        order_id = await writer.submit({'n': 1})
+        await writer.stop()
+        return order_id, db.batches
+
+    assert asyncio.run(main()) == (1, [[1]])
+
+
+def test_concurrent_orders_land_in_the_database(tmp_path):
+    async def main():
+        db = AsyncDatabase(Database(str(tmp_path / 'orders.db')))
+        writer = OrderBatchWriter(db, max_batch=8, max_wait=0.005)
+        try:
+            ids = await asyncio.gather(*(writer.submit(dict(
+                user_id=n, username=None, first_name='User', last_name=None, phone='+251911000000',
+                business_name=f'Shop {n}', selected_tier='basic', selected_addons=['video'],
+                total_price=2500, special_requests='None'
+            )) for n in range(30)))
+            await writer.stop()
+            with db.sync.pool.connection() as conn:
+                rows = conn.execute('SELECT id, user_id FROM orders ORDER BY id').fetchall()
+                stats = conn.execute("SELECT SUM(orders) FROM order_stats WHERE addon = ''").fetchone()[0]
+            return ids, rows, stats
+        finally:
+            db.close()
+
+    ids, rows, stats = asyncio.run(main())
+    assert sorted(ids) == [order_id for order_id, _ in rows]
+    assert {user_id for _, user_id in rows} == set(range(30))
+    assert stats == 30
@@ -0,0 +1,99 @@
+"""OutboundScheduler: lane priority and flood-control retries."""
+import asyncio
+import time
+
+import pytest
+from telegram.error import RetryAfter
+
+from outbound import BULK, OutboundScheduler
+
+
+class Recorder:
+    """A Bot API call stand-in that records the order requests went out in."""
+
+    def __init__(self, fail=()):
+        self.sent = []
+        self.fail = list(fail)
+
+    async def __call__(self, name):
+        if self.fail:
+            raise self.fail.pop(0)
+        self.sent.append(name)
+        return name
+
+
+def request(scheduler, send, name, chat_id, lane=None):
+    return scheduler.process_request(
+        send, (name,), {}, 'sendMessage', {'chat_id': chat_id},
+        {'priority': lane} if lane else None
+    )
+
+
+def test_interactive_requests_go_before_bulk_ones_when_tokens_are_short():
+    async def main():
+        scheduler = OutboundScheduler(global_rate=20, chat_rate=1000, chat_burst=1000)
+        send = Recorder()
+        for _ in range(20):
+            scheduler.global_bucket.reserve()  # spend the burst
+
+        bulk = [asyncio.create_task(request(scheduler, send, f'bulk{i}', 100 + i, BULK)) for i in range(3)]
+        await asyncio.sleep(0.01)
+        replies = [asyncio.create_task(request(scheduler, send, f'reply{i}', i + 1)) for i in range(3)]
+        await asyncio.gather(*bulk, *replies)
+        return send.sent
+
+    sent = asyncio.run(main())
+    assert sent[:3] == ['reply0', 'reply1', 'reply2']
+    assert sorted(sent[3:]) == ['bulk0', 'bulk1', 'bulk2']
+
+
+def test_replies_paced_by_their_own_chat_do_not_hold_up_bulk():
+    async def main():
+        scheduler = OutboundScheduler(global_rate=30, chat_rate=2, chat_burst=1)
+        send = Recorder()
+        replies = [asyncio.create_task(request(scheduler, send, f'reply{i}', 1)) for i in range(3)]
+        await asyncio.sleep(0.01)
+        start = time.monotonic()
+        await request(scheduler, send, 'bulk', 2, BULK)
+        waited = time.monotonic() - start
+        await asyncio.gather(*replies)
+        return send.sent, waited
+
+    sent, waited = asyncio.run(main())
+    assert waited < 0.2
+    assert sent.index('bulk') < sent.index('reply2')
+
+
+def test_retry_after_pauses_the_chat_and_retries():
+    async def main():
+        scheduler = OutboundScheduler(chat_rate=1000, chat_burst=1000)
+        send = Recorder(fail=[RetryAfter(0.2)])
+        start = time.monotonic()
+        result = await request(scheduler, send, 'hello', 1)
+        return result, time.monotonic() - start, send.sent
+
+    result, elapsed, sent = asyncio.run(main())
+    assert result == 'hello' and sent == ['hello']
+    assert elapsed >= 0.2
+
+
+def test_retry_after_is_raised_once_retries_are_used_up():
+    async def main():
+        scheduler = OutboundScheduler(chat_rate=1000, chat_burst=1000, max_retries=1)
+        send = Recorder(fail=[RetryAfter(0.05), RetryAfter(0.05)])
+        await request(scheduler, send, 'hello', 1)
+
+    with pytest.raises(RetryAfter):
+        asyncio.run(main())
+
+
+def test_requests_without_a_chat_are_not_paced():
+    async def main():
+        scheduler = OutboundScheduler(global_rate=1, chat_rate=1, chat_burst=1)
+        send = Recorder()
+        start = time.monotonic()
+        for i in range(5):
+            await scheduler.process_request(send, (f'answer{i}',), {}, 'answerCallbackQuery', {}, None)
+        return time.monotonic() - start
+
+    assert asyncio.run(main()) < 0.1
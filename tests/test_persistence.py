@@ -0,0 +1,125 @@
+"""SQLitePersistence: dirty-only flushes and a restart round trip."""
+import asyncio
+
+from async_db import AsyncDatabase
+from database import Database
+from persistence import USER_DATA, SQLitePersistence
+
+
+def open_persistence(path):
+    persistence = SQLitePersistence(AsyncDatabase(Database(str(path))))
+    writes = []
+    write = persistence._write
+
+    def recording_write(batch):
+        writes.append(sorted(batch, key=repr))
+        write(batch)
+
+    persistence._write = recording_write
+    return persistence, writes
+
+
+def test_only_changed_entries_are_written(tmp_path):
+    async def main():
+        persistence, writes = open_persistence(tmp_path / 'orders.db')
+        try:
+            await persistence.update_user_data(1, {'phone': '+251911000000'})
+            await persistence.update_user_data(2, {'phone': '+251922000000'})
+            await persistence.flush()
+            # Same contents again, and a user with nothing stored: no writes
+            await persistence.update_user_data(1, {'phone': '+251911000000'})
+            await persistence.update_user_data(3, {})
+            await persistence.flush()
+            await persistence.update_user_data(2, {'phone': '+251933000000'})
+            await persistence.flush()
+            return writes
+        finally:
+            persistence.db.close()
+
+    writes = asyncio.run(main())
+    assert writes == [[(USER_DATA, 1), (USER_DATA, 2)], [(USER_DATA, 2)]]
+
+
+def test_updates_in_one_run_are_written_in_one_transaction(tmp_path):
+    async def main():
+        persistence, writes = open_persistence(tmp_path / 'orders.db')
+        try:
+            await persistence.update_user_data(1, {'a': 1})
+            await persistence.update_conversation('order', (1, 1), 2)
+            await persistence.update_bot_data({'started': True})
+            await asyncio.sleep(0.01)  # the scheduled flush
+            return writes
+        finally:
+            persistence.db.close()
+
+    writes = asyncio.run(main())
+    assert len(writes) == 1 and len(writes[0]) == 3
+
+
+def test_state_survives_a_restart(tmp_path):
+    path = tmp_path / 'orders.db'
+
+    async def before():
+        persistence, _ = open_persistence(path)
+        try:
+            await persistence.update_user_data(1, {'business_name': 'Cafe'})
+            await persistence.update_chat_data(-100, {'muted': True})
+            await persistence.update_bot_data({'orders_seen': 3})
+            await persistence.update_conversation('order', (1, 1), 4)
+            await persistence.update_conversation('order', (2, 2), 1)
+            await persistence.update_conversation('order', (2, 2), None)  # ended
+            await persistence.flush()
+        finally:
+            persistence.db.close()
+
+    async def after():
+        persistence, writes = open_persistence(path)
+        try:
+            user_data, chat_data, unknown = {}, {}, {}
+            await persistence.refresh_user_data(1, user_data)
+            await persistence.refresh_chat_data(-100, chat_data)
+            await persistence.refresh_user_data(7, unknown)
+            loaded = (
+                user_data, chat_data, unknown,
+                await persistence.get_bot_data(),
+                await persistence.get_conversations('order')
+            )
+            # Reloaded entries are known to be current, so saving them is a no-op
+            await persistence.update_user_data(1, user_data)
+            await persistence.update_conversation('order', (1, 1), 4)
+            await persistence.flush()
+            return loaded, writes
+        finally:
+            persistence.db.close()
+
+    asyncio.run(before())
+    (user_data, chat_data, unknown, bot_data, conversations), writes = asyncio.run(after())
+    assert user_data == {'business_name': 'Cafe'}
+    assert chat_data == {'muted': True}
+    assert unknown == {}
+    assert bot_data == {'orders_seen': 3}
+    assert conversations == {(1, 1): 4}
+    assert writes == []
+
+
+def test_dropped_user_data_is_deleted(tmp_path):
+    path = tmp_path / 'orders.db'
+
+    async def main():
+        persistence, _ = open_persistence(path)
+        try:
+            await persistence.update_user_data(1, {'a': 1})
+            await persistence.flush()
+            await persistence.drop_user_data(1)
+            await persistence.flush()
+        finally:
+            persistence.db.close()
+        persistence, _ = open_persistence(path)
+        try:
+            data = {}
+            await persistence.refresh_user_data(1, data)
+            return data
+        finally:
+            persistence.db.close()
+
+    assert asyncio.run(main()) == {}
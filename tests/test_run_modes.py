@@ -0,0 +1,86 @@
+"""Polling and webhook mode against the fake Bot API."""
+import asyncio
+import socket
+import time
+
+import httpx
+import pytest
+
+from bot import Config, SocialMediaBot, WebhookInUse
+from fake_bot_api import FakeBotApi
+from loadtest import reply
+
+USER = {'id': 4242, 'is_bot': False, 'first_name': 'Test', 'username': 'tester'}
+SECRET = 'test-secret'
+
+
+def free_port():
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        return probe.getsockname()[1]
+
+
+@pytest.fixture
+def with_bot(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+    def run(scenario, webhook_url=''):
+        async def main():
+            api = FakeBotApi()
+            api.webhook_url = webhook_url
+            await api.start()
+            monkeypatch.setattr(Config, 'BOT_API_URL', api.base_url)
+            bot = SocialMediaBot('1:test')
+            try:
+                async with bot.application:
+                    await scenario(api, bot)
+            finally:
+                bot.db.close()
+                await api.stop()
+        asyncio.run(main())
+    return run
+
+
+def test_polling_refuses_to_start_while_a_webhook_is_set(with_bot, monkeypatch):
+    monkeypatch.setattr(Config, 'RUN_MODE', 'polling')
+
+    async def scenario(api, bot):
+        with pytest.raises(WebhookInUse, match='example.com'):
+            await bot.post_init(bot.application)
+        assert api.webhook_url == 'https://example.com/telegram'
+
+    with_bot(scenario, webhook_url='https://example.com/telegram')
+
+
+def test_webhook_mode_accepts_only_updates_with_the_secret(with_bot, monkeypatch):
+    monkeypatch.setattr(Config, 'RUN_MODE', 'webhook')
+    port = free_port()
+    url = f'http://127.0.0.1:{port}/telegram'
+
+    async def scenario(api, bot):
+        application = bot.application
+        await bot.post_init(application)
+        await application.updater.start_webhook(
+            listen='127.0.0.1', port=port, url_path='telegram', webhook_url=url, secret_token=SECRET
+        )
+        await application.start()
+        try:
+            assert api.webhook_url == url
+            update = {'update_id': 1, 'message': {
+                'message_id': 1, 'date': int(time.time()), 'text': '/start', 'from': USER,
+                'chat': {'id': USER['id'], 'type': 'private', 'first_name': USER['first_name']},
+                'entities': [{'type': 'bot_command', 'offset': 0, 'length': 6}]
+            }}
+            async with httpx.AsyncClient() as client:
+                forged = await client.post(url, json=update, headers={'X-Telegram-Bot-Api-Secret-Token': 'wrong'})
+                assert forged.status_code == 403
+                response = await client.post(url, json=update, headers={'X-Telegram-Bot-Api-Secret-Token': SECRET})
+                assert response.status_code == 200
+            _, call = await api.wait_for(USER['id'], reply(contains='Test'))
+            assert len(api.chat_calls[USER['id']]) == 1
+        finally:
+            await application.updater.stop()
+            await application.stop()
+            await bot.post_shutdown(application)
+
+    with_bot(scenario)
@@ -0,0 +1,103 @@
+"""PerChatUpdateProcessor: per-chat ordering with parallelism across chats."""
+import asyncio
+import time
+
+from telegram import Update
+
+from update_processor import PerChatUpdateProcessor
+
+
+def message_update(update_id, chat_id):
+    return Update.de_json({'update_id': update_id, 'message': {
+        'message_id': update_id, 'date': 0, 'text': 'hi',
+        'chat': {'id': chat_id, 'type': 'private'},
+        'from': {'id': chat_id, 'is_bot': False, 'first_name': 'User'}
+    }}, None)
+
+
+class Handler:
+    """Records when each update started and finished, and the peak concurrency."""
+
+    def __init__(self):
+        self.events = []
+        self.running = 0
+        self.peak = 0
+
+    async def handle(self, update_id, delay):
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        self.events.append(('start', update_id))
+        await asyncio.sleep(delay)
+        self.events.append(('end', update_id))
+        self.running -= 1
+
+
+async def process_all(processor, handler, updates):
+    """Feed ``(update_id, chat_id, delay)`` in order, as the Application does."""
+    tasks = [
+        asyncio.create_task(processor.process_update(message_update(update_id, chat_id),
+                                                     handler.handle(update_id, delay)))
+        for update_id, chat_id, delay in updates
+    ]
+    await asyncio.gather(*tasks)
+
+
+def test_one_chats_updates_run_one_at_a_time_in_order():
+    async def main():
+        processor = PerChatUpdateProcessor(max_active_chats=8)
+        handler = Handler()
+        # Later updates are quicker, so any overlap would reorder them
+        await process_all(processor, handler, [(1, 7, 0.03), (2, 7, 0.02), (3, 7, 0.01)])
+        return handler, processor
+
+    handler, processor = asyncio.run(main())
+    assert handler.events == [('start', 1), ('end', 1), ('start', 2), ('end', 2), ('start', 3), ('end', 3)]
+    assert processor.pending == 0 and not processor._tails
+
+
+def test_different_chats_run_in_parallel():
+    async def main():
+        processor = PerChatUpdateProcessor(max_active_chats=8)
+        handler = Handler()
+        start = time.monotonic()
+        await process_all(processor, handler, [(n, 100 + n, 0.1) for n in range(6)])
+        return handler, time.monotonic() - start
+
+    handler, elapsed = asyncio.run(main())
+    assert handler.peak == 6
+    assert elapsed < 0.3
+
+
+def test_busy_chat_does_not_hold_up_others():
+    async def main():
+        processor = PerChatUpdateProcessor(max_active_chats=8)
+        handler = Handler()
+        await process_all(processor, handler, [(1, 1, 0.05), (2, 1, 0.05), (3, 2, 0.0)])
+        return handler.events
+
+    events = asyncio.run(main())
+    assert events.index(('end', 3)) < events.index(('end', 1))
+
+
+def test_active_chats_are_capped():
+    async def main():
+        processor = PerChatUpdateProcessor(max_active_chats=3)
+        handler = Handler()
+        await process_all(processor, handler, [(n, 100 + n, 0.01) for n in range(10)])
+        return handler
+
+    handler = asyncio.run(main())
+    assert handler.peak == 3
+    assert len(handler.events) == 20
+
+
+def test_updates_without_a_chat_are_not_serialised():
+    async def main():
+        processor = PerChatUpdateProcessor(max_active_chats=8)
+        handler = Handler()
+        await asyncio.gather(*(
+            processor.process_update(object(), handler.handle(n, 0.05)) for n in range(4)
+        ))
+        return handler.peak
+
+    assert asyncio.run(main()) == 4
@@ -0,0 +1,75 @@
+import asyncio
+
+from telegram import Update
+from telegram.ext import BaseUpdateProcessor
+
+
+def chat_key(update):
+    """What updates must be ordered by: their chat, else their user (inline
+    queries, callbacks on inline messages), else nothing."""
+    if not isinstance(update, Update):
+        return None
+    if update.effective_chat is not None:
+        return 'chat', update.effective_chat.id
+    if update.effective_user is not None:
+        return 'user', update.effective_user.id
+    return None
+
+
+class PerChatUpdateProcessor(BaseUpdateProcessor):
+    """Processes updates from different chats concurrently and updates from
+    the same chat strictly in the order they arrived.
+
+    At most ``max_active_chats`` updates run at once, each from a different
+    chat; a chat's next update starts only after its previous one finished,
+    so ``ConversationHandler`` state moves exactly as with sequential
+    processing. Updates waiting for their chat or for a free slot are held
+    here, up to ``max_pending_updates`` in total (the application's
+    ``concurrent_updates``); ``pending`` counts them plus the running ones.
+    """
+
+    def __init__(self, max_active_chats=16, max_pending_updates=1024):
+        super().__init__(max_pending_updates)
+        if max_active_chats < 1:
+            raise ValueError("max_active_chats must be a positive integer")
+        self.max_active_chats = max_active_chats
+        self.active = 0
+        self.pending = 0
+        self._slots = asyncio.Semaphore(max_active_chats)
+        self._tails = {}  # chat key -> future done when the chat's last update is
+
+    async def initialize(self):
+        pass
+
+    async def shutdown(self):
+        pass
+
+    async def do_process_update(self, update, coroutine):
+        key = chat_key(update)
+        turn = previous = None
+        if key is not None:
+            # Queue behind the chat's previous update before the first await,
+            # so the chain follows arrival order
+            previous = self._tails.get(key)
+            turn = self._tails[key] = asyncio.get_running_loop().create_future()
+
+        self.pending += 1
+        started = False
+        try:
+            if previous is not None:
+                await asyncio.shield(previous)
+            async with self._slots:
+                self.active += 1
+                started = True
+                try:
+                    await coroutine
+                finally:
+                    self.active -= 1
+        finally:
+            if not started:
+                coroutine.close()
+            self.pending -= 1
+            if turn is not None:
+                turn.set_result(None)
+                if self._tails.get(key) is turn:
+                    del self._tails[key]